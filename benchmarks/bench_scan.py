@@ -0,0 +1,130 @@
+"""Vergleicht den rglob-basierten Scan mit dem scandir-Walker.
+
+Jede Variante läuft in einem eigenen Prozess, damit der Spitzenwert des
+Arbeitsspeichers (``ru_maxrss``) nicht von der jeweils anderen Variante
+verfälscht wird. Ist ``strace`` installiert, werden zusätzlich die
+Systemaufrufe gezählt.
+
+Aufruf::
+
+    python benchmarks/bench_scan.py --files 100000
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.file_organizer import FileOrganizer
+
+
+def legacy_scan(source_dir: Path) -> dict[str, list[Path]]:
+    """Ursprüngliche Implementierung mit ``rglob`` und ``is_file``."""
+    files_by_type: dict[str, list[Path]] = {}
+    for file_path in source_dir.rglob("*"):
+        if file_path.is_file():
+            files_by_type.setdefault(file_path.suffix.lower(), []).append(file_path)
+    return files_by_type
+
+
+def iter_scan(source_dir: Path) -> dict[str, int]:
+    """Streamender Scan, der nur Zähler pro Erweiterung hält."""
+    counts: dict[str, int] = {}
+    for entry in FileOrganizer(source_dir).iter_files():
+        counts[entry.suffix] = counts.get(entry.suffix, 0) + 1
+    return counts
+
+
+VARIANTS = {
+    "rglob": legacy_scan,
+    "scan_files": lambda source_dir: FileOrganizer(source_dir).scan_files(),
+    "iter_files": iter_scan,
+    "parallel": lambda source_dir: FileOrganizer(source_dir, workers=8).scan_files(),
+}
+
+
+def build_tree(root: Path, n_files: int, files_per_dir: int = 100) -> None:
+    """Erzeugt einen einfachen Baum mit ``n_files`` leeren Dateien."""
+    extensions = [".py", ".md", ".json", ".txt", ""]
+    for index in range(n_files):
+        directory = (
+            root / f"d{index // files_per_dir // 10}" / f"s{index // files_per_dir}"
+        )
+        if index % files_per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{index}{extensions[index % len(extensions)]}").touch()
+
+
+def run_variant(variant: str, source_dir: Path) -> dict[str, float]:
+    """Führt eine Variante im aktuellen Prozess aus und misst sie."""
+    start = time.perf_counter()
+    VARIANTS[variant](source_dir)
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": elapsed, "peak_rss_kib": peak_kib}
+
+
+def count_syscalls(variant: str, source_dir: Path) -> int | None:
+    """Zählt die Systemaufrufe einer Variante mit ``strace -c``."""
+    return strace_count([sys.executable, __file__, "--child", variant, str(source_dir)])
+
+
+def strace_count(command: list[str]) -> int | None:
+    """Zählt die Systemaufrufe eines Befehls mit ``strace -c``.
+
+    Returns:
+        Gesamtzahl der Aufrufe oder ``None``, wenn ``strace`` fehlt
+    """
+    strace = shutil.which("strace")
+    if strace is None:
+        return None
+    result = subprocess.run(  # noqa: S603
+        [strace, "-f", "-c", *command],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Die Summenzeile endet mit "total", die vierte Spalte enthält die Aufrufe
+    for line in result.stderr.splitlines():
+        columns = line.split()
+        if columns and columns[-1] == "total":
+            return int(columns[3])
+    return None
+
+
+def main() -> None:
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--child", nargs=2, metavar=("VARIANT", "DIR"))
+    args = parser.parse_args()
+
+    if args.child:
+        variant, directory = args.child
+        sys.stdout.write(json.dumps(run_variant(variant, Path(directory))) + "\n")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_tree(root, args.files)
+        for variant in VARIANTS:
+            result = subprocess.run(  # noqa: S603
+                [sys.executable, __file__, "--child", variant, str(root)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            stats = json.loads(result.stdout)
+            stats["syscalls"] = count_syscalls(variant, root)
+            sys.stdout.write(f"{variant:>10}: {json.dumps(stats)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Benchmark-Suite für den Scan-Pfad mit JSON-Baseline.
+
+Für jede Kombination aus Baumform (siehe ``tree_generator.py``), Größe und
+Scan-Variante wird in einem eigenen Prozess gemessen: Dateien pro Sekunde
+(bester von ``--repeat`` Läufen), Spitzenwert des Arbeitsspeichers und,
+falls ``strace`` installiert ist, die Anzahl der Systemaufrufe.
+
+Mit ``--baseline`` werden die Ergebnisse mit einer gespeicherten Baseline
+verglichen; Verschlechterungen über ``--tolerance`` hinaus beenden das
+Skript mit Exit-Code 1. Existiert die Baseline noch nicht (oder mit
+``--update-baseline``), wird sie geschrieben.
+
+Aufruf::
+
+    python benchmarks/bench_suite.py --sizes 10000 100000 \\
+        --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_scan import strace_count
+from tree_generator import SHAPES, generate_tree
+
+from src.file_organizer import FileOrganizer
+
+VARIANTS: dict[str, Callable[[Path], int]] = {
+    "iter_files": lambda root: sum(1 for _ in FileOrganizer(root).iter_files()),
+    "iter_files_stat": lambda root: sum(
+        1 for _ in FileOrganizer(root).iter_files(with_stat=True)
+    ),
+    "scan_files": lambda root: FileOrganizer(root).scan_files().file_count,
+    "parallel": lambda root: FileOrganizer(root, workers=8).scan_files().file_count,
+}
+
+# Kennzahl -> Richtung, in der eine Änderung eine Verschlechterung ist
+METRICS = {"files_per_sec": -1, "peak_rss_kib": 1, "syscalls": 1}
+
+
+def run_child(variant: str, root: Path) -> dict[str, float]:
+    """Misst eine Variante im aktuellen Prozess."""
+    start = time.perf_counter()
+    files = VARIANTS[variant](root)
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"files": files, "seconds": elapsed, "peak_rss_kib": peak_kib}
+
+
+def measure(
+    variant: str, root: Path, repeat: int, syscalls: bool
+) -> dict[str, float | None]:
+    """Misst eine Variante in frischen Prozessen.
+
+    Returns:
+        Dateien pro Sekunde (bester Lauf), Spitzenwert des Arbeitsspeichers
+        (höchster Lauf) und Systemaufrufe (``None`` ohne ``strace``)
+    """
+    command = [sys.executable, __file__, "--child", variant, str(root)]
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(  # noqa: S603
+            command, capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(result.stdout))
+    return {
+        "files": runs[0]["files"],
+        "files_per_sec": max(run["files"] / run["seconds"] for run in runs),
+        "peak_rss_kib": max(run["peak_rss_kib"] for run in runs),
+        "syscalls": strace_count(command) if syscalls else None,
+    }
+
+
+def prepare_tree(cache: Path, shape: str, entries: int, seed: int) -> Path:
+    """Erzeugt einen Baum oder verwendet einen bereits erzeugten wieder."""
+    root = cache / f"{shape}-{entries}-{seed}"
+    marker = cache / f"{shape}-{entries}-{seed}.json"
+    if not marker.exists():
+        stats = generate_tree(root, shape, entries, seed)
+        marker.write_text(json.dumps(stats._asdict()))
+    return root
+
+
+def compare(
+    results: dict[str, dict[str, float | None]],
+    baseline: dict[str, dict[str, float | None]],
+    tolerance: float,
+) -> list[str]:
+    """Vergleicht Ergebnisse mit der Baseline.
+
+    Returns:
+        Beschreibungen aller Verschlechterungen über ``tolerance`` hinaus
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * direction > tolerance:
+                regressions.append(f"{key} {metric}: {old:.0f} -> {new:.0f}")
+    return regressions
+
+
+def _format(key: str, result: dict[str, float | None]) -> str:
+    syscalls = result["syscalls"]
+    return (
+        f"{key:<32} {result['files_per_sec']:>12,.0f} Dateien/s "
+        f"{result['peak_rss_kib']:>10,.0f} KiB "
+        f"{'-' if syscalls is None else f'{syscalls:,.0f}':>12} Syscalls\n"
+    )
+
+
+def main() -> None:
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument(
+        "--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cache", type=Path, help="Erzeugte Bäume hier ablegen und wiederverwenden"
+    )
+    parser.add_argument("--no-syscalls", action="store_true")
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", nargs=2, metavar=("VARIANT", "DIR"))
+    args = parser.parse_args()
+
+    if args.child:
+        variant, directory = args.child
+        sys.stdout.write(json.dumps(run_child(variant, Path(directory))) + "\n")
+        return
+
+    results: dict[str, dict[str, float | None]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = args.cache or Path(tmp)
+        cache.mkdir(parents=True, exist_ok=True)
+        for shape in args.shapes:
+            for entries in args.sizes:
+                root = prepare_tree(cache, shape, entries, args.seed)
+                for variant in args.variants:
+                    key = f"{shape}/{entries}/{variant}"
+                    results[key] = measure(
+                        variant, root, args.repeat, not args.no_syscalls
+                    )
+                    sys.stdout.write(_format(key, results[key]))
+                    sys.stdout.flush()
+
+    if args.baseline is None:
+        return
+    if args.update_baseline or not args.baseline.exists():
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        sys.stdout.write(f"Baseline geschrieben: {args.baseline}\n")
+        return
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        sys.stdout.write(f"Verschlechterung: {regression}\n")
+    if regressions:
+        sys.exit(1)
+    sys.stdout.write(f"Keine Verschlechterung gegenüber {args.baseline}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Deterministischer Generator für synthetische Verzeichnisbäume.
+
+Jede Form bildet ein typisches Lastprofil für den Scan-Pfad nach:
+
+``wide``
+    Wenige, sehr große flache Verzeichnisse (je 5000 Dateien)
+``deep``
+    Lange Verzeichnisketten (Tiefe 64) mit wenigen Dateien je Ebene
+``tiny``
+    Viele kleine Verzeichnisse mit winzigen, nicht leeren Dateien
+``mixed``
+    Zufällig verzweigter Baum mit gemischten, teils großgeschriebenen
+    Erweiterungen und Dateien ohne Erweiterung
+
+Gleiche Form, Größe und Seed erzeugen immer denselben Baum. Die Größe
+zählt Einträge, also Dateien und Verzeichnisse zusammen.
+
+Aufruf::
+
+    python benchmarks/tree_generator.py mixed 100000 /tmp/baum
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+EXTENSIONS = [".py", ".md", ".json", ".txt", ".jpg", ".PDF", ".tar.gz", ""]
+_PAYLOAD = bytes(range(256)) * 16
+
+# ("d", relativer Pfad, 0) bzw. ("f", relativer Pfad, Größe in Bytes)
+_Entry = tuple[str, str, int]
+
+
+class TreeStats(NamedTuple):
+    """Umfang eines erzeugten Baums."""
+
+    files: int
+    directories: int
+    bytes: int
+
+
+def _wide(rng: random.Random) -> Iterator[_Entry]:
+    for directory in range(sys.maxsize):
+        yield "d", f"w{directory}", 0
+        for index in range(5000):
+            suffix = rng.choice(EXTENSIONS)
+            yield "f", f"w{directory}/f{index}{suffix}", 0
+
+
+def _deep(rng: random.Random) -> Iterator[_Entry]:
+    for chain in range(sys.maxsize):
+        path = f"c{chain}"
+        for level in range(64):
+            yield "d", path, 0
+            for index in range(4):
+                yield "f", f"{path}/f{level}_{index}{rng.choice(EXTENSIONS)}", 0
+            path = f"{path}/l{level + 1}"
+
+
+def _tiny(rng: random.Random) -> Iterator[_Entry]:
+    for group in range(sys.maxsize):
+        if group % 100 == 0:
+            yield "d", f"t{group // 100}", 0
+        path = f"t{group // 100}/g{group}"
+        yield "d", path, 0
+        for index in range(50):
+            size = rng.randint(1, 512)
+            yield "f", f"{path}/f{index}{rng.choice(EXTENSIONS)}", size
+
+
+def _mixed(rng: random.Random) -> Iterator[_Entry]:
+    directories = [("", 0)]
+    for index in range(sys.maxsize):
+        if rng.random() < 0.08:
+            parent, depth = rng.choice(directories)
+            if depth < 8:
+                path = f"{parent}/m{index}" if parent else f"m{index}"
+                directories.append((path, depth + 1))
+                yield "d", path, 0
+                continue
+        parent = rng.choice(directories)[0]
+        name = f"f{index}{rng.choice(EXTENSIONS)}"
+        size = int(rng.lognormvariate(6, 2)) % 65536 if rng.random() < 0.5 else 0
+        yield "f", f"{parent}/{name}" if parent else name, size
+
+
+SHAPES: dict[str, Callable[[random.Random], Iterator[_Entry]]] = {
+    "wide": _wide,
+    "deep": _deep,
+    "tiny": _tiny,
+    "mixed": _mixed,
+}
+
+
+def generate_tree(root: Path, shape: str, entries: int, seed: int = 0) -> TreeStats:
+    """Erzeugt einen synthetischen Baum unter ``root``.
+
+    Args:
+        root: Zielverzeichnis (wird bei Bedarf angelegt)
+        shape: Eine der Formen aus ``SHAPES``
+        entries: Anzahl der zu erzeugenden Dateien und Verzeichnisse
+        seed: Startwert des Zufallsgenerators
+
+    Returns:
+        Anzahl der Dateien, Verzeichnisse und Bytes
+
+    Raises:
+        ValueError: Bei unbekannter Form
+    """
+    if shape not in SHAPES:
+        msg = f"Unbekannte Form {shape!r}, erlaubt: {', '.join(SHAPES)}"
+        raise ValueError(msg)
+    root.mkdir(parents=True, exist_ok=True)
+    base = os.fspath(root)
+    files = directories = total_bytes = 0
+    for kind, relative, size in SHAPES[shape](random.Random(seed)):  # noqa: S311
+        if files + directories >= entries:
+            break
+        path = f"{base}/{relative}"
+        if kind == "d":
+            Path(path).mkdir()
+            directories += 1
+            continue
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            remaining = size
+            while remaining:
+                remaining -= os.write(fd, _PAYLOAD[: min(remaining, len(_PAYLOAD))])
+        finally:
+            os.close(fd)
+        files += 1
+        total_bytes += size
+    return TreeStats(files, directories, total_bytes)
+
+
+def main() -> None:
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("shape", choices=SHAPES)
+    parser.add_argument("entries", type=int)
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    stats = generate_tree(args.root, args.shape, args.entries, args.seed)
+    sys.stdout.write(f"{stats}\n")
+
+
+if __name__ == "__main__":
+    main()
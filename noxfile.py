@@ -1,5 +1,7 @@
 """Nox-Konfiguration für automatisierte Tests und Checks."""
 
+from pathlib import Path
+
 import nox
 
 
@@ -41,3 +43,26 @@ def docs(session):
     """Dokumentationsstil prüfen."""
     session.install("pydocstyle")
     session.run("pydocstyle", "src/")
+
+
+@nox.session(default=False)
+def bench(session):
+    """Benchmark-Suite ausführen und mit der Baseline vergleichen.
+
+    Die Baseline ist maschinenabhängig und wird nicht eingecheckt. Fehlt
+    sie, erzeugt der erste Lauf sie, ohne etwas zu vergleichen.
+    """
+    session.install("-e", ".")
+    baseline = Path("benchmarks/baseline.json")
+    if not baseline.exists():
+        session.warn(
+            f"{baseline} fehlt: dieser Lauf schreibt die Baseline, "
+            "verglichen wird erst beim nächsten Lauf"
+        )
+    session.run(
+        "python",
+        "benchmarks/bench_suite.py",
+        "--baseline",
+        str(baseline),
+        *session.posargs,
+    )
@@ -0,0 +1,151 @@
+"""Speicherbelegung je Verzeichnis und größte Dateien in einem Durchlauf."""
+
+import heapq
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from src.file_organizer import _join
+
+if TYPE_CHECKING:
+    from src.file_organizer import FileEntry
+
+
+class UsageItem(NamedTuple):
+    """Datei oder Verzeichnis mit seiner (kumulierten) Größe."""
+
+    path: str
+    size: int
+
+
+class DiskUsageReport(NamedTuple):
+    """Bericht im Stil von ``ncdu`` bzw. ``du``.
+
+    Alle Größen sind scheinbare Größen (``st_size``) in Bytes; Hardlinks
+    werden mehrfach gezählt. Verzeichnisse ohne Dateien in ihrem
+    Teilbaum tauchen nicht auf.
+    """
+
+    total_bytes: int
+    files: int
+    by_directory: dict[str, int]
+    largest_directories: list[UsageItem]
+    largest_files: list[UsageItem]
+
+
+class _TopN:
+    """Min-Heap, der nur die ``size`` größten Einträge behält."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._heap: list[tuple[int, str]] = []
+
+    def qualifies(self, size: int) -> bool:
+        """Vorabtest, damit Pfade nur für Kandidaten zusammengesetzt werden."""
+        if len(self._heap) < self.size:
+            return True
+        return bool(self._heap) and size >= self._heap[0][0]
+
+    def offer(self, size: int, path: str) -> None:
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, (size, path))
+        elif self._heap and (size, path) > self._heap[0]:
+            heapq.heapreplace(self._heap, (size, path))
+
+    def items(self) -> list[UsageItem]:
+        return [
+            UsageItem(path, size) for size, path in sorted(self._heap, reverse=True)
+        ]
+
+
+class _OpenDirectory:
+    """Verzeichnis auf dem aktuellen Pfad mit seiner Zwischensumme."""
+
+    __slots__ = ("name", "path", "size")
+
+    def __init__(self, path: str, name: str) -> None:
+        self.path = path
+        self.name = name
+        self.size = 0
+
+
+def disk_usage(
+    entries: Iterable["FileEntry"],
+    root: str | Path,
+    top: int = 10,
+    max_depth: int = 1,
+) -> DiskUsageReport:
+    """Rollt die Größen eines Pre-Order-Durchlaufs von unten nach oben auf.
+
+    ``entries`` muss wie ``FileOrganizer.iter_files(with_stat=True)`` jeden
+    Teilbaum zusammenhängend liefern. Gehalten wird nur der Pfad von der
+    Wurzel zum aktuellen Verzeichnis samt Zwischensummen: Verlässt der
+    Durchlauf ein Verzeichnis, ist dessen Summe endgültig und wird dem
+    Elternverzeichnis zugeschlagen. Zusammen mit zwei Heaps der Größe
+    ``top`` ist der Speicherbedarf damit unabhängig von der Anzahl der
+    Dateien.
+
+    Args:
+        entries: Einträge mit Größe in Pre-Order
+        root: Wurzel des Durchlaufs
+        top: Anzahl der größten Dateien und Verzeichnisse (unterhalb der
+            Wurzel)
+        max_depth: Verzeichnisse bis zu dieser Tiefe unterhalb der Wurzel
+            werden mit ihrer Summe in ``by_directory`` aufgeführt
+
+    Returns:
+        Bericht mit Gesamtgröße, Summen je Verzeichnis und den größten
+        Dateien und Verzeichnissen
+
+    Raises:
+        ValueError: Wenn ein Eintrag keine Größe hat
+    """
+    root = os.fspath(root)
+    prefix = _join(root, "")
+    largest_files = _TopN(top)
+    largest_directories = _TopN(top)
+    by_directory: dict[str, int] = {}
+    stack = [_OpenDirectory(root, "")]
+    current = root
+    files = 0
+
+    def close(depth: int) -> None:
+        """Schließt alle offenen Verzeichnisse unterhalb von ``depth``."""
+        while len(stack) > depth + 1:
+            directory = stack.pop()
+            stack[-1].size += directory.size
+            largest_directories.offer(directory.size, directory.path)
+            if len(stack) <= max_depth:
+                by_directory[directory.path] = directory.size
+
+    for entry in entries:
+        if entry.size is None:
+            msg = "disk_usage benötigt Einträge mit Größe (with_stat=True)"
+            raise ValueError(msg)
+        if entry.directory != current:
+            current = entry.directory
+            names = Path(current[len(prefix) :]).parts if current != root else ()
+            common = 0
+            while (
+                common < len(names)
+                and common + 1 < len(stack)
+                and stack[common + 1].name == names[common]
+            ):
+                common += 1
+            close(common)
+            for name in names[common:]:
+                stack.append(_OpenDirectory(_join(stack[-1].path, name), name))
+        stack[-1].size += entry.size
+        files += 1
+        if largest_files.qualifies(entry.size):
+            largest_files.offer(entry.size, _join(current, entry.name))
+    close(0)
+    by_directory[root] = stack[0].size
+    return DiskUsageReport(
+        total_bytes=stack[0].size,
+        files=files,
+        by_directory=by_directory,
+        largest_directories=largest_directories.items(),
+        largest_files=largest_files.items(),
+    )
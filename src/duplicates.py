@@ -0,0 +1,172 @@
+"""Mehrstufige Suche nach Dateien mit identischem Inhalt."""
+
+import hashlib
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+BLOCK_SIZE = 64 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+_CHUNKSIZE = 64
+
+_DigestFunction = Callable[[tuple[str, int, int]], bytes | None]
+_Digests = Iterator[bytes | None]
+
+
+class DuplicateReport(NamedTuple):
+    """Ergebnis der Duplikatsuche."""
+
+    groups: list[list[Path]]
+    files_scanned: int
+    bytes_total: int
+    bytes_read: int
+
+
+def _partial_digest(job: tuple[str, int, int]) -> bytes | None:
+    """Hasht den ersten und den letzten Block einer Datei.
+
+    Ist die Datei nicht größer als zwei Blöcke, wird sie vollständig gelesen;
+    der Hash deckt dann bereits den gesamten Inhalt ab.
+    """
+    path, size, block_size = job
+    digest = hashlib.blake2b()
+    try:
+        with Path(path).open("rb") as file:
+            if size <= 2 * block_size:
+                digest.update(file.read())
+            else:
+                digest.update(file.read(block_size))
+                file.seek(size - block_size)
+                digest.update(file.read(block_size))
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _full_digest(job: tuple[str, int, int]) -> bytes | None:
+    """Hasht den vollständigen Inhalt einer Datei mit großem Lesepuffer."""
+    path = job[0]
+    digest = hashlib.blake2b()
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    try:
+        with Path(path).open("rb", buffering=0) as file:
+            while count := file.readinto(buffer):
+                digest.update(view[:count])
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _split(groups: list[list[str]], digests: Iterator[bytes | None]) -> list[list[str]]:
+    """Teilt Kandidatengruppen anhand der Hashes weiter auf.
+
+    Args:
+        groups: Kandidatengruppen
+        digests: Hashes in derselben Reihenfolge wie die Pfade der Gruppen;
+            ``None`` steht für eine nicht lesbare Datei
+
+    Returns:
+        Gruppen mit mindestens zwei Dateien gleichen Hashes
+    """
+    result: list[list[str]] = []
+    for group in groups:
+        by_digest: dict[bytes, list[str]] = {}
+        for path in group:
+            value = next(digests)
+            if value is not None:
+                by_digest.setdefault(value, []).append(path)
+        result.extend(paths for paths in by_digest.values() if len(paths) > 1)
+    return result
+
+
+def find_duplicates(
+    paths: Iterable[str | os.PathLike[str]],
+    workers: int | None = None,
+    block_size: int = BLOCK_SIZE,
+    min_size: int = 1,
+) -> DuplicateReport:
+    """Findet Dateien mit identischem Inhalt.
+
+    Die Suche läuft in drei Stufen, von denen jede nur die Kandidaten der
+    vorherigen weiterverarbeitet:
+
+    1. Gruppierung nach Dateigröße (nur ``stat``, kein Lesen)
+    2. Hash über den ersten und letzten Block
+    3. Vollständiger Hash für die verbleibenden Kollisionen
+
+    Harte Links auf denselben Inode werden nicht gelesen, sondern direkt
+    der Gruppe ihres Inodes zugeordnet. Die Hash-Stufen laufen in einem
+    Prozesspool.
+
+    Args:
+        paths: Zu prüfende Dateien
+        workers: Anzahl der Prozesse (``None`` = Anzahl der CPUs,
+            1 = im aktuellen Prozess)
+        block_size: Größe des ersten und letzten Blocks in Bytes
+        min_size: Kleinere Dateien (standardmäßig leere) werden ignoriert
+
+    Returns:
+        Report mit den Duplikatgruppen (jeweils sortiert) und der Anzahl
+        insgesamt vorhandener und tatsächlich gelesener Bytes
+    """
+    by_size: dict[int, list[str]] = {}
+    sizes: dict[str, int] = {}
+    links: dict[str, list[str]] = {}
+    seen_inodes: dict[tuple[int, int], str] = {}
+    files_scanned = bytes_total = 0
+    for raw_path in paths:
+        path = os.fspath(raw_path)
+        try:
+            stat_result = Path(path).stat()
+        except OSError:
+            continue
+        files_scanned += 1
+        if stat_result.st_size < min_size:
+            continue
+        inode = (stat_result.st_dev, stat_result.st_ino)
+        if inode in seen_inodes:
+            links[seen_inodes[inode]].append(path)
+            continue
+        seen_inodes[inode] = path
+        links[path] = [path]
+        sizes[path] = stat_result.st_size
+        bytes_total += stat_result.st_size
+        by_size.setdefault(stat_result.st_size, []).append(path)
+
+    size_groups = [group for group in by_size.values() if len(group) > 1]
+    bytes_read = 0
+    pool = ProcessPoolExecutor(workers) if workers != 1 and size_groups else None
+    try:
+
+        def digests(function: _DigestFunction, groups: list[list[str]]) -> _Digests:
+            jobs = [(path, sizes[path], block_size) for g in groups for path in g]
+            if pool is None:
+                return map(function, jobs)
+            return pool.map(function, jobs, chunksize=_CHUNKSIZE)
+
+        bytes_read += sum(
+            min(sizes[path], 2 * block_size) for g in size_groups for path in g
+        )
+        candidates = _split(size_groups, digests(_partial_digest, size_groups))
+
+        complete = [g for g in candidates if sizes[g[0]] <= 2 * block_size]
+        large = [g for g in candidates if sizes[g[0]] > 2 * block_size]
+        bytes_read += sum(sizes[path] for g in large for path in g)
+        complete += _split(large, digests(_full_digest, large))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Harte Links sind auch ohne inhaltsgleiche Partner Duplikate
+    grouped = {path for group in complete for path in group}
+    complete += [
+        [path] for path, same in links.items() if len(same) > 1 and path not in grouped
+    ]
+    groups = [
+        sorted(Path(link) for path in group for link in links[path])
+        for group in complete
+    ]
+    return DuplicateReport(sorted(groups), files_scanned, bytes_total, bytes_read)
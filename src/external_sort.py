@@ -0,0 +1,176 @@
+"""Sortierte Dateilisten mit begrenztem Speicher per externem Merge-Sort."""
+
+import heapq
+import pickle
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from src.file_organizer import FileEntry, _join
+
+SORT_KEYS = ("path", "size", "mtime")
+
+# Obergrenze gleichzeitig gemischter Läufe; darüber wird in Stufen gemischt
+_MAX_FAN_IN = 64
+# Geschätzter Speicherbedarf eines Eintrags ohne die Länge der Namen
+_ENTRY_OVERHEAD = 200
+
+
+def _path_key(entry: FileEntry) -> str:
+    return _join(entry.directory, entry.name)
+
+
+def _size_key(entry: FileEntry) -> tuple[int, str]:
+    return entry.size or 0, _join(entry.directory, entry.name)
+
+
+def _mtime_key(entry: FileEntry) -> tuple[float, str]:
+    return entry.mtime or 0.0, _join(entry.directory, entry.name)
+
+
+_KEYS: dict[str, Callable[[FileEntry], Any]] = {
+    "path": _path_key,
+    "size": _size_key,
+    "mtime": _mtime_key,
+}
+
+
+def _write_run(path: Path, entries: Iterable[FileEntry], batch_size: int) -> None:
+    """Schreibt einen sortierten Lauf in Blöcken von ``batch_size`` Einträgen."""
+    iterator = iter(entries)
+    with path.open("wb") as file:
+        while batch := [tuple(entry) for entry in islice(iterator, batch_size)]:
+            pickle.dump(batch, file, pickle.HIGHEST_PROTOCOL)
+
+
+def _read_run(path: Path) -> Iterator[FileEntry]:
+    """Liest einen Lauf blockweise zurück."""
+    with path.open("rb") as file:
+        while True:
+            try:
+                # Nur selbst geschriebene temporäre Dateien
+                batch = pickle.load(file)  # noqa: S301
+            except EOFError:
+                return
+            yield from map(FileEntry._make, batch)
+
+
+class ExternalSorter:
+    """Sortiert beliebig viele Einträge mit fester Speichergrenze.
+
+    Die Einträge werden gesammelt, bis die geschätzte Größe
+    ``memory_limit`` erreicht; dieser Block wird im Speicher sortiert und
+    als Lauf in eine temporäre Datei geschrieben. Am Ende werden die Läufe
+    per k-Wege-Merge (``heapq.merge``) zusammengeführt, bei mehr als
+    ``_MAX_FAN_IN`` Läufen in mehreren Stufen. Passt alles in den
+    Speicher, wird keine Datei geschrieben.
+    """
+
+    def __init__(
+        self,
+        key: str = "path",
+        memory_limit: int = 256 * 2**20,
+        temp_dir: str | Path | None = None,
+        reverse: bool = False,
+    ) -> None:
+        """Initialisiert den Sortierer.
+
+        Args:
+            key: ``"path"``, ``"size"`` oder ``"mtime"``; bei Gleichstand
+                entscheidet der Pfad
+            memory_limit: Geschätzte Obergrenze des Arbeitsspeichers in Bytes
+            temp_dir: Verzeichnis für die Läufe (Standard: System-Temp)
+            reverse: Absteigend sortieren
+
+        Raises:
+            ValueError: Bei unbekanntem Schlüssel oder zu kleinem Limit
+        """
+        if key not in _KEYS:
+            msg = f"Unbekannter Sortierschlüssel: {key} (erlaubt: {SORT_KEYS})"
+            raise ValueError(msg)
+        if memory_limit < _ENTRY_OVERHEAD * _MAX_FAN_IN:
+            msg = f"memory_limit muss mindestens {_ENTRY_OVERHEAD * _MAX_FAN_IN} sein"
+            raise ValueError(msg)
+        self.key = key
+        self.memory_limit = memory_limit
+        self.temp_dir = temp_dir
+        self.reverse = reverse
+        # Einträge je Block beim Lesen eines Laufs, sodass auch alle
+        # gleichzeitig geöffneten Läufe zusammen im Limit bleiben
+        self.batch_size = max(1, memory_limit // (_MAX_FAN_IN * _ENTRY_OVERHEAD * 2))
+        self.runs = 0
+
+    def sort(self, entries: Iterable[FileEntry]) -> Iterator[FileEntry]:
+        """Liefert die Einträge sortiert.
+
+        Temporäre Dateien werden entfernt, sobald der Generator erschöpft
+        oder geschlossen ist.
+
+        Args:
+            entries: Z. B. ``FileOrganizer.iter_files()``; für ``"size"`` und
+                ``"mtime"`` mit ``with_stat=True``
+
+        Yields:
+            Einträge in sortierter Reihenfolge
+
+        Raises:
+            ValueError: Wenn für ``"size"``/``"mtime"`` die Angaben fehlen
+        """
+        key = _KEYS[self.key]
+        needs_stat = self.key != "path"
+        self.runs = 0
+        with tempfile.TemporaryDirectory(
+            prefix="file-organizer-sort-", dir=self.temp_dir
+        ) as directory:
+            runs: list[Path] = []
+            chunk: list[FileEntry] = []
+            used = 0
+            for entry in entries:
+                if needs_stat and entry.size is None:
+                    msg = f"Sortieren nach {self.key} benötigt with_stat=True"
+                    raise ValueError(msg)
+                chunk.append(entry)
+                used += _ENTRY_OVERHEAD + len(entry.directory) + len(entry.name)
+                if used >= self.memory_limit:
+                    runs.append(self._spill(Path(directory), chunk))
+                    chunk, used = [], 0
+            if not runs:
+                chunk.sort(key=key, reverse=self.reverse)
+                yield from chunk
+                return
+            if chunk:
+                runs.append(self._spill(Path(directory), chunk))
+            del chunk
+            while len(runs) > _MAX_FAN_IN:
+                runs = [
+                    self._merge_to_run(
+                        Path(directory), runs[start : start + _MAX_FAN_IN]
+                    )
+                    for start in range(0, len(runs), _MAX_FAN_IN)
+                ]
+            yield from self._merge(runs)
+
+    def _spill(self, directory: Path, chunk: list[FileEntry]) -> Path:
+        """Sortiert einen Block im Speicher und schreibt ihn als Lauf."""
+        chunk.sort(key=_KEYS[self.key], reverse=self.reverse)
+        self.runs += 1
+        path = directory / f"lauf-{self.runs}"
+        _write_run(path, chunk, self.batch_size)
+        return path
+
+    def _merge(self, runs: list[Path]) -> Iterator[FileEntry]:
+        """k-Wege-Merge der Läufe."""
+        return heapq.merge(
+            *map(_read_run, runs), key=_KEYS[self.key], reverse=self.reverse
+        )
+
+    def _merge_to_run(self, directory: Path, runs: list[Path]) -> Path:
+        """Mischt mehrere Läufe zu einem neuen und löscht die alten."""
+        self.runs += 1
+        path = directory / f"lauf-{self.runs}"
+        _write_run(path, self._merge(runs), self.batch_size)
+        for run in runs:
+            run.unlink()
+        return path
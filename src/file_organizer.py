@@ -1,47 +1,982 @@
 """Dateiorganisations-Tool für Python-Projekte."""
 
+import asyncio
+import os
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import aclosing
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, TextIO
+
+from src.duplicates import DuplicateReport, find_duplicates
+from src.scan_filter import ScanFilter
+from src.scan_hooks import DirectoryStats, ScanHooks, ScanProfiler, ScanSummary
+from src.scan_index import ScanIndex, default_index_path
+from src.scan_result import ScanResult
+from src.scan_stats import ScanStatistics
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+
+    from src.disk_usage import DiskUsageReport
+    from src.mover import Move, MoveReport
+    from src.multi_root import MultiRootScanner
+    from src.sniffer import ContentSniffer
+    from src.watcher import WatchBatch
+
+
+class FileEntry(NamedTuple):
+    """Leichtgewichtiger Datensatz für eine gefundene Datei.
+
+    ``size`` und ``mtime`` sind nur bei einem Durchlauf mit
+    ``with_stat=True`` gesetzt.
+    """
+
+    directory: str
+    name: str
+    size: int | None = None
+    mtime: float | None = None
+
+    @property
+    def path(self) -> Path:
+        """Vollständiger Pfad als Path-Objekt (wird erst bei Zugriff erzeugt)."""
+        return Path(self.directory, self.name)
+
+    @property
+    def suffix(self) -> str:
+        """Dateierweiterung in Kleinbuchstaben, analog zu ``Path.suffix``."""
+        return file_suffix(self.name)
+
+
+def file_suffix(name: str) -> str:
+    """Ermittelt die Dateierweiterung eines Dateinamens in Kleinbuchstaben.
+
+    Verhält sich wie ``Path(name).suffix.lower()``, ohne ein Path-Objekt
+    anzulegen.
+
+    Args:
+        name: Dateiname ohne Verzeichnisanteil
+
+    Returns:
+        Erweiterung inklusive Punkt oder leerer String
+    """
+    index = name.rfind(".")
+    if 0 < index < len(name) - 1:
+        return name[index:].lower()
+    return ""
+
+
+def _join(directory: str, name: str) -> str:
+    """Verbindet Verzeichnis und Namen wie ``DirEntry.path``."""
+    if directory.endswith(os.sep):
+        return directory + name
+    return directory + os.sep + name
+
+
+class _Listing(NamedTuple):
+    """Ergebnis eines parallel gelesenen Verzeichnisses."""
+
+    files: list[FileEntry]
+    children: list["Future[_Listing]"]
 
 
 class FileOrganizer:
     """Organisiert Dateien nach Typ und Datum."""
 
-    def __init__(self, source_dir: str | Path) -> None:
+    def __init__(
+        self,
+        source_dir: str | Path,
+        workers: int = 1,
+        index: ScanIndex | None = None,
+        scan_filter: ScanFilter | None = None,
+        hooks: ScanHooks | None = None,
+    ) -> None:
         """Initialisiert den FileOrganizer.
 
         Args:
             source_dir: Quellverzeichnis (String oder Path)
+            workers: Anzahl paralleler Threads für das Auflisten von
+                Verzeichnissen (1 = seriell)
+            index: Optionaler persistenter Index; unveränderte Verzeichnisse
+                werden dann nicht erneut gelesen
+            scan_filter: Optionale Include-/Exclude-Muster und maximale
+                Tiefe; ausgeschlossene Verzeichnisse werden nicht gelesen
+            hooks: Optionale Rückrufe je Verzeichnis und bei Fehlern, z. B.
+                ``ScanProfiler``
+
+        Raises:
+            ValueError: Wenn ``workers`` kleiner als 1 ist
         """
+        if workers < 1:
+            msg = f"workers muss mindestens 1 sein, nicht {workers}"
+            raise ValueError(msg)
         self.source_dir = Path(source_dir)
+        self.workers = workers
+        self.index = index
+        self.scan_filter = scan_filter
+        self.hooks = hooks
 
-    def scan_files(self) -> dict[str, list[Path]]:
-        """Scannt Dateien und gruppiert sie nach Typ.
+    def _relative(self, directory: str) -> str:
+        """Pfad eines besuchten Verzeichnisses relativ zum Quellverzeichnis."""
+        root = os.fspath(self.source_dir)
+        return "" if directory == root else directory[len(_join(root, "")) :]
+
+    def _accepts(self, directory: str, name: str, is_dir: bool) -> bool:
+        """Wendet den Scan-Filter auf einen einzelnen Eintrag an."""
+        if self.scan_filter is None:
+            return True
+        if is_dir:
+            return self.scan_filter.keep_dir(self._relative(directory), name)
+        return self.scan_filter.keep_file(self._relative(directory), name)
+
+    def _list_directory(
+        self, directory: str, with_stat: bool = False
+    ) -> tuple[list[FileEntry], list[str]]:
+        """Listet ein einzelnes Verzeichnis auf, bei Bedarf aus dem Index.
+
+        Der Index speichert stets die ungefilterte Auflistung;
+        Include-/Exclude-Muster und ``max_depth`` werden erst danach
+        angewendet, sodass ausgeschlossene Unterverzeichnisse nie gelesen
+        werden. Nicht lesbare Verzeichnisse werden übersprungen und an
+        ``hooks.on_error`` gemeldet.
+
+        Args:
+            directory: Aufzulistendes Verzeichnis
+            with_stat: Größe und mtime der Dateien mitliefern
 
         Returns:
-            Dictionary mit Dateitypen und Pfaden
+            Tupel aus den Dateien und den Pfaden der Unterverzeichnisse,
+            jeweils nach Namen sortiert
         """
-        files_by_type: dict[str, list[Path]] = {}
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.on_dir_enter(directory)
+            start = time.perf_counter()
+        try:
+            files, subdir_names, syscalls = self._load_directory(directory, with_stat)
+        except OSError as error:
+            if hooks is not None:
+                hooks.on_error(directory, error)
+            return [], []
+        bytes_stat = sum(entry.size or 0 for entry in files) if with_stat else 0
+
+        if self.scan_filter is not None:
+            relative = self._relative(directory)
+            keep_file, keep_dir = self.scan_filter.keep_file, self.scan_filter.keep_dir
+            files = [entry for entry in files if keep_file(relative, entry.name)]
+            subdir_names = [name for name in subdir_names if keep_dir(relative, name)]
+        if hooks is not None:
+            elapsed = time.perf_counter() - start
+            hooks.on_dir_done(
+                DirectoryStats(
+                    directory,
+                    len(files),
+                    len(subdir_names),
+                    elapsed,
+                    syscalls,
+                    bytes_stat,
+                )
+            )
+        return files, [_join(directory, name) for name in subdir_names]
+
+    def _load_directory(
+        self, directory: str, with_stat: bool
+    ) -> tuple[list[FileEntry], list[str], int]:
+        """Liest ein Verzeichnis oder übernimmt es unverändert aus dem Index.
 
-        for file_path in self.source_dir.rglob("*"):
-            if file_path.is_file():
-                ext = file_path.suffix.lower()
-                if ext not in files_by_type:
-                    files_by_type[ext] = []
-                files_by_type[ext].append(file_path)
+        Mit aktivem Index wird nur das Verzeichnis selbst per ``stat``
+        geprüft; stimmen mtime und Inode mit dem Index überein, entfällt das
+        Lesen der Einträge. Werden Größe und Änderungszeit der Dateien
+        benötigt, wird das Verzeichnis immer frisch gelesen, da sich diese
+        ändern können, ohne dass sich das Verzeichnis ändert.
+
+        Returns:
+            Tupel aus Dateien, Unterverzeichnisnamen und der Anzahl der
+            ausgelösten Dateisystemaufrufe
+
+        Raises:
+            OSError: Wenn das Verzeichnis nicht gelesen werden kann
+        """
+        syscalls = 0
+        if self.index is not None:
+            stat_result = Path(directory).stat()
+            syscalls += 1
+            cached = None if with_stat else self.index.lookup(directory, stat_result)
+            if cached is not None:
+                files = [FileEntry(directory, name) for name in cached[0]]
+                return files, cached[1], syscalls
+
+        files, subdir_names = self._read_directory(directory, with_stat)
+        syscalls += 1 + (len(files) if with_stat else 0)
+        if self.index is not None:
+            file_names = [file_entry.name for file_entry in files]
+            self.index.store(directory, stat_result, file_names, subdir_names)
+        return files, subdir_names, syscalls
+
+    @staticmethod
+    def _read_directory(
+        directory: str, with_stat: bool = False
+    ) -> tuple[list[FileEntry], list[str]]:
+        """Liest ein einzelnes Verzeichnis mit ``os.scandir`` ein.
+
+        Die Typinformationen der ``DirEntry``-Objekte stammen in der Regel
+        direkt aus ``getdents`` und kosten keinen zusätzlichen ``stat``-Aufruf.
+        Mit ``with_stat`` wird genau ein ``DirEntry.stat()`` pro Datei
+        ausgeführt. Symbolische Links auf Verzeichnisse werden (wie bei
+        ``rglob``) nicht verfolgt.
+
+        Args:
+            directory: Zu lesendes Verzeichnis
+            with_stat: Größe und mtime der Dateien ermitteln
+
+        Returns:
+            Tupel aus den Dateien und den Unterverzeichnisnamen, jeweils
+            nach Namen sortiert
 
-        return files_by_type
+        Raises:
+            OSError: Wenn das Verzeichnis nicht gelesen werden kann
+        """
+        files: list[FileEntry] = []
+        subdir_names: list[str] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdir_names.append(entry.name)
+                elif not entry.is_file():
+                    continue
+                elif with_stat:
+                    try:
+                        stat_result = entry.stat()
+                    except OSError:  # pragma: no cover - zwischenzeitlich gelöscht
+                        continue
+                    files.append(
+                        FileEntry(
+                            directory,
+                            entry.name,
+                            stat_result.st_size,
+                            stat_result.st_mtime,
+                        )
+                    )
+                else:
+                    files.append(FileEntry(directory, entry.name))
+
+        files.sort(key=lambda file_entry: file_entry.name)
+        subdir_names.sort()
+        return files, subdir_names
+
+    def iter_files(self, with_stat: bool = False) -> Iterator[FileEntry]:
+        """Durchläuft das Quellverzeichnis und liefert Dateien als Stream.
+
+        Der Durchlauf nutzt einen expliziten Stack statt Rekursion und
+        erzeugt keine Zwischenlisten über den gesamten Baum. Die Reihenfolge
+        ist deterministisch: Verzeichnisse werden in Pre-Order besucht, die
+        Einträge je Verzeichnis nach Namen sortiert.
+
+        Mit ``workers > 1`` werden die Verzeichnisse parallel aufgelistet;
+        Ergebnis und Reihenfolge sind identisch zum seriellen Durchlauf.
+        Ein vollständig durchlaufener Scan wird im Index festgeschrieben;
+        ein vorzeitig geschlossener Durchlauf wird dort nur abgebrochen.
+
+        Args:
+            with_stat: Größe und mtime je Datei aus demselben Durchlauf
+                mitliefern (ein ``stat`` pro Datei)
+
+        Yields:
+            Ein ``FileEntry`` je gefundener Datei
+        """
+        if self.index is not None:
+            self.index.begin_scan()
+
+        finished = False
+        try:
+            if self.workers > 1:
+                yield from self._iter_files_parallel(with_stat)
+            else:
+                stack = [os.fspath(self.source_dir)]
+                while stack:
+                    files, subdirs = self._list_directory(stack.pop(), with_stat)
+                    yield from files
+                    stack.extend(reversed(subdirs))
+
+            if self.index is not None:
+                self.index.finish_scan(os.fspath(self.source_dir))
+            finished = True
+        finally:
+            if self.index is not None and not finished:
+                self.index.abort_scan()
+
+    def _iter_files_parallel(self, with_stat: bool) -> Iterator[FileEntry]:
+        """Paralleler Durchlauf über eine gemeinsame Arbeitswarteschlange.
+
+        Jeder Worker reiht die gefundenen Unterverzeichnisse sofort wieder in
+        den Pool ein, sodass stets bis zu ``workers`` Verzeichnisse gleichzeitig
+        gelesen werden. Der Aufrufer läuft die Futures in derselben
+        Pre-Order ab wie der serielle Stack und erhält daher dieselbe
+        Reihenfolge.
+        """
+        pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="file-organizer"
+        )
+
+        def list_and_enqueue(directory: str) -> _Listing:
+            files, subdirs = self._list_directory(directory, with_stat)
+            try:
+                children = [pool.submit(list_and_enqueue, d) for d in subdirs]
+            except RuntimeError:  # pragma: no cover - Wettlauf mit close()
+                # Pool wurde bereits heruntergefahren (Generator geschlossen)
+                children = []
+            return _Listing(files, children)
+
+        try:
+            stack = [pool.submit(list_and_enqueue, os.fspath(self.source_dir))]
+            while stack:
+                files, children = stack.pop().result()
+                yield from files
+                stack.extend(reversed(children))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    async def ascan(
+        self, batch_size: int = 1000, with_stat: bool = False
+    ) -> AsyncIterator[list[FileEntry]]:
+        """Asynchroner Durchlauf, der Dateien in Chargen liefert.
+
+        Alle blockierenden Dateisystemzugriffe laufen in einem eigenen
+        Thread-Pool mit ``workers`` Threads; die Ereignisschleife wird nie
+        blockiert. Es sind höchstens ``workers`` Verzeichnisse gleichzeitig
+        in Arbeit, und solange der Verbraucher eine Charge verarbeitet,
+        werden keine neuen Verzeichnisse begonnen. Der Speicherbedarf bleibt
+        so auch bei langsamen Verbrauchern begrenzt. Wird der Verbraucher
+        abgebrochen (``CancelledError``) oder der Generator geschlossen,
+        werden noch nicht begonnene Verzeichnisse verworfen.
+
+        Die Chargen entstehen in der Reihenfolge, in der die Verzeichnisse
+        fertig gelesen sind; nur mit ``workers=1`` entspricht die
+        Reihenfolge der von ``iter_files``.
+
+        Args:
+            batch_size: Maximale Anzahl Dateien je Charge
+            with_stat: Größe und mtime je Datei mitliefern
+
+        Yields:
+            Listen von ``FileEntry``-Datensätzen, jeweils höchstens
+            ``batch_size`` lang
+
+        Raises:
+            ValueError: Wenn ``batch_size`` kleiner als 1 ist
+        """
+        if batch_size < 1:
+            msg = f"batch_size muss mindestens 1 sein, nicht {batch_size}"
+            raise ValueError(msg)
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="file-organizer"
+        )
+        scanning = False
+        try:
+            if self.index is not None:
+                await loop.run_in_executor(pool, self.index.begin_scan)
+                scanning = True
+            batches = self._abatches(loop, pool, batch_size, with_stat)
+            async with aclosing(batches):
+                async for batch in batches:
+                    yield batch
+            if self.index is not None:
+                root = os.fspath(self.source_dir)
+                await loop.run_in_executor(pool, self.index.finish_scan, root)
+                scanning = False
+        finally:
+            if scanning and self.index is not None:
+                self.index.abort_scan()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _abatches(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        pool: ThreadPoolExecutor,
+        batch_size: int,
+        with_stat: bool,
+    ) -> AsyncGenerator[list[FileEntry]]:
+        """Verzeichnisdurchlauf von ``ascan`` ohne Index-Buchführung."""
+        pending = [os.fspath(self.source_dir)]
+        running: set[asyncio.Future[tuple[list[FileEntry], list[str]]]] = set()
+        batch: list[FileEntry] = []
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    running.add(
+                        loop.run_in_executor(
+                            pool, self._list_directory, pending.pop(), with_stat
+                        )
+                    )
+                done, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    files, subdirs = future.result()
+                    pending.extend(reversed(subdirs))
+                    batch.extend(files)
+                while len(batch) >= batch_size:
+                    yield batch[:batch_size]
+                    del batch[:batch_size]
+            if batch:
+                yield batch
+        finally:
+            for future in running:
+                future.cancel()
+
+    def watch(
+        self,
+        debounce: float = 0.1,
+        max_delay: float = 1.0,
+        idle_timeout: float | None = None,
+    ) -> Iterator["WatchBatch"]:
+        """Scannt einmal und hält die Gruppierung danach über inotify aktuell.
+
+        Nur unter Linux verfügbar. Ereignisse werden zu Chargen
+        zusammengefasst, sodass auch tausende neue Dateien in kurzer Folge
+        nur eine Aktualisierung auslösen.
+
+        Args:
+            debounce: Ruhezeit in Sekunden, nach der eine Charge angewendet
+                wird
+            max_delay: Maximale Verzögerung einer Charge in Sekunden
+            idle_timeout: Beendet die Überwachung nach so vielen Sekunden
+                ohne Ereignis (``None`` = nie)
+
+        Yields:
+            Zuerst das Ergebnis des initialen Scans, danach je Charge eine
+            ``WatchBatch`` mit der aktuellen Gruppierung
+        """
+        from src.watcher import TreeWatcher
+
+        watcher = TreeWatcher(self, debounce=debounce, max_delay=max_delay)
+        try:
+            yield from watcher.batches(idle_timeout)
+        finally:
+            watcher.close()
+
+    def plan_moves(self, target_dir: str | Path, layout: str = "type") -> list["Move"]:
+        """Plant das Einsortieren aller Dateien unter ``target_dir``.
+
+        Args:
+            target_dir: Wurzel der Zielstruktur
+            layout: ``"type"`` (``pdf/``), ``"date"`` (``2024/05/``) oder
+                ``"type-date"`` (``pdf/2024/05/``)
+
+        Returns:
+            Liste der geplanten Verschiebungen
+        """
+        from src.mover import plan_moves
 
+        return plan_moves(
+            self.iter_files(with_stat=layout != "type"), target_dir, layout
+        )
 
-def main() -> None:
-    """Hauptfunktion."""
+    def organize(
+        self,
+        target_dir: str | Path,
+        layout: str = "type",
+        journal_path: str | Path | None = None,
+        dry_run: bool = False,
+    ) -> "MoveReport":
+        """Sortiert alle Dateien in die Zielstruktur ein.
+
+        Args:
+            target_dir: Wurzel der Zielstruktur
+            layout: Siehe ``plan_moves``
+            journal_path: Journal, mit dem ein abgebrochener Lauf per
+                ``src.mover.resume_moves`` fortgesetzt werden kann (optional)
+            dry_run: Nur planen, keine Datei verschieben
+
+        Returns:
+            Bericht über verschobene, übersprungene und fehlgeschlagene Dateien
+        """
+        from src.mover import execute_plan
+
+        plan = self.plan_moves(target_dir, layout)
+        return execute_plan(plan, journal_path, dry_run=dry_run)
+
+    def snapshot(self, path: str | Path) -> int:
+        """Speichert Pfad, Größe und mtime aller Dateien als Snapshot.
+
+        Der Snapshot entsteht direkt aus einem Durchlauf mit
+        ``with_stat=True``, dessen Reihenfolge bereits der sortierten
+        Snapshot-Reihenfolge entspricht. Zwei Snapshots lassen sich mit
+        ``src.snapshot.diff_snapshots`` vergleichen.
+
+        Args:
+            path: Zieldatei
+
+        Returns:
+            Anzahl der gespeicherten Dateien
+        """
+        from src.snapshot import write_snapshot
+
+        return write_snapshot(self.iter_files(with_stat=True), self.source_dir, path)
+
+    def disk_usage(self, top: int = 10, max_depth: int = 1) -> "DiskUsageReport":
+        """Ermittelt die Speicherbelegung wie ``du`` bzw. ``ncdu``.
+
+        Summen je Verzeichnis sowie die größten Dateien und Verzeichnisse
+        entstehen aus einem einzigen Durchlauf mit ``with_stat=True``, ohne
+        alle Einträge zu sammeln (siehe ``src.disk_usage``).
+
+        Args:
+            top: Anzahl der größten Dateien und Verzeichnisse
+            max_depth: Tiefe, bis zu der Summen je Verzeichnis im Bericht
+                aufgeführt werden
+
+        Returns:
+            Bericht mit Gesamtgröße, Summen und Top-N-Listen
+        """
+        from src.disk_usage import disk_usage
+
+        return disk_usage(
+            self.iter_files(with_stat=True), self.source_dir, top, max_depth
+        )
+
+    def find_duplicates(
+        self, workers: int | None = None, min_size: int = 1
+    ) -> DuplicateReport:
+        """Sucht inhaltsgleiche Dateien im Quellverzeichnis.
+
+        Args:
+            workers: Anzahl der Hash-Prozesse (``None`` = Anzahl der CPUs)
+            min_size: Kleinere Dateien (standardmäßig leere) werden ignoriert
+
+        Returns:
+            Report mit den Gruppen identischer Dateien
+        """
+        return find_duplicates(
+            (_join(entry.directory, entry.name) for entry in self.iter_files()),
+            workers=workers,
+            min_size=min_size,
+        )
+
+    def scan_files(
+        self, with_stat: bool = False, sniffer: "ContentSniffer | None" = None
+    ) -> ScanResult:
+        """Scannt Dateien und gruppiert sie nach Typ.
+
+        Args:
+            with_stat: Größe und mtime je Datei mitspeichern, z. B. für
+                ``ScanResult.statistics()``
+            sniffer: Typ anhand der ersten Bytes statt nur der Endung
+                bestimmen (optional, siehe ``src.sniffer``)
+
+        Returns:
+            Kompaktes, dict-artiges Ergebnis mit Dateitypen und Pfaden
+        """
+        if sniffer is None:
+            return ScanResult.from_entries(self.iter_files(with_stat), with_stat)
+        result = ScanResult(with_stat)
+        for entry, kind in sniffer.classify(self.iter_files(with_stat)):
+            result.append(entry.directory, entry.name, kind, entry.size, entry.mtime)
+        return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Hauptfunktion.
+
+    Args:
+        argv: Kommandozeilenargumente (Standard: ``sys.argv[1:]``)
+    """
     import sys
 
-    organizer = FileOrganizer(".")
-    files = organizer.scan_files()
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if len(args.roots) > 1 and (
+        args.watch or args.organize or args.snapshot or args.du
+    ):
+        parser.error(
+            "--watch, --organize, --snapshot und --du unterstützen nur ein "
+            "VERZEICHNIS"
+        )
+    if args.diff:
+        _write_diff(sys.stdout, *args.diff)
+        return
+    missing = [os.fspath(root) for root in args.roots if not Path(root).is_dir()]
+    if missing:
+        parser.error(f"kein Verzeichnis: {', '.join(missing)}")
+
+    profiler = ScanProfiler(args.profile) if args.profile else None
+    index = ScanIndex(args.index) if args.index else None
+    try:
+        scanner = _scanner(args, index, profiler)
+        if isinstance(scanner, FileOrganizer) and _run_action(
+            sys.stdout, scanner, args
+        ):
+            return
+        if args.format != "summary":
+            _stream(sys.stdout, scanner, args)
+            return
+        files = _scan(scanner, args)
+    finally:
+        if index is not None:
+            index.close()
+        if profiler is not None:
+            _write_profile(sys.stderr, profiler.summary())
+
+    _write_counts(sys.stdout, files.counts())
+    if args.stats:
+        _write_statistics(sys.stdout, files.statistics())
+
+
+def _parser() -> "ArgumentParser":
+    """Erstellt den Parser für die Kommandozeile."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gruppiert Dateien nach Typ.")
+    parser.add_argument(
+        "roots",
+        nargs="*",
+        default=["."],
+        type=Path,
+        metavar="VERZEICHNIS",
+        help="Zu scannende Verzeichnisse (Standard: aktuelles Verzeichnis); "
+        "mehrere Wurzeln werden je physischem Gerät parallel gelesen",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Anzahl paralleler Threads für den Verzeichnisdurchlauf "
+        "(bei mehreren Wurzeln je Gerät)",
+    )
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const=default_index_path(),
+        type=Path,
+        help="Persistenten Index für inkrementelle Scans verwenden "
+        "(Standard: %(const)s)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Größen je Typ und Dateien je Monat ausgeben",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Nach dem Scan auf Änderungen warten (inotify, nur Linux)",
+    )
+    parser.add_argument(
+        "--organize",
+        metavar="ZIEL",
+        type=Path,
+        help="Dateien in Unterverzeichnisse von ZIEL verschieben",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=("type", "date", "type-date"),
+        default="type",
+        help="Zielstruktur für --organize (Standard: %(default)s)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Mit --organize nur die geplanten Verschiebungen ausgeben",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Journal für --organize; existiert es bereits, wird der "
+        "abgebrochene Lauf fortgesetzt",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="MUSTER",
+        help="Nur Dateien aufnehmen, die auf MUSTER passen (mehrfach möglich)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="MUSTER",
+        help="Dateien und Verzeichnisse überspringen, z. B. --exclude .git "
+        "--exclude node_modules (mehrfach möglich)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="Höchstens N Verzeichnisebenen unterhalb des Quellverzeichnisses",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("summary", "ndjson", "csv"),
+        default="summary",
+        help="summary: Anzahl je Typ; ndjson/csv: jede Datei sofort als "
+        "eigene Zeile (mit --stats inklusive Größe und mtime)",
+    )
+    parser.add_argument(
+        "--sort",
+        choices=("path", "size", "mtime"),
+        help="Mit --format ndjson/csv sortiert ausgeben; große Listen werden "
+        "in temporäre Dateien ausgelagert und gemischt",
+    )
+    parser.add_argument(
+        "--sort-memory",
+        type=int,
+        default=256,
+        metavar="MIB",
+        help="Speichergrenze für --sort in MiB (Standard: %(default)s)",
+    )
+    parser.add_argument(
+        "--sniff",
+        action="store_true",
+        help="Typ anhand der ersten Bytes bestimmen (Ergebnisse werden "
+        "zwischengespeichert)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=10,
+        type=int,
+        metavar="N",
+        help="Kennzahlen und die N langsamsten Verzeichnisse auf stderr "
+        "ausgeben (Standard: %(const)s)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="DATEI",
+        type=Path,
+        help="Pfad, Größe und mtime aller Dateien sortiert in DATEI speichern",
+    )
+    parser.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("ALT", "NEU"),
+        type=Path,
+        help="Zwei Snapshots vergleichen (+ hinzugefügt, - entfernt, ~ geändert)",
+    )
+    parser.add_argument(
+        "--du",
+        nargs="?",
+        const=10,
+        type=int,
+        metavar="N",
+        help="Belegung je Unterverzeichnis sowie die N größten Verzeichnisse "
+        "und Dateien ausgeben (Standard: %(const)s)",
+    )
+    return parser
+
+
+def _scanner(
+    args: "Namespace", index: ScanIndex | None, profiler: ScanProfiler | None
+) -> "FileOrganizer | MultiRootScanner":
+    """Erstellt den Scanner für eine bzw. mehrere Wurzeln."""
+    scan_filter = None
+    if args.include or args.exclude or args.max_depth is not None:
+        scan_filter = ScanFilter(args.include, args.exclude, args.max_depth)
+    if len(args.roots) == 1:
+        return FileOrganizer(
+            args.roots[0],
+            workers=args.jobs,
+            index=index,
+            scan_filter=scan_filter,
+            hooks=profiler,
+        )
+    from src.multi_root import MultiRootScanner
+
+    return MultiRootScanner(
+        args.roots, args.jobs, index=index, scan_filter=scan_filter, hooks=profiler
+    )
+
+
+def _run_action(stream: TextIO, organizer: FileOrganizer, args: "Namespace") -> bool:
+    """Führt ``--watch``, ``--organize``, ``--snapshot`` bzw. ``--du`` aus.
+
+    Returns:
+        ``True``, wenn eine dieser Aktionen ausgeführt wurde
+    """
+    if args.watch:
+        for batch in organizer.watch():
+            _write_counts(stream, batch.groups.counts)
+            stream.flush()
+    elif args.organize:
+        _organize(stream, organizer, args)
+    elif args.snapshot:
+        count = organizer.snapshot(args.snapshot)
+        stream.write(f"Snapshot mit {count} Dateien: {args.snapshot}\n")
+    elif args.du is not None:
+        _write_usage(stream, organizer.disk_usage(args.du))
+    else:
+        return False
+    return True
+
+
+def _scan(
+    organizer: "FileOrganizer | MultiRootScanner", args: "Namespace"
+) -> ScanResult:
+    """Führt den Scan für die Zusammenfassung aus, bei Bedarf mit Sniffing."""
+    if not args.sniff:
+        return organizer.scan_files(with_stat=args.stats)
+    from src.sniffer import ContentSniffer, SniffCache, default_sniff_cache_path
+
+    with SniffCache(default_sniff_cache_path()) as cache:
+        sniffer = ContentSniffer(cache, workers=max(8, args.jobs))
+        return organizer.scan_files(with_stat=args.stats, sniffer=sniffer)
+
+
+def _stream(
+    stream: TextIO, scanner: "FileOrganizer | MultiRootScanner", args: "Namespace"
+) -> None:
+    """Schreibt ``--format ndjson|csv``, bei Bedarf mit Sniffing."""
+    entries = _records(scanner, args)
+    if not args.sniff:
+        records = ((entry, entry.suffix) for entry in entries)
+        _write_records(stream, records, args.format, args.stats)
+        return
+    from src.sniffer import ContentSniffer, SniffCache, default_sniff_cache_path
+
+    with SniffCache(default_sniff_cache_path()) as cache:
+        sniffer = ContentSniffer(cache, workers=max(8, args.jobs))
+        _write_records(stream, sniffer.classify(entries), args.format, args.stats)
+
+
+def _organize(stream: TextIO, organizer: FileOrganizer, args: "Namespace") -> None:
+    """Führt ``--organize`` aus bzw. setzt ein vorhandenes Journal fort."""
+    from src.mover import execute_plan, resume_moves
+
+    if args.journal and args.journal.exists() and not args.dry_run:
+        report = resume_moves(args.journal)
+    else:
+        plan = organizer.plan_moves(args.organize, args.layout)
+        if args.dry_run:
+            for move in plan:
+                stream.write(f"{move.source} -> {move.target}\n")
+        report = execute_plan(plan, args.journal, dry_run=args.dry_run)
+    if not report.dry_run:
+        stream.write(
+            f"Verschoben: {report.moved}, übersprungen: {report.skipped}, "
+            f"fehlgeschlagen: {len(report.failed)}\n"
+        )
+    for move, error in report.failed:
+        stream.write(f"  {move.source}: {error}\n")
+
+
+def _records(
+    scanner: "FileOrganizer | MultiRootScanner", args: "Namespace"
+) -> Iterator[FileEntry]:
+    """Liefert die Einträge für ``--format``, mit ``--sort`` extern sortiert."""
+    entries = scanner.iter_files(with_stat=args.stats or args.sort in ("size", "mtime"))
+    if args.sort is None:
+        return entries
+    from src.external_sort import ExternalSorter
+
+    return ExternalSorter(args.sort, args.sort_memory * 2**20).sort(entries)
+
+
+def _write_records(
+    stream: TextIO,
+    records: Iterable[tuple[FileEntry, str]],
+    fmt: str,
+    with_stat: bool,
+) -> None:
+    """Schreibt jede Datei sofort als NDJSON- bzw. CSV-Zeile.
+
+    Es wird nichts gesammelt; der Speicherbedarf ist unabhängig von der
+    Anzahl der Dateien. Schließt der Leser die Pipe (z. B. ``head``),
+    endet die Ausgabe ohne Fehlermeldung.
+
+    Args:
+        stream: Ziel der Ausgabe
+        records: Einträge mit ihrem Gruppierungstyp (Endung oder, mit
+            ``--sniff``, erkannter Typ)
+        fmt: ``"ndjson"`` oder ``"csv"``
+        with_stat: Größe und mtime mit ausgeben
+    """
+    import csv
+    import json
+
+    fields = ["path", "type", "size", "mtime"] if with_stat else ["path", "type"]
+    try:
+        if fmt == "csv":
+            writer = csv.writer(stream, lineterminator="\n")
+            writer.writerow(fields)
+        for entry, kind in records:
+            path = _join(entry.directory, entry.name)
+            record: list[str | float | None] = [path, kind]
+            if with_stat:
+                record += [entry.size, entry.mtime]
+            if fmt == "csv":
+                writer.writerow(record)
+            else:
+                stream.write(json.dumps(dict(zip(fields, record, strict=True))) + "\n")
+        stream.flush()
+    except BrokenPipeError:
+        # Restliche gepufferte Ausgaben beim Beenden nach /dev/null leiten
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, stream.fileno())
+        os.close(devnull)
+
+
+def _write_diff(stream: TextIO, old: Path, new: Path) -> None:
+    """Gibt die Unterschiede zweier Snapshots zeilenweise aus."""
+    from src.snapshot import diff_snapshots
+
+    symbols = {"added": "+", "removed": "-", "modified": "~"}
+    totals = dict.fromkeys(symbols, 0)
+    for change in diff_snapshots(old, new):
+        totals[change.kind] += 1
+        stream.write(f"{symbols[change.kind]} {change.path}\n")
+    stream.write(
+        f"Hinzugefügt: {totals['added']}, entfernt: {totals['removed']}, "
+        f"geändert: {totals['modified']}\n"
+    )
+
+
+def _write_counts(stream: TextIO, counts: dict[str, int]) -> None:
+    """Gibt die Anzahl der Dateien je Typ aus."""
+    stream.write("Gefundene Dateitypen:\n")
+    for ext, count in sorted(counts.items()):
+        stream.write(f"  {ext or '(ohne Erweiterung)'}: {count} Dateien\n")
+
+
+def _write_statistics(stream: TextIO, statistics: ScanStatistics) -> None:
+    """Gibt Größen je Typ und Dateien je Monat aus."""
+    stream.write(f"Gesamtgröße: {statistics.total_bytes} Bytes\n")
+    for ext, size in sorted(statistics.bytes_by_type.items()):
+        stream.write(f"  {ext or '(ohne Erweiterung)'}: {size} Bytes\n")
+    stream.write("Dateien nach Monat:\n")
+    for month, count in statistics.files_by_month.items():
+        stream.write(f"  {month}: {count} Dateien\n")
+
+
+def _write_usage(stream: TextIO, report: "DiskUsageReport") -> None:
+    """Gibt die Speicherbelegung aus, jeweils absteigend nach Größe."""
+    stream.write(f"Gesamt: {report.total_bytes} Bytes in {report.files} Dateien\n")
+    sections: list[tuple[str, Iterable[tuple[str, int]]]] = [
+        ("Verzeichnisse", sorted(report.by_directory.items(), key=lambda i: -i[1])),
+        ("Größte Verzeichnisse", report.largest_directories),
+        ("Größte Dateien", report.largest_files),
+    ]
+    for title, items in sections:
+        stream.write(f"{title}:\n")
+        for path, size in items:
+            stream.write(f"  {size:>15} Bytes  {path}\n")
+
 
-    sys.stdout.write("Gefundene Dateitypen:\n")
-    for ext, paths in sorted(files.items()):
-        sys.stdout.write(f"  {ext or '(ohne Erweiterung)'}: {len(paths)} Dateien\n")
+def _write_profile(stream: TextIO, summary: ScanSummary) -> None:
+    """Gibt die Kennzahlen eines profilierten Durchlaufs aus."""
+    stream.write(
+        f"Profil: {summary.directories} Verzeichnisse, {summary.files} Dateien, "
+        f"{summary.errors} Fehler, {summary.syscalls} Dateisystemaufrufe, "
+        f"{summary.bytes_stat} Bytes per stat, {summary.elapsed:.3f} s\n"
+    )
+    stream.write("Langsamste Verzeichnisse:\n")
+    for stats in summary.slowest:
+        stream.write(
+            f"  {stats.elapsed * 1000:9.2f} ms  {stats.files:7} Dateien  "
+            f"{stats.directory}\n"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,523 @@
+"""Planung und wiederaufnehmbare Ausführung von Dateiverschiebungen."""
+
+import errno
+import filecmp
+import json
+import os
+import shutil
+import stat
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, BinaryIO, NamedTuple
+
+from src.file_organizer import FileEntry, _join
+
+LAYOUTS = ("type", "date", "type-date")
+NO_EXTENSION_DIR = "ohne_erweiterung"
+UNKNOWN_DATE_DIR = "ohne_datum"
+_PARTIAL_SUFFIX = ".partial"
+_COPY_CHUNK = 64 * 1024 * 1024
+# Fehler von link(), bei denen das Dateisystem keine harten Links kennt
+_NO_HARDLINKS = frozenset(
+    {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EMLINK, errno.ENOSYS}
+)
+
+
+class Move(NamedTuple):
+    """Eine geplante Verschiebung."""
+
+    source: str
+    target: str
+
+
+class MoveReport(NamedTuple):
+    """Ergebnis einer Ausführung."""
+
+    moved: int
+    skipped: int
+    failed: list[tuple[Move, str]]
+    dry_run: bool
+
+
+def _relative_target(entry: FileEntry, layout: str) -> list[str]:
+    """Zielunterverzeichnis einer Datei für das gewählte Layout."""
+    parts: list[str] = []
+    if layout in ("type", "type-date"):
+        parts.append(entry.suffix[1:] or NO_EXTENSION_DIR)
+    if layout in ("date", "type-date"):
+        if entry.mtime is None:
+            parts.append(UNKNOWN_DATE_DIR)
+        else:
+            date = datetime.fromtimestamp(entry.mtime, UTC)
+            parts.extend((f"{date:%Y}", f"{date:%m}"))
+    return parts
+
+
+def _unique_name(name: str, taken: set[str]) -> str:
+    """Hängt bei Namenskonflikten ``_1``, ``_2`` … vor der Erweiterung an."""
+    if name not in taken:
+        return name
+    stem, dot, suffix = name.rpartition(".")
+    if not stem:
+        stem, dot, suffix = name, "", ""
+    counter = 1
+    while f"{stem}_{counter}{dot}{suffix}" in taken:
+        counter += 1
+    return f"{stem}_{counter}{dot}{suffix}"
+
+
+def _existing_names(directory: str) -> set[str]:
+    """Namen der bereits im Zielverzeichnis vorhandenen Einträge."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def plan_moves(
+    entries: Iterable[FileEntry], target_root: str | Path, layout: str = "type"
+) -> list[Move]:
+    """Erstellt einen Verschiebeplan.
+
+    Jedes Zielverzeichnis wird höchstens einmal gelesen, um Konflikte mit
+    bereits vorhandenen Dateien zu erkennen; Konflikte innerhalb des Plans
+    und mit vorhandenen Dateien werden durch Umbenennen aufgelöst. Dateien,
+    die bereits unterhalb von ``target_root`` liegen, werden übergangen.
+
+    Args:
+        entries: Zu verschiebende Dateien (für Datumslayouts mit mtime, also
+            aus ``iter_files(with_stat=True)``)
+        target_root: Wurzel der Zielstruktur
+        layout: ``"type"``, ``"date"`` oder ``"type-date"``
+
+    Returns:
+        Liste der geplanten Verschiebungen
+
+    Raises:
+        ValueError: Bei unbekanntem Layout
+    """
+    if layout not in LAYOUTS:
+        msg = f"Unbekanntes Layout {layout!r}, erlaubt: {', '.join(LAYOUTS)}"
+        raise ValueError(msg)
+    root = os.fspath(Path(target_root).resolve())
+    root_prefix = _join(root, "")
+    resolved: dict[str, str] = {}
+    taken_by_dir: dict[str, set[str]] = {}
+    plan: list[Move] = []
+    for entry in entries:
+        parent = resolved.get(entry.directory)
+        if parent is None:
+            parent = resolved[entry.directory] = os.fspath(
+                Path(entry.directory).resolve()
+            )
+        if _join(parent, "").startswith(root_prefix):
+            continue
+        source = _join(parent, entry.name)
+        directory = os.fspath(Path(root, *_relative_target(entry, layout)))
+        taken = taken_by_dir.get(directory)
+        if taken is None:
+            taken = taken_by_dir[directory] = _existing_names(directory)
+        name = _unique_name(entry.name, taken)
+        taken.add(name)
+        plan.append(Move(source, _join(directory, name)))
+    return plan
+
+
+class MoveJournal:
+    """Write-Ahead-Journal eines Verschiebeplans (JSON Lines).
+
+    Die erste Zeile je Verschiebung hält den Plan fest, bevor irgendeine
+    Datei angefasst wird; eine Schlusszeile ``{"planned": n}`` markiert den
+    vollständig geschriebenen Plan. Nach jeder Charge folgt eine Zeile mit
+    den Indizes der abgeschlossenen Verschiebungen. Jede Zeile wird mit
+    ``fsync`` auf die Platte geschrieben, bevor die nächste Charge beginnt.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialisiert das Journal (ohne es zu öffnen).
+
+        Args:
+            path: Pfad der Journaldatei
+        """
+        self.path = Path(path)
+        self._file: IO[str] | None = None
+
+    def _append(self, record: object) -> None:
+        if self._file is None:
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def create(self, plan: list[Move]) -> None:
+        """Schreibt den Plan in ein neues Journal.
+
+        Raises:
+            FileExistsError: Wenn bereits ein Journal existiert
+        """
+        with self.path.open("x", encoding="utf-8") as file:
+            for index, move in enumerate(plan):
+                file.write(json.dumps([index, *move], ensure_ascii=False) + "\n")
+            file.write(json.dumps({"planned": len(plan)}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def load(self) -> tuple[list[Move], set[int], bool]:
+        """Liest Plan und Fortschritt.
+
+        Eine durch einen Absturz abgeschnittene letzte Zeile wird ignoriert.
+
+        Returns:
+            Tupel aus Plan, Indizes der erledigten Verschiebungen und ob der
+            Plan vollständig abgeschlossen wurde
+
+        Raises:
+            ValueError: Wenn die Schlusszeile des Plans fehlt, der Plan also
+                beim Schreiben abgebrochen wurde
+        """
+        plan: list[Move] = []
+        done: set[int] = set()
+        planned = complete = False
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if isinstance(record, list):
+                    plan.append(Move(record[1], record[2]))
+                elif "planned" in record:
+                    planned = record["planned"] == len(plan)
+                elif "done" in record:
+                    done.update(record["done"])
+                else:
+                    complete = record["complete"]
+        if not planned:
+            msg = f"Journal {self.path} enthält keinen vollständigen Plan"
+            raise ValueError(msg)
+        return plan, done, complete
+
+    def mark_done(self, indices: list[int]) -> None:
+        """Vermerkt abgeschlossene Verschiebungen."""
+        if indices:
+            self._append({"done": indices})
+
+    def mark_complete(self) -> None:
+        """Vermerkt den Abschluss des gesamten Plans."""
+        self._append({"complete": True})
+
+    def close(self) -> None:
+        """Schließt die Journaldatei."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _copy_loop(copy: Callable[[int], int], copied: int, size: int) -> int:
+    """Ruft eine Zero-Copy-Funktion auf, bis ``size`` Bytes kopiert sind.
+
+    Returns:
+        Neue Position; bei nicht unterstützter Funktion (z. B. ``EXDEV``)
+        die Position, an der ein anderer Weg übernehmen muss
+    """
+    try:
+        while copied < size:
+            count = copy(min(_COPY_CHUNK, size - copied))
+            if not count:
+                break
+            copied += count
+    except OSError:
+        pass
+    return copied
+
+
+def _copy_contents(source: BinaryIO, target: BinaryIO) -> None:
+    """Kopiert Dateiinhalte möglichst ohne Umweg über den Userspace.
+
+    Reihenfolge: ``copy_file_range`` (Reflink bzw. serverseitige Kopie),
+    dann ``sendfile``, zuletzt ``copyfileobj``. Alle drei arbeiten mit den
+    Dateipositionen der Deskriptoren, sodass jeder Weg dort fortsetzt, wo
+    der vorherige aufgehört hat.
+    """
+    source_fd, target_fd = source.fileno(), target.fileno()
+    size = os.fstat(source_fd).st_size
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        copied = _copy_loop(
+            lambda count: os.copy_file_range(source_fd, target_fd, count), copied, size
+        )
+    if copied < size and hasattr(os, "sendfile"):
+        copied = _copy_loop(
+            lambda count: os.sendfile(target_fd, source_fd, None, count), copied, size
+        )
+    if copied < size:
+        shutil.copyfileobj(source, target, _COPY_CHUNK)
+
+
+def _place(source: Path, target: Path) -> None:
+    """Benennt ``source`` in ``target`` um, ohne ein Ziel zu überschreiben.
+
+    ``link`` schlägt atomar mit ``EEXIST`` fehl, wenn das Ziel existiert;
+    erst danach wird die Quelle entfernt. Nur auf Dateisystemen ohne harte
+    Links wird auf ``rename`` nach vorheriger Prüfung zurückgegriffen.
+
+    Raises:
+        FileExistsError: Wenn das Ziel bereits existiert
+    """
+    try:
+        os.link(source, target, follow_symlinks=False)
+    except FileExistsError:
+        raise FileExistsError(errno.EEXIST, "Ziel existiert bereits", target) from None
+    except OSError as error:
+        if error.errno not in _NO_HARDLINKS:
+            raise
+        if os.path.lexists(target):
+            raise FileExistsError(
+                errno.EEXIST, "Ziel existiert bereits", target
+            ) from None
+        source.rename(target)
+        return
+    source.unlink()
+
+
+def _transfer_symlink(source: Path, target: Path, resume: bool) -> bool:
+    """Legt einen symbolischen Link am Ziel neu an und entfernt die Quelle.
+
+    Relative Links werden so umgerechnet, dass sie vom neuen Ort aus auf
+    dasselbe Ziel zeigen; absolute Links bleiben unverändert.
+
+    Returns:
+        ``True`` bei einer tatsächlichen Verschiebung, ``False`` wenn sie
+        bereits zuvor abgeschlossen war
+    """
+    link = source.readlink()
+    if not link.is_absolute():
+        link = Path(os.path.relpath(source.parent / link, target.parent))
+    if resume and target.is_symlink() and target.readlink() == link:
+        source.unlink()
+        return False
+    try:
+        target.symlink_to(link)
+    except FileExistsError:
+        raise FileExistsError(errno.EEXIST, "Ziel existiert bereits", target) from None
+    source.unlink()
+    return True
+
+
+def _transfer(move: Move, target_device: int, resume: bool) -> bool:
+    """Führt eine einzelne Verschiebung aus.
+
+    Args:
+        move: Quelle und Ziel
+        target_device: Gerät des Zielverzeichnisses
+        resume: Die Verschiebung kann bei einem früheren Lauf bereits
+            (teilweise) ausgeführt worden sein
+
+    Returns:
+        ``True`` bei einer tatsächlichen Verschiebung, ``False`` wenn sie
+        bereits zuvor abgeschlossen war
+
+    Raises:
+        OSError: Bei Fehlern, insbesondere ``FileExistsError``, wenn das
+            Ziel bereits mit anderem Inhalt existiert
+    """
+    source, target = Path(move.source), Path(move.target)
+    try:
+        source_stat = source.lstat()
+    except FileNotFoundError:
+        if resume and os.path.lexists(target):
+            return False
+        raise
+    if stat.S_ISLNK(source_stat.st_mode):
+        return _transfer_symlink(source, target, resume)
+
+    if resume and os.path.lexists(target):
+        if filecmp.cmp(source, target, shallow=False):
+            source.unlink()
+            return False
+        raise FileExistsError(errno.EEXIST, "Ziel existiert bereits", move.target)
+
+    if source_stat.st_dev == target_device:
+        _place(source, target)
+        return True
+
+    if os.path.lexists(target):
+        raise FileExistsError(errno.EEXIST, "Ziel existiert bereits", move.target)
+    partial = Path(move.target + _PARTIAL_SUFFIX)
+    with (
+        source.open("rb", buffering=0) as source_file,
+        partial.open("wb", buffering=0) as target_file,
+    ):
+        _copy_contents(source_file, target_file)
+    shutil.copystat(source, partial)
+    try:
+        _place(partial, target)
+    except FileExistsError:
+        partial.unlink()
+        raise
+    source.unlink()
+    return True
+
+
+def _batches(indices: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(indices), size):
+        yield indices[start : start + size]
+
+
+class _BatchRunner:
+    """Verteilt Chargen auf einen Thread-Pool je Zielgerät."""
+
+    def __init__(self, plan: list[Move], workers_per_device: int, resume: bool) -> None:
+        self.plan = plan
+        self.workers_per_device = workers_per_device
+        self.resume = resume
+        self.pools: dict[int, ThreadPoolExecutor] = {}
+        self.devices: dict[str, int] = {}
+        self.moved = self.skipped = 0
+        self.failed: list[tuple[Move, str]] = []
+
+    def _target_device(self, move: Move) -> int:
+        """Legt das Zielverzeichnis bei Bedarf an und liefert dessen Gerät."""
+        directory = os.fspath(Path(move.target).parent)
+        device = self.devices.get(directory)
+        if device is None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            device = self.devices[directory] = Path(directory).stat().st_dev
+        return device
+
+    def run(self, batch: list[int]) -> list[int]:
+        """Führt eine Charge aus und wartet auf deren Abschluss.
+
+        Returns:
+            Sortierte Indizes der erfolgreich abgeschlossenen Verschiebungen
+        """
+        futures: dict[Future[bool], int] = {}
+        for index in batch:
+            move = self.plan[index]
+            try:
+                device = self._target_device(move)
+            except OSError as error:
+                self.failed.append((move, str(error)))
+                continue
+            pool = self.pools.get(device)
+            if pool is None:
+                pool = self.pools[device] = ThreadPoolExecutor(self.workers_per_device)
+            futures[pool.submit(_transfer, move, device, self.resume)] = index
+
+        completed: list[int] = []
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                moved = future.result()
+            except OSError as error:
+                self.failed.append((self.plan[index], str(error)))
+                continue
+            self.moved += moved
+            self.skipped += not moved
+            completed.append(index)
+        return sorted(completed)
+
+    def shutdown(self) -> None:
+        """Beendet alle Thread-Pools."""
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+def _execute(
+    runner: _BatchRunner,
+    journal: MoveJournal | None,
+    done: set[int],
+    batch_size: int,
+) -> MoveReport:
+    """Gemeinsame Ausführung für ``execute_plan`` und ``resume_moves``."""
+    pending = [index for index in range(len(runner.plan)) if index not in done]
+    runner.skipped = len(runner.plan) - len(pending)
+    try:
+        for batch in _batches(pending, batch_size):
+            completed = runner.run(batch)
+            if journal is not None:
+                journal.mark_done(completed)
+        if journal is not None and not runner.failed:
+            journal.mark_complete()
+    finally:
+        runner.shutdown()
+        if journal is not None:
+            journal.close()
+    return MoveReport(runner.moved, runner.skipped, runner.failed, dry_run=False)
+
+
+def execute_plan(
+    plan: list[Move],
+    journal_path: str | Path | None = None,
+    batch_size: int = 1000,
+    workers_per_device: int = 4,
+    dry_run: bool = False,
+) -> MoveReport:
+    """Führt einen Verschiebeplan in Chargen aus.
+
+    Auf demselben Gerät wird per ``link`` und ``unlink`` verschoben, sodass
+    ein zwischenzeitlich entstandenes Ziel nie überschrieben wird. Über
+    Gerätegrenzen hinweg wird per ``copy_file_range``/``sendfile`` in eine
+    temporäre Datei kopiert, diese ebenso ans Ziel gebracht und erst dann
+    die Quelle gelöscht. Symbolische Links werden am Ziel neu angelegt.
+    Jedes Zielgerät erhält einen eigenen Thread-Pool mit
+    ``workers_per_device`` Threads.
+
+    Args:
+        plan: Auszuführende Verschiebungen
+        journal_path: Neues Write-Ahead-Journal für ``resume_moves``
+            (optional)
+        batch_size: Anzahl der Verschiebungen je Charge und Journal-Eintrag
+        workers_per_device: Parallele Verschiebungen je Zielgerät
+        dry_run: Nur berichten, keine Datei und kein Journal anfassen
+
+    Returns:
+        Bericht über verschobene, übersprungene und fehlgeschlagene Dateien
+
+    Raises:
+        FileExistsError: Wenn unter ``journal_path`` bereits ein Journal
+            liegt (dann ``resume_moves`` verwenden)
+    """
+    if dry_run:
+        return MoveReport(0, len(plan), [], dry_run=True)
+    journal = None
+    if journal_path is not None:
+        journal = MoveJournal(journal_path)
+        journal.create(plan)
+    runner = _BatchRunner(plan, workers_per_device, resume=False)
+    return _execute(runner, journal, set(), batch_size)
+
+
+def resume_moves(
+    journal_path: str | Path,
+    batch_size: int = 1000,
+    workers_per_device: int = 4,
+) -> MoveReport:
+    """Setzt einen unterbrochenen Plan anhand seines Journals fort.
+
+    Bereits erledigte Verschiebungen werden übersprungen. Für Einträge der
+    unterbrochenen Charge wird geprüft, ob sie schon ausgeführt wurden:
+    Fehlt die Quelle und existiert das Ziel, gilt die Verschiebung als
+    erledigt; existieren beide mit identischem Inhalt (Abbruch zwischen
+    Kopieren und Löschen), wird nur noch die Quelle entfernt.
+
+    Args:
+        journal_path: Journal eines früheren ``execute_plan``-Aufrufs
+        batch_size: Anzahl der Verschiebungen je Charge
+        workers_per_device: Parallele Verschiebungen je Zielgerät
+
+    Returns:
+        Bericht über den fortgesetzten Lauf
+
+    Raises:
+        ValueError: Wenn der Plan im Journal unvollständig ist
+    """
+    journal = MoveJournal(journal_path)
+    plan, done, complete = journal.load()
+    if complete:
+        return MoveReport(0, len(plan), [], dry_run=False)
+    runner = _BatchRunner(plan, workers_per_device, resume=True)
+    return _execute(runner, journal, done, batch_size)
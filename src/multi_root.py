@@ -0,0 +1,213 @@
+"""Scan mehrerer Wurzeln mit einem Worker-Budget je physischem Gerät."""
+
+import os
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, TypedDict, Unpack
+
+from src.file_organizer import FileEntry, FileOrganizer
+from src.scan_result import ScanResult
+
+if TYPE_CHECKING:
+    from src.scan_filter import ScanFilter
+    from src.scan_hooks import ScanHooks
+    from src.scan_index import ScanIndex
+    from src.sniffer import ContentSniffer
+
+_SYS_BLOCK = Path("/sys/dev/block")
+_CHUNK = 1024
+_QUEUE_CHUNKS = 16
+_POLL_SECONDS = 0.1
+
+# Block von Dateien, Fehler eines Geräts oder Ende eines Geräts (None)
+_Item = list[FileEntry] | Exception | None
+
+
+class OrganizerOptions(TypedDict, total=False):
+    """Optionen, die an jeden ``FileOrganizer`` weitergereicht werden."""
+
+    index: "ScanIndex | None"
+    scan_filter: "ScanFilter | None"
+    hooks: "ScanHooks | None"
+
+
+def device_key(path: str | Path) -> str:
+    """Ermittelt das physische Gerät, auf dem ``path`` liegt.
+
+    Unter Linux wird ``st_dev`` über ``/sys/dev/block`` aufgelöst;
+    Partitionen werden dabei ihrer Platte zugeordnet, sodass z. B.
+    ``sda1`` und ``sda2`` denselben Schlüssel ``sda`` erhalten. Ohne
+    Eintrag in ``/sys`` (Netzlaufwerke, tmpfs, overlayfs) dient
+    ``major:minor`` als Schlüssel.
+
+    Args:
+        path: Vorhandene Datei oder vorhandenes Verzeichnis
+
+    Returns:
+        Gerätename wie ``"sda"`` bzw. ``"nvme0n1"`` oder ``"major:minor"``
+
+    Raises:
+        OSError: Wenn ``path`` nicht existiert
+    """
+    device = Path(path).stat().st_dev
+    if not hasattr(os, "major"):  # pragma: no cover - nur Windows
+        return str(device)
+    number = f"{os.major(device)}:{os.minor(device)}"
+    try:
+        resolved = (_SYS_BLOCK / number).resolve(strict=True)
+    except OSError:
+        return number
+    if (resolved / "partition").exists():
+        resolved = resolved.parent
+    return resolved.name
+
+
+def _outermost(roots: Iterable[str | Path]) -> list[Path]:
+    """Entfernt doppelte und in anderen Wurzeln enthaltene Wurzeln."""
+    kept: list[tuple[Path, Path]] = []
+    for resolved, root in sorted((Path(root).resolve(), Path(root)) for root in roots):
+        if not any(resolved.is_relative_to(parent) for parent, _ in kept):
+            kept.append((resolved, root))
+    return [root for _, root in kept]
+
+
+class MultiRootScanner:
+    """Scannt mehrere Wurzeln, gruppiert nach physischem Gerät.
+
+    Jedes Gerät erhält einen eigenen Koordinator-Thread und ein eigenes
+    Worker-Budget: Die Wurzeln eines Geräts werden nacheinander mit
+    ``FileOrganizer(root, workers=budget)`` gelesen, verschiedene Geräte
+    laufen parallel. Eine langsame Festplatte bremst so keine SSD aus,
+    und ein Gerät wird nie mit mehr gleichzeitigen Zugriffen belastet als
+    sein Budget erlaubt.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str | Path],
+        workers_per_device: int = 4,
+        device_workers: Mapping[str, int] | None = None,
+        **options: Unpack[OrganizerOptions],
+    ) -> None:
+        """Ordnet die Wurzeln ihren Geräten zu.
+
+        Doppelte und in anderen Wurzeln enthaltene Wurzeln werden nur
+        einmal gescannt.
+
+        Args:
+            roots: Zu scannende Verzeichnisse
+            workers_per_device: Standardbudget je Gerät
+            device_workers: Abweichende Budgets je Geräteschlüssel (siehe
+                ``device_key``), z. B. ``{"sda": 1, "nvme0n1": 16}``
+            **options: ``index``, ``scan_filter`` und ``hooks`` für jeden
+                ``FileOrganizer``; ``scan_filter`` gilt relativ zur
+                jeweiligen Wurzel
+
+        Raises:
+            ValueError: Wenn ein Budget kleiner als 1 ist
+            OSError: Wenn eine Wurzel nicht existiert
+        """
+        self.workers_per_device = workers_per_device
+        self.device_workers = dict(device_workers or {})
+        for device, workers in [("", workers_per_device), *self.device_workers.items()]:
+            if workers < 1:
+                name = f" für {device}" if device else ""
+                msg = f"Worker-Budget{name} muss mindestens 1 sein, nicht {workers}"
+                raise ValueError(msg)
+        self.options = options
+        self.groups: dict[str, list[Path]] = {}
+        for root in _outermost(roots):
+            self.groups.setdefault(device_key(root), []).append(root)
+
+    def budget(self, device: str) -> int:
+        """Liefert das Worker-Budget eines Geräts."""
+        return self.device_workers.get(device, self.workers_per_device)
+
+    def iter_files(self, with_stat: bool = False) -> Iterator[FileEntry]:
+        """Durchläuft alle Wurzeln, je Gerät parallel.
+
+        Die Geräte liefern ihre Dateien in Blöcken über eine begrenzte
+        Warteschlange; ein langsamer Verbraucher hält die Geräte-Threads
+        an, statt den Speicher zu füllen. Innerhalb einer Wurzel bleibt die
+        Reihenfolge von ``FileOrganizer.iter_files`` erhalten, zwischen
+        Geräten sind die Blöcke verschränkt. Wird der Generator geschlossen,
+        beenden sich alle Geräte-Threads nach dem aktuellen Block.
+
+        Args:
+            with_stat: Größe und mtime je Datei mitliefern
+
+        Yields:
+            Ein ``FileEntry`` je gefundener Datei
+        """
+        results: queue.Queue[_Item] = queue.Queue(_QUEUE_CHUNKS)
+        stop = threading.Event()
+
+        def put(item: _Item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=_POLL_SECONDS)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        def scan_device(device: str) -> None:
+            try:
+                self._scan_device(device, with_stat, put)
+            except Exception as error:  # an den Verbraucher weiterreichen
+                put(error)
+                return
+            put(None)
+
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, len(self.groups)), thread_name_prefix="device"
+        )
+        try:
+            for device in self.groups:
+                pool.submit(scan_device, device)
+            remaining = len(self.groups)
+            while remaining:
+                item = results.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+        finally:
+            stop.set()
+            pool.shutdown(wait=True)
+
+    def _scan_device(
+        self, device: str, with_stat: bool, put: Callable[[_Item], bool]
+    ) -> None:
+        """Liest die Wurzeln eines Geräts nacheinander mit dessen Budget."""
+        for root in self.groups[device]:
+            organizer = FileOrganizer(root, workers=self.budget(device), **self.options)
+            entries = organizer.iter_files(with_stat)
+            while chunk := list(islice(entries, _CHUNK)):
+                if not put(chunk):
+                    return
+
+    def scan_files(
+        self, with_stat: bool = False, sniffer: "ContentSniffer | None" = None
+    ) -> ScanResult:
+        """Scannt alle Wurzeln und gruppiert die Dateien gemeinsam nach Typ.
+
+        Args:
+            with_stat: Größe und mtime je Datei mitspeichern
+            sniffer: Typ anhand der ersten Bytes bestimmen (optional)
+
+        Returns:
+            Ein gemeinsames Ergebnis über alle Wurzeln
+        """
+        if sniffer is None:
+            return ScanResult.from_entries(self.iter_files(with_stat), with_stat)
+        result = ScanResult(with_stat)
+        for entry, kind in sniffer.classify(self.iter_files(with_stat)):
+            result.append(entry.directory, entry.name, kind, entry.size, entry.mtime)
+        return result
@@ -0,0 +1,110 @@
+"""Vorab kompilierte Include-/Exclude-Filter für den Verzeichnisdurchlauf."""
+
+import os
+import re
+from collections.abc import Iterable
+from fnmatch import translate
+
+
+def _compile(patterns: list[str]) -> re.Pattern[str] | None:
+    """Fasst Glob-Muster zu einem einzigen regulären Ausdruck zusammen."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{translate(pattern)})" for pattern in patterns))
+
+
+class ScanFilter:
+    """Entscheidet während des Durchlaufs, welche Einträge besucht werden.
+
+    Muster ohne ``/`` gelten für den Namen eines Eintrags auf jeder Ebene
+    (``node_modules``, ``*.pyc``), Muster mit ``/`` für den Pfad relativ
+    zum Quellverzeichnis (``docs/_build``, ``src/*.py``). Alle Muster einer
+    Art werden einmalig zu einem regulären Ausdruck kompiliert, sodass je
+    Eintrag höchstens zwei Vergleiche anfallen.
+
+    Ausschlüsse gelten für Dateien und Verzeichnisse; ein ausgeschlossenes
+    Verzeichnis wird gar nicht erst gelesen. Einschlüsse gelten nur für
+    Dateien, damit der Durchlauf passende Dateien in beliebiger Tiefe findet.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        max_depth: int | None = None,
+    ) -> None:
+        """Kompiliert die Muster.
+
+        Args:
+            include: Nur Dateien aufnehmen, die auf eines der Muster passen
+                (leer = alle)
+            exclude: Dateien und Verzeichnisse, die übersprungen werden
+            max_depth: Maximale Verzeichnistiefe unterhalb des
+                Quellverzeichnisses (0 = nur dessen eigene Dateien,
+                ``None`` = unbegrenzt)
+
+        Raises:
+            ValueError: Wenn ``max_depth`` negativ ist
+        """
+        if max_depth is not None and max_depth < 0:
+            msg = f"max_depth darf nicht negativ sein, nicht {max_depth}"
+            raise ValueError(msg)
+        include, exclude = list(include), list(exclude)
+        self.max_depth = max_depth
+        self._include_name = _compile([p for p in include if "/" not in p])
+        self._include_path = _compile([p for p in include if "/" in p])
+        self._exclude_name = _compile([p for p in exclude if "/" not in p])
+        self._exclude_path = _compile([p for p in exclude if "/" in p])
+
+    @staticmethod
+    def _path(relative_dir: str, name: str) -> str:
+        """Relativer Pfad in ``/``-Schreibweise, wie ihn die Muster erwarten."""
+        if not relative_dir:
+            return name
+        if os.sep != "/":  # pragma: no cover - nur Windows
+            relative_dir = relative_dir.replace(os.sep, "/")
+        return f"{relative_dir}/{name}"
+
+    def _excluded(self, relative_dir: str, name: str) -> bool:
+        if self._exclude_name is not None and self._exclude_name.match(name):
+            return True
+        return self._exclude_path is not None and bool(
+            self._exclude_path.match(self._path(relative_dir, name))
+        )
+
+    def keep_file(self, relative_dir: str, name: str) -> bool:
+        """Prüft, ob eine Datei aufgenommen wird.
+
+        Args:
+            relative_dir: Elternverzeichnis relativ zum Quellverzeichnis
+                (``""`` für das Quellverzeichnis selbst)
+            name: Dateiname
+
+        Returns:
+            ``True``, wenn die Datei zum Ergebnis gehört
+        """
+        if self._excluded(relative_dir, name):
+            return False
+        if self._include_name is None and self._include_path is None:
+            return True
+        if self._include_name is not None and self._include_name.match(name):
+            return True
+        return self._include_path is not None and bool(
+            self._include_path.match(self._path(relative_dir, name))
+        )
+
+    def keep_dir(self, relative_dir: str, name: str) -> bool:
+        """Prüft, ob ein Unterverzeichnis betreten wird.
+
+        Args:
+            relative_dir: Elternverzeichnis relativ zum Quellverzeichnis
+            name: Name des Unterverzeichnisses
+
+        Returns:
+            ``True``, wenn das Verzeichnis gelesen werden soll
+        """
+        if self.max_depth is not None:
+            depth = relative_dir.count(os.sep) + 2 if relative_dir else 1
+            if depth > self.max_depth:
+                return False
+        return not self._excluded(relative_dir, name)
@@ -0,0 +1,110 @@
+"""Hooks und Profiling für den Verzeichnisdurchlauf."""
+
+import heapq
+import threading
+import time
+from typing import NamedTuple
+
+
+class DirectoryStats(NamedTuple):
+    """Messwerte für ein einzelnes gelesenes Verzeichnis.
+
+    ``syscalls`` zählt die vom Durchlauf ausgelösten Dateisystemaufrufe:
+    ein ``scandir`` je tatsächlich gelesenem Verzeichnis, ein ``stat`` je
+    Datei (mit ``with_stat``) und ein ``stat`` des Verzeichnisses bei
+    aktivem Index.
+    """
+
+    directory: str
+    files: int
+    subdirs: int
+    elapsed: float
+    syscalls: int
+    bytes_stat: int
+
+
+class ScanHooks:
+    """Basisklasse für Rückrufe während des Durchlaufs.
+
+    Alle Methoden sind leer; Unterklassen überschreiben nur, was sie
+    benötigen. Mit ``workers > 1`` werden die Methoden aus mehreren
+    Threads gleichzeitig aufgerufen.
+    """
+
+    def on_dir_enter(self, directory: str) -> None:
+        """Ein Verzeichnis wird gelesen."""
+
+    def on_dir_done(self, stats: DirectoryStats) -> None:
+        """Ein Verzeichnis ist fertig gelesen (nach Filterung)."""
+
+    def on_error(self, directory: str, error: OSError) -> None:
+        """Ein Verzeichnis konnte nicht gelesen werden und wird übersprungen."""
+
+
+class ScanSummary(NamedTuple):
+    """Zusammenfassung eines profilierten Durchlaufs."""
+
+    directories: int
+    files: int
+    errors: int
+    syscalls: int
+    bytes_stat: int
+    elapsed: float
+    slowest: list[DirectoryStats]
+
+
+class ScanProfiler(ScanHooks):
+    """Sammelt Kennzahlen und die langsamsten Verzeichnisse.
+
+    Für die langsamsten Verzeichnisse wird nur ein Heap der Größe ``top``
+    gehalten, der Speicherbedarf ist also unabhängig von der Baumgröße.
+    """
+
+    def __init__(self, top: int = 10) -> None:
+        """Initialisiert den Profiler.
+
+        Args:
+            top: Anzahl der langsamsten Verzeichnisse in der Zusammenfassung
+        """
+        self.top = top
+        self._lock = threading.Lock()
+        self._slowest: list[tuple[float, str, DirectoryStats]] = []
+        self._started = time.perf_counter()
+        self.directories = self.files = self.errors = 0
+        self.syscalls = self.bytes_stat = 0
+
+    def on_dir_done(self, stats: DirectoryStats) -> None:
+        """Verbucht die Messwerte eines Verzeichnisses."""
+        with self._lock:
+            self.directories += 1
+            self.files += stats.files
+            self.syscalls += stats.syscalls
+            self.bytes_stat += stats.bytes_stat
+            item = (stats.elapsed, stats.directory, stats)
+            if len(self._slowest) < self.top:
+                heapq.heappush(self._slowest, item)
+            elif self._slowest and item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def on_error(self, directory: str, error: OSError) -> None:  # noqa: ARG002
+        """Zählt nicht lesbare Verzeichnisse."""
+        with self._lock:
+            self.errors += 1
+
+    def summary(self) -> ScanSummary:
+        """Liefert die bisher gesammelten Kennzahlen.
+
+        Returns:
+            Zusammenfassung; ``slowest`` ist absteigend nach Dauer sortiert
+        """
+        with self._lock:
+            slowest = [stats for *_, stats in sorted(self._slowest, reverse=True)]
+            return ScanSummary(
+                directories=self.directories,
+                files=self.files,
+                errors=self.errors,
+                syscalls=self.syscalls,
+                bytes_stat=self.bytes_stat,
+                elapsed=time.perf_counter() - self._started,
+                slowest=slowest,
+            )
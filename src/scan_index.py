@@ -0,0 +1,213 @@
+"""Persistenter Verzeichnisindex für inkrementelle Scans."""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+# Verzeichnisse, die jünger als dieses Fenster sind, werden nicht indiziert:
+# Eine Änderung im selben Zeitstempel-Takt wäre sonst nicht erkennbar.
+RACY_WINDOW_NS = 2_000_000_000
+
+_SEPARATOR = "\0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    subdirs TEXT NOT NULL,
+    generation INTEGER NOT NULL
+)
+"""
+
+
+def default_index_path() -> Path:
+    """Liefert den Standardpfad des Index im Cache-Verzeichnis des Benutzers.
+
+    Returns:
+        ``$XDG_CACHE_HOME/file_organizer/index.sqlite`` bzw.
+        ``~/.cache/file_organizer/index.sqlite``
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "file_organizer" / "index.sqlite"
+
+
+def _key(directory: str) -> str:
+    """Absoluter Pfad als Schlüssel, damit relative Wurzeln eindeutig bleiben."""
+    return os.fspath(Path(directory).absolute())
+
+
+def _split(names: str) -> list[str]:
+    """Zerlegt eine gespeicherte Namensliste."""
+    return names.split(_SEPARATOR) if names else []
+
+
+class ScanIndex:
+    """SQLite-Index der Verzeichnisinhalte, geschlüsselt nach Pfad, mtime und Inode.
+
+    Ein Verzeichnis muss nur dann neu gelesen werden, wenn sich seine
+    Änderungszeit oder sein Inode geändert hat; das Anlegen, Löschen oder
+    Umbenennen eines Eintrags aktualisiert immer die mtime des Elternordners.
+    Der Index ist threadsicher und kann daher auch mit ``workers > 1``
+    verwendet werden.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Öffnet (oder erstellt) den Index.
+
+        Args:
+            path: Pfad der SQLite-Datei; fehlende Elternverzeichnisse
+                werden angelegt
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._generation = 0
+        self._active_scans = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> Self:
+        """Kontextmanager-Eintritt."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Schließt den Index."""
+        self.close()
+
+    def close(self) -> None:
+        """Schreibt offene Änderungen und schließt die Datenbank."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def begin_scan(self) -> None:
+        """Beginnt einen neuen Scan-Durchlauf (neue Generation).
+
+        Überlappende Scans verschiedener Wurzeln (z. B. mit
+        ``src.multi_root``) teilen sich eine Generation, damit ein später
+        begonnener Scan die bereits besuchten Einträge eines anderen nicht
+        entwertet.
+        """
+        with self._lock:
+            self._active_scans += 1
+            if self._active_scans > 1:
+                return
+            row = self._connection.execute(
+                "SELECT COALESCE(MAX(generation), 0) FROM directories"
+            ).fetchone()
+            self._generation = int(row[0]) + 1
+            self.hits = 0
+            self.misses = 0
+
+    def lookup(
+        self, directory: str, stat_result: os.stat_result
+    ) -> tuple[list[str], list[str]] | None:
+        """Sucht die gespeicherte Auflistung eines unveränderten Verzeichnisses.
+
+        Args:
+            directory: Verzeichnispfad
+            stat_result: Aktuelles ``stat`` des Verzeichnisses
+
+        Returns:
+            Tupel aus Datei- und Unterverzeichnisnamen oder ``None``, wenn
+            das Verzeichnis neu gelesen werden muss
+        """
+        key = _key(directory)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT mtime_ns, inode, files, subdirs FROM directories"
+                " WHERE path = ?",
+                (key,),
+            ).fetchone()
+            if (
+                row is None
+                or row[0] != stat_result.st_mtime_ns
+                or row[1] != stat_result.st_ino
+            ):
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE directories SET generation = ? WHERE path = ?",
+                (self._generation, key),
+            )
+            self.hits += 1
+        return _split(row[2]), _split(row[3])
+
+    def store(
+        self,
+        directory: str,
+        stat_result: os.stat_result,
+        files: list[str],
+        subdirs: list[str],
+    ) -> None:
+        """Speichert die Auflistung eines frisch gelesenen Verzeichnisses.
+
+        Verzeichnisse, deren mtime innerhalb von ``RACY_WINDOW_NS`` liegt,
+        werden nicht gespeichert und beim nächsten Scan erneut gelesen.
+
+        Args:
+            directory: Verzeichnispfad
+            stat_result: ``stat`` des Verzeichnisses vor dem Lesen
+            files: Namen der enthaltenen Dateien
+            subdirs: Namen der enthaltenen Unterverzeichnisse
+        """
+        if time.time_ns() - stat_result.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    _key(directory),
+                    stat_result.st_mtime_ns,
+                    stat_result.st_ino,
+                    _SEPARATOR.join(files),
+                    _SEPARATOR.join(subdirs),
+                    self._generation,
+                ),
+            )
+
+    def finish_scan(self, root: str) -> None:
+        """Schließt einen vollständigen Scan ab.
+
+        Entfernt Einträge unterhalb von ``root``, die in diesem Durchlauf
+        nicht mehr besucht wurden (gelöschte Verzeichnisse), und schreibt
+        alle Änderungen in die Datenbank.
+
+        Args:
+            root: Wurzelverzeichnis des Scans
+        """
+        root = _key(root)
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM directories WHERE generation != ?"
+                " AND (path = ? OR substr(path, 1, ?) = ?)",
+                (self._generation, root, len(prefix), prefix),
+            )
+            self._connection.commit()
+            self._active_scans = max(0, self._active_scans - 1)
+
+    def abort_scan(self) -> None:
+        """Beendet einen abgebrochenen Scan ohne Bereinigung.
+
+        Die bis dahin gespeicherten Auflistungen bleiben gültig und werden
+        geschrieben; da nicht alle Verzeichnisse besucht wurden, wird aber
+        nichts entfernt.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._active_scans = max(0, self._active_scans - 1)
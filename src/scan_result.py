@@ -0,0 +1,254 @@
+"""Kompakte, spaltenbasierte Darstellung von Scan-Ergebnissen."""
+
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import UTC, tzinfo
+from pathlib import Path
+from typing import TYPE_CHECKING, overload
+
+from src.scan_stats import ScanStatistics, compute_statistics
+
+if TYPE_CHECKING:
+    from src.file_organizer import FileEntry
+
+_ENCODING = sys.getfilesystemencoding()
+_ERRORS = sys.getfilesystemencodeerrors()
+_MAX_UINT8 = 2**8 - 1
+# Namen werden in Blöcken zu 2**_BLOCK_BITS Zeilen als ``bytes`` abgelegt
+_BLOCK_BITS = 6
+_BLOCK_MASK = (1 << _BLOCK_BITS) - 1
+
+
+def _append_small(column: "array[int]", value: int) -> "array[int]":
+    """Hängt ``value`` an eine 8-Bit-Spalte an und verbreitert sie bei Bedarf."""
+    if value > _MAX_UINT8 and column.typecode == "B":
+        column = array("I", column)
+    column.append(value)
+    return column
+
+
+class PathList(Sequence[Path]):
+    """Unveränderliche Sicht auf die Dateien eines Typs.
+
+    Die ``Path``-Objekte werden erst beim Zugriff erzeugt; gespeichert sind
+    nur die Zeilennummern im zugehörigen ``ScanResult``.
+    """
+
+    def __init__(self, result: "ScanResult", rows: "array[int]") -> None:
+        """Initialisiert die Sicht.
+
+        Args:
+            result: Zugrunde liegendes Scan-Ergebnis
+            rows: Zeilennummern der Dateien dieses Typs
+        """
+        self._result = result
+        self._rows = rows
+
+    def __len__(self) -> int:
+        """Anzahl der Dateien."""
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> Path: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Path]: ...
+
+    def __getitem__(self, index: int | slice) -> Path | list[Path]:
+        """Erzeugt den Pfad (bzw. die Pfade) an der gegebenen Position."""
+        if isinstance(index, slice):
+            return [self._result.path(row) for row in self._rows[index]]
+        return self._result.path(self._rows[index])
+
+    def __iter__(self) -> Iterator[Path]:
+        """Iteriert über die Pfade, ohne sie dauerhaft zu speichern."""
+        return map(self._result.path, self._rows)
+
+    def __eq__(self, other: object) -> bool:
+        """Vergleicht elementweise mit einer beliebigen Sequenz."""
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Darstellung wie eine Liste."""
+        return repr(list(self))
+
+
+class ScanResult(Mapping[str, PathList]):
+    """Scan-Ergebnis mit spaltenweiser Speicherung.
+
+    Verzeichnisnamen werden nur einmal gespeichert. Je Datei werden der
+    kodierte Dateiname, seine Länge und die Nummer des Dateityps abgelegt
+    (rund 2 Byte plus Namenslänge statt mehrerer hundert Byte für ein
+    ``Path``-Objekt). Die Namen liegen blockweise in ``bytes``-Objekten
+    ohne Überallokation; das Elternverzeichnis wird nur bei jedem Wechsel
+    notiert, da ein Durchlauf die Dateien eines Verzeichnisses
+    zusammenhängend liefert. Die Zeilennummern je Typ entstehen erst beim
+    ersten Zugriff auf eine ``PathList``. Nach außen verhält sich das
+    Objekt wie das bisherige ``dict[str, list[Path]]`` von
+    ``FileOrganizer.scan_files``.
+    """
+
+    def __init__(self, with_stat: bool = False) -> None:
+        """Initialisiert ein leeres Ergebnis.
+
+        Args:
+            with_stat: Zusätzliche Spalten für Größe und mtime anlegen
+        """
+        self.directories: list[str] = []
+        self._directory_ids: dict[str, int] = {}
+        self._name_blocks: list[bytes] = []
+        self._pending_names = bytearray()
+        self._name_lengths: array[int] = array("B")
+        self._type_ids: dict[str, int] = {}
+        self._types: array[int] = array("B")
+        self._type_counts: list[int] = []
+        # Zeile, ab der ein Verzeichnis gilt, und dessen Nummer
+        self._run_starts: array[int] = array("I")
+        self._run_directories: array[int] = array("I")
+        self._rows_cache: list[array[int]] | None = None
+        self.sizes: array[int] | None = array("q") if with_stat else None
+        self.mtimes: array[float] | None = array("d") if with_stat else None
+
+    @classmethod
+    def from_entries(
+        cls, entries: "Iterable[FileEntry]", with_stat: bool = False
+    ) -> "ScanResult":
+        """Baut ein Ergebnis aus einem Strom von ``FileEntry``-Datensätzen.
+
+        Args:
+            entries: Z. B. ``FileOrganizer.iter_files()``
+            with_stat: Größe und mtime der Einträge übernehmen
+
+        Returns:
+            Neues Scan-Ergebnis
+        """
+        result = cls(with_stat)
+        for entry in entries:
+            result.append(
+                entry.directory, entry.name, entry.suffix, entry.size, entry.mtime
+            )
+        return result
+
+    def append(
+        self,
+        directory: str,
+        name: str,
+        suffix: str,
+        size: int | None = None,
+        mtime: float | None = None,
+    ) -> None:
+        """Fügt eine Datei hinzu.
+
+        Args:
+            directory: Elternverzeichnis
+            name: Dateiname
+            suffix: Dateityp (Erweiterung in Kleinbuchstaben)
+            size: Dateigröße (nur mit ``with_stat``)
+            mtime: Änderungszeit (nur mit ``with_stat``)
+        """
+        row = len(self._types)
+        directory_id = self._directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = self._directory_ids[directory] = len(self.directories)
+            self.directories.append(directory)
+        if not self._run_directories or self._run_directories[-1] != directory_id:
+            self._run_starts.append(row)
+            self._run_directories.append(directory_id)
+        encoded = name.encode(_ENCODING, _ERRORS)
+        self._pending_names += encoded
+        self._name_lengths = _append_small(self._name_lengths, len(encoded))
+        if row & _BLOCK_MASK == _BLOCK_MASK:
+            self._name_blocks.append(bytes(self._pending_names))
+            self._pending_names = bytearray()
+        type_id = self._type_ids.get(suffix)
+        if type_id is None:
+            type_id = self._type_ids[suffix] = len(self._type_counts)
+            self._type_counts.append(0)
+        self._types = _append_small(self._types, type_id)
+        self._type_counts[type_id] += 1
+        self._rows_cache = None
+        if self.sizes is not None and self.mtimes is not None:
+            self.sizes.append(size or 0)
+            self.mtimes.append(mtime or 0.0)
+
+    @property
+    def file_count(self) -> int:
+        """Gesamtzahl der Dateien."""
+        return len(self._types)
+
+    def name(self, row: int) -> str:
+        """Dateiname der Zeile ``row``."""
+        block = row >> _BLOCK_BITS
+        names = (
+            self._name_blocks[block]
+            if block < len(self._name_blocks)
+            else self._pending_names
+        )
+        start = sum(self._name_lengths[row & ~_BLOCK_MASK : row])
+        end = start + self._name_lengths[row]
+        return names[start:end].decode(_ENCODING, _ERRORS)
+
+    def directory(self, row: int) -> str:
+        """Elternverzeichnis der Zeile ``row``."""
+        run = bisect_right(self._run_starts, row) - 1
+        return self.directories[self._run_directories[run]]
+
+    def path(self, row: int) -> Path:
+        """Erzeugt den Pfad der Zeile ``row``."""
+        return Path(self.directory(row), self.name(row))
+
+    def counts(self) -> dict[str, int]:
+        """Anzahl der Dateien je Typ, ohne Pfade zu erzeugen."""
+        return dict(zip(self._type_ids, self._type_counts, strict=True))
+
+    def _rows(self) -> list["array[int]"]:
+        """Zeilennummern je Typnummer; einmal gebaut, bis neue Dateien folgen."""
+        if self._rows_cache is None:
+            rows: list[array[int]] = [array("I") for _ in self._type_counts]
+            appends = [column.append for column in rows]
+            for row, type_id in enumerate(self._types):
+                appends[type_id](row)
+            self._rows_cache = rows
+        return self._rows_cache
+
+    def statistics(self, tz: tzinfo = UTC) -> ScanStatistics:
+        """Größen- und Datumsstatistik aus den gesammelten Spalten.
+
+        Args:
+            tz: Zeitzone für die Monatsgrenzen
+
+        Returns:
+            Aggregierte Statistik
+
+        Raises:
+            ValueError: Wenn das Ergebnis ohne ``with_stat`` erstellt wurde
+        """
+        if self.sizes is None or self.mtimes is None:
+            msg = "Statistik erfordert einen Scan mit with_stat=True"
+            raise ValueError(msg)
+        rows_by_type = dict(zip(self._type_ids, self._rows(), strict=True))
+        return compute_statistics(self.sizes, self.mtimes, rows_by_type, tz)
+
+    def __getitem__(self, suffix: str) -> PathList:
+        """Dateien eines Typs als lazy Sequenz."""
+        return PathList(self, self._rows()[self._type_ids[suffix]])
+
+    def __iter__(self) -> Iterator[str]:
+        """Iteriert über die gefundenen Dateitypen."""
+        return iter(self._type_ids)
+
+    def __len__(self) -> int:
+        """Anzahl der Dateitypen."""
+        return len(self._type_ids)
+
+    def __repr__(self) -> str:
+        """Kurzdarstellung mit den Anzahlen je Typ."""
+        return f"ScanResult({self.counts()!r})"
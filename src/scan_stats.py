@@ -0,0 +1,108 @@
+"""Größen- und Datumsstatistiken über gesammelte Scan-Spalten."""
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping
+from datetime import UTC, datetime, tzinfo
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from array import array
+
+
+class ScanStatistics(NamedTuple):
+    """Aggregierte Kennzahlen eines Scans.
+
+    Die Größenhistogramme verwenden logarithmische Klassen: Klasse ``k``
+    enthält Dateien mit ``2**(k-1) <= size < 2**k`` Bytes, Klasse 0 die
+    leeren Dateien.
+    """
+
+    total_files: int
+    total_bytes: int
+    bytes_by_type: dict[str, int]
+    size_histograms: dict[str, dict[int, int]]
+    files_by_month: dict[str, int]
+    files_by_year: dict[int, int]
+
+
+def _next_month(month: datetime) -> datetime:
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def count_by_month(mtimes: "array[float]", tz: tzinfo = UTC) -> dict[str, int]:
+    """Zählt Dateien je Kalendermonat ihrer Änderungszeit.
+
+    Statt jeden Zeitstempel einzeln in ein Datum umzurechnen, werden die
+    Zeitstempel einmal sortiert und die Monatsgrenzen per Binärsuche
+    gefunden. Der Aufwand ist damit O(n log n) in C plus O(Monate log n).
+
+    Args:
+        mtimes: Änderungszeiten als Unix-Zeitstempel
+        tz: Zeitzone, in der die Monatsgrenzen liegen
+
+    Returns:
+        Anzahl je Monat im Format ``"JJJJ-MM"``, chronologisch sortiert
+    """
+    ordered = sorted(mtimes)
+    if not ordered:
+        return {}
+    month = datetime.fromtimestamp(ordered[0], tz).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    counts: dict[str, int] = {}
+    position = 0
+    while position < len(ordered):
+        following = _next_month(month)
+        boundary = bisect_left(ordered, following.timestamp(), lo=position)
+        if boundary > position:
+            counts[f"{month:%Y-%m}"] = boundary - position
+        position = boundary
+        month = following
+    return counts
+
+
+def compute_statistics(
+    sizes: "array[int]",
+    mtimes: "array[float]",
+    rows_by_type: Mapping[str, "array[int]"],
+    tz: tzinfo = UTC,
+) -> ScanStatistics:
+    """Berechnet alle Kennzahlen aus den im Durchlauf gesammelten Spalten.
+
+    Alle Schleifen über die Dateien laufen über ``map``/``sum``/``Counter``
+    in C, sodass auch Millionen von Einträgen in Sekundenbruchteilen
+    ausgewertet werden.
+
+    Args:
+        sizes: Dateigrößen je Zeile
+        mtimes: Änderungszeiten je Zeile
+        rows_by_type: Zeilennummern je Dateityp
+        tz: Zeitzone für die Monatsgrenzen
+
+    Returns:
+        Aggregierte Statistik
+    """
+    bytes_by_type: dict[str, int] = {}
+    size_histograms: dict[str, dict[int, int]] = {}
+    for suffix, rows in rows_by_type.items():
+        bytes_by_type[suffix] = sum(map(sizes.__getitem__, rows))
+        histogram = Counter(map(int.bit_length, map(sizes.__getitem__, rows)))
+        size_histograms[suffix] = dict(sorted(histogram.items()))
+
+    files_by_month = count_by_month(mtimes, tz)
+    files_by_year: dict[int, int] = {}
+    for month, count in files_by_month.items():
+        year = int(month[:4])
+        files_by_year[year] = files_by_year.get(year, 0) + count
+
+    return ScanStatistics(
+        total_files=len(sizes),
+        total_bytes=sum(sizes),
+        bytes_by_type=bytes_by_type,
+        size_histograms=size_histograms,
+        files_by_month=files_by_month,
+        files_by_year=files_by_year,
+    )
@@ -0,0 +1,185 @@
+"""Sortierte Scan-Snapshots und ihr Vergleich per Merge in einem Durchlauf."""
+
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    from src.file_organizer import FileEntry
+
+_MAGIC = b"file-organizer-snapshot 1\n"
+_BLOCK = 1 << 20
+_FIELDS = 3
+
+
+class SnapshotEntry(NamedTuple):
+    """Eine Datei in einem Snapshot.
+
+    ``path`` ist relativ zur Wurzel und verwendet immer ``/`` als Trenner.
+    """
+
+    path: str
+    size: int
+    mtime: float
+
+
+class Change(NamedTuple):
+    """Unterschied zwischen zwei Snapshots für einen Pfad."""
+
+    kind: Literal["added", "removed", "modified"]
+    path: str
+    old: SnapshotEntry | None
+    new: SnapshotEntry | None
+
+
+def sort_key(path: str) -> tuple[list[str], str]:
+    """Sortierschlüssel eines relativen Pfads im Snapshot.
+
+    Verglichen werden die Verzeichniskomponenten und danach der Name; die
+    Dateien eines Verzeichnisses stehen damit vor denen seiner
+    Unterverzeichnisse. Das ist genau die Reihenfolge von
+    ``FileOrganizer.iter_files``, ein Snapshot kann also ohne Sortieren
+    direkt aus dem Durchlauf geschrieben werden.
+
+    Args:
+        path: Relativer Pfad mit ``/`` als Trenner
+
+    Returns:
+        Tupel aus Verzeichniskomponenten und Dateiname
+    """
+    *parents, name = path.split("/")
+    return parents, name
+
+
+def _relative_paths(
+    entries: Iterable["FileEntry"], root: str | Path
+) -> Iterator[SnapshotEntry]:
+    """Wandelt Einträge in Snapshot-Einträge relativ zu ``root`` um."""
+    root = os.fspath(root)
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    for entry in entries:
+        if entry.size is None or entry.mtime is None:
+            msg = "Snapshots benötigen Einträge mit Größe und mtime (with_stat=True)"
+            raise ValueError(msg)
+        directory = "" if entry.directory == root else entry.directory[len(prefix) :]
+        if os.sep != "/":  # pragma: no cover - nur Windows
+            directory = directory.replace(os.sep, "/")
+        path = f"{directory}/{entry.name}" if directory else entry.name
+        yield SnapshotEntry(path, entry.size, entry.mtime)
+
+
+def write_snapshot(
+    entries: Iterable["FileEntry"], root: str | Path, path: str | Path
+) -> int:
+    """Schreibt einen Snapshot, z. B. aus ``iter_files(with_stat=True)``.
+
+    Jeder Datensatz besteht aus relativem Pfad, Größe und mtime, jeweils
+    mit NUL abgeschlossen; beliebige Dateinamen (auch nicht dekodierbare)
+    bleiben so erhalten. Die Datei wird zuerst unter einem temporären
+    Namen geschrieben und erst nach vollständigem Durchlauf ersetzt.
+
+    Args:
+        entries: Einträge in Snapshot-Reihenfolge (siehe ``sort_key``)
+        root: Wurzel, relativ zu der die Pfade gespeichert werden
+        path: Zieldatei
+
+    Returns:
+        Anzahl der geschriebenen Dateien
+
+    Raises:
+        ValueError: Wenn Größe oder mtime fehlen oder die Einträge nicht
+            in Snapshot-Reihenfolge vorliegen
+    """
+    target = Path(path)
+    temporary = target.with_name(target.name + ".tmp")
+    count = 0
+    previous: tuple[list[str], str] | None = None
+    try:
+        with temporary.open("wb") as file:
+            file.write(_MAGIC)
+            for entry in _relative_paths(entries, root):
+                key = sort_key(entry.path)
+                if previous is not None and key <= previous:
+                    msg = f"Einträge nicht in Snapshot-Reihenfolge: {entry.path}"
+                    raise ValueError(msg)
+                previous = key
+                file.write(
+                    b"%s\0%d\0%s\0"
+                    % (os.fsencode(entry.path), entry.size, repr(entry.mtime).encode())
+                )
+                count += 1
+        temporary.replace(target)
+    finally:
+        temporary.unlink(missing_ok=True)
+    return count
+
+
+def read_snapshot(path: str | Path) -> Iterator[SnapshotEntry]:
+    """Liest einen Snapshot blockweise mit konstantem Speicherbedarf.
+
+    Args:
+        path: Snapshot-Datei
+
+    Yields:
+        Einträge in Snapshot-Reihenfolge
+
+    Raises:
+        ValueError: Wenn die Datei kein Snapshot oder abgeschnitten ist
+    """
+    with Path(path).open("rb") as file:
+        if file.readline() != _MAGIC:
+            msg = f"{path} ist kein Snapshot"
+            raise ValueError(msg)
+        fields: list[bytes] = []
+        tail = b""
+        while block := file.read(_BLOCK):
+            pieces = (tail + block).split(b"\0")
+            tail = pieces.pop()
+            fields += pieces
+            complete = len(fields) - len(fields) % _FIELDS
+            for start in range(0, complete, _FIELDS):
+                name, size, mtime = fields[start : start + _FIELDS]
+                yield SnapshotEntry(os.fsdecode(name), int(size), float(mtime))
+            del fields[:complete]
+        if fields or tail:
+            msg = f"{path} ist abgeschnitten"
+            raise ValueError(msg)
+
+
+def diff_snapshots(old_path: str | Path, new_path: str | Path) -> Iterator[Change]:
+    """Vergleicht zwei Snapshots per Merge der sortierten Dateien.
+
+    Beide Dateien werden genau einmal gleichzeitig gelesen; Laufzeit und
+    Speicherbedarf sind linear bzw. konstant in der Anzahl der Dateien.
+    Eine Datei gilt als geändert, wenn Größe oder mtime abweichen.
+
+    Args:
+        old_path: Älterer Snapshot
+        new_path: Neuerer Snapshot
+
+    Yields:
+        Unterschiede in Snapshot-Reihenfolge
+    """
+    old_entries = ((sort_key(e.path), e) for e in read_snapshot(old_path))
+    new_entries = ((sort_key(e.path), e) for e in read_snapshot(new_path))
+    old = next(old_entries, None)
+    new = next(new_entries, None)
+    while old is not None and new is not None:
+        if old[0] < new[0]:
+            yield Change("removed", old[1].path, old[1], None)
+            old = next(old_entries, None)
+        elif new[0] < old[0]:
+            yield Change("added", new[1].path, None, new[1])
+            new = next(new_entries, None)
+        else:
+            if (old[1].size, old[1].mtime) != (new[1].size, new[1].mtime):
+                yield Change("modified", new[1].path, old[1], new[1])
+            old = next(old_entries, None)
+            new = next(new_entries, None)
+    if old is not None:
+        yield Change("removed", old[1].path, old[1], None)
+        yield from (Change("removed", e.path, e, None) for _, e in old_entries)
+    if new is not None:
+        yield Change("added", new[1].path, None, new[1])
+        yield from (Change("added", e.path, None, e) for _, e in new_entries)
@@ -0,0 +1,326 @@
+"""Dateityperkennung anhand des Inhalts (Magic Bytes) mit Cache."""
+
+import codecs
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Self
+
+from src.scan_index import RACY_WINDOW_NS, default_index_path
+
+if TYPE_CHECKING:
+    from src.file_organizer import FileEntry
+
+SNIFF_BYTES = 512
+_CHUNK = 1024
+
+# Formate, die technisch ZIP-Archive sind
+_ZIP_FORMATS = (
+    ".docx",
+    ".xlsx",
+    ".pptx",
+    ".odt",
+    ".ods",
+    ".odp",
+    ".epub",
+    ".jar",
+    ".apk",
+    ".whl",
+    ".xpi",
+    ".kmz",
+)
+
+# (Bedingungen als (Offset, Bytes), erkannter Typ, weitere passende Endungen)
+_SIGNATURES: list[tuple[tuple[tuple[int, bytes], ...], str, tuple[str, ...]]] = [
+    (((0, b"\x89PNG\r\n\x1a\n"),), ".png", ()),
+    (((0, b"\xff\xd8\xff"),), ".jpg", (".jpeg", ".jpe", ".jfif")),
+    (((0, b"GIF87a"),), ".gif", ()),
+    (((0, b"GIF89a"),), ".gif", ()),
+    (((0, b"II*\x00"),), ".tif", (".tiff", ".dng", ".nef", ".cr2")),
+    (((0, b"MM\x00*"),), ".tif", (".tiff", ".dng", ".nef", ".cr2")),
+    (((0, b"RIFF"), (8, b"WEBP")), ".webp", ()),
+    (((0, b"RIFF"), (8, b"WAVE")), ".wav", ()),
+    (((0, b"RIFF"), (8, b"AVI ")), ".avi", ()),
+    (((4, b"ftyp"),), ".mp4", (".m4a", ".m4v", ".mov", ".heic", ".avif", ".3gp")),
+    (((0, b"\x1a\x45\xdf\xa3"),), ".mkv", (".webm", ".mka")),
+    (((0, b"OggS"),), ".ogg", (".oga", ".ogv", ".opus")),
+    (((0, b"fLaC"),), ".flac", ()),
+    (((0, b"ID3"),), ".mp3", ()),
+    (((0, b"%PDF-"),), ".pdf", (".ai",)),
+    (((0, b"%!PS"),), ".ps", (".eps",)),
+    (((0, b"{\\rtf"),), ".rtf", ()),
+    (((0, b"PK\x03\x04"),), ".zip", _ZIP_FORMATS),
+    (((0, b"PK\x05\x06"),), ".zip", _ZIP_FORMATS),
+    (((257, b"ustar"),), ".tar", ()),
+    (((0, b"\x1f\x8b"),), ".gz", (".tgz",)),
+    (((0, b"BZh"),), ".bz2", (".tbz2", ".tbz")),
+    (((0, b"\xfd7zXZ\x00"),), ".xz", (".txz",)),
+    (((0, b"\x28\xb5\x2f\xfd"),), ".zst", ()),
+    (((0, b"7z\xbc\xaf\x27\x1c"),), ".7z", ()),
+    (((0, b"SQLite format 3\x00"),), ".sqlite", (".db", ".sqlite3")),
+    (((0, b"\x7fELF"),), ".elf", (".so", ".o", ".ko")),
+    (((0, b"MZ"),), ".exe", (".dll", ".sys", ".efi", ".scr")),
+    (((0, b"\x00asm"),), ".wasm", ()),
+    (((0, b"wOFF"),), ".woff", ()),
+    (((0, b"wOF2"),), ".woff2", ()),
+]
+
+_ALIASES: dict[str, frozenset[str]] = {}
+for _conditions, _kind, _aliases in _SIGNATURES:
+    _ALIASES[_kind] = _ALIASES.get(_kind, frozenset()) | set(_aliases)
+
+# Interpreter in der Shebang-Zeile -> Typ
+_SHEBANGS = {"python": ".py", "node": ".js", "perl": ".pl", "ruby": ".rb"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_types (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (device, inode)
+)
+"""
+
+
+def default_sniff_cache_path() -> Path:
+    """Standardpfad des Caches, neben dem Verzeichnisindex.
+
+    Returns:
+        ``$XDG_CACHE_HOME/file_organizer/content_types.sqlite``
+    """
+    return default_index_path().with_name("content_types.sqlite")
+
+
+def _detect_text(head: bytes) -> str:
+    """Unterscheidet Textdateien ohne Endung grob nach ihrem Anfang."""
+    if head.startswith(b"#!"):
+        interpreter = head.split(b"\n", 1)[0]
+        for name, kind in _SHEBANGS.items():
+            if name.encode() in interpreter:
+                return kind
+        return ".sh"
+    start = head.lstrip()[:64].lower()
+    if start.startswith(b"<?xml"):
+        return ".xml"
+    if start.startswith((b"<!doctype html", b"<html")):
+        return ".html"
+    return ".txt"
+
+
+def detect_type(head: bytes) -> str:
+    """Erkennt den Typ anhand der ersten Bytes einer Datei.
+
+    Args:
+        head: Dateianfang (``SNIFF_BYTES`` Bytes genügen)
+
+    Returns:
+        Erkannter Typ im Format einer Endung (z. B. ``".png"``); ``".txt"``
+        bzw. eine genauere Textart für UTF-8-Text; ``""``, wenn der Typ
+        unbekannt ist
+    """
+    for conditions, kind, _aliases in _SIGNATURES:
+        if all(
+            head[offset : offset + len(magic)] == magic for offset, magic in conditions
+        ):
+            return kind
+    if not head or b"\0" in head:
+        return ""
+    try:
+        # Inkrementell, damit ein abgeschnittenes Mehrbytezeichen am Ende
+        # nicht als Fehler zählt
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return ""
+    return _detect_text(head)
+
+
+def resolve_type(detected: str, suffix: str) -> str:
+    """Kombiniert erkannten Typ und Dateiendung zur Gruppierung.
+
+    Eine Signatur hat Vorrang vor einer falschen Endung; passt die Endung
+    zur Signatur (z. B. ``.docx`` für ZIP), bleibt sie erhalten. Textarten
+    werden nur für Dateien ohne Endung verwendet.
+
+    Args:
+        detected: Ergebnis von ``detect_type``
+        suffix: Endung der Datei in Kleinbuchstaben
+
+    Returns:
+        Typ, unter dem die Datei gruppiert wird
+    """
+    if detected in _ALIASES:
+        if suffix == detected or suffix in _ALIASES[detected]:
+            return suffix
+        return detected
+    return suffix or detected
+
+
+class SniffCache:
+    """Cache erkannter Typen, geschlüsselt nach Gerät, Inode, Größe und mtime.
+
+    Ändert sich eine Datei, ändern sich Größe oder mtime, und der Eintrag
+    wird verworfen. Ohne Pfad liegt der Cache nur im Arbeitsspeicher.
+    Der Cache ist threadsicher.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """Öffnet (oder erstellt) den Cache.
+
+        Args:
+            path: Pfad der SQLite-Datei (``None`` = nur im Arbeitsspeicher)
+        """
+        if path is None:
+            database = ":memory:"
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            database = os.fspath(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        if path is not None:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> Self:
+        """Kontextmanager-Eintritt."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Schließt den Cache."""
+        self.close()
+
+    def get(self, stat_result: os.stat_result) -> str | None:
+        """Liefert den gespeicherten Typ einer unveränderten Datei.
+
+        Args:
+            stat_result: Aktuelles ``stat`` der Datei
+
+        Returns:
+            Erkannter Typ oder ``None`` bei fehlendem bzw. veraltetem Eintrag
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT type FROM content_types WHERE device = ? AND inode = ?"
+                " AND size = ? AND mtime_ns = ?",
+                (
+                    stat_result.st_dev,
+                    stat_result.st_ino,
+                    stat_result.st_size,
+                    stat_result.st_mtime_ns,
+                ),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return str(row[0])
+
+    def put(self, stat_result: os.stat_result, detected: str) -> None:
+        """Speichert den erkannten Typ einer Datei.
+
+        Dateien, die gerade erst geändert wurden, werden nicht gespeichert,
+        da eine weitere Änderung im selben Zeitstempel-Takt sonst
+        unbemerkt bliebe.
+
+        Args:
+            stat_result: ``stat`` der Datei vor dem Lesen
+            detected: Ergebnis von ``detect_type``
+        """
+        if time.time_ns() - stat_result.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO content_types VALUES (?, ?, ?, ?, ?)",
+                (
+                    stat_result.st_dev,
+                    stat_result.st_ino,
+                    stat_result.st_size,
+                    stat_result.st_mtime_ns,
+                    detected,
+                ),
+            )
+
+    def close(self) -> None:
+        """Schreibt offene Änderungen und schließt die Datenbank."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+
+class ContentSniffer:
+    """Klassifiziert Dateien parallel anhand ihrer ersten Bytes."""
+
+    def __init__(self, cache: SniffCache | None = None, workers: int = 8) -> None:
+        """Initialisiert den Sniffer.
+
+        Args:
+            cache: Cache für unveränderte Dateien (optional)
+            workers: Anzahl der Lese-Threads
+        """
+        self.cache = cache
+        self.workers = workers
+
+    def sniff(self, entry: "FileEntry") -> str:
+        """Bestimmt den Gruppierungstyp einer einzelnen Datei.
+
+        Pro Datei fällt ein ``stat`` an; gelesen werden höchstens
+        ``SNIFF_BYTES`` Bytes und nur bei einem Cache-Fehltreffer. Nicht
+        lesbare Dateien behalten ihre Endung.
+
+        Args:
+            entry: Zu prüfende Datei
+
+        Returns:
+            Typ im Format einer Endung
+        """
+        path = Path(entry.directory, entry.name)
+        try:
+            stat_result = path.stat()
+            detected = None if self.cache is None else self.cache.get(stat_result)
+            if detected is None:
+                with path.open("rb") as file:
+                    detected = detect_type(file.read(SNIFF_BYTES))
+                if self.cache is not None:
+                    self.cache.put(stat_result, detected)
+        except OSError:
+            return entry.suffix
+        return resolve_type(detected, entry.suffix)
+
+    def classify(
+        self, entries: Iterable["FileEntry"]
+    ) -> Iterator[tuple["FileEntry", str]]:
+        """Klassifiziert einen Strom von Dateien im Thread-Pool.
+
+        Die Einträge werden in Blöcken verarbeitet; während ein Block
+        ausgeliefert wird, liest der Pool bereits den nächsten. Die
+        Reihenfolge der Eingabe bleibt erhalten.
+
+        Args:
+            entries: Z. B. ``FileOrganizer.iter_files()``
+
+        Yields:
+            Tupel aus Eintrag und Gruppierungstyp
+        """
+        iterator = iter(entries)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="sniffer") as pool:
+            chunk = list(islice(iterator, _CHUNK))
+            kinds = pool.map(self.sniff, chunk)
+            while chunk:
+                following = list(islice(iterator, _CHUNK))
+                following_kinds = pool.map(self.sniff, following)
+                yield from zip(chunk, kinds, strict=True)
+                chunk, kinds = following, following_kinds
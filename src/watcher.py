@@ -0,0 +1,433 @@
+"""Live-Überwachung eines Verzeichnisbaums über Linux-inotify."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, NamedTuple, Self
+
+from src.file_organizer import _join, file_suffix
+
+if TYPE_CHECKING:
+    from src.file_organizer import FileOrganizer
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_UNMOUNT = 0x00002000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CREATE
+    | IN_DELETE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class InotifyEvent(NamedTuple):
+    """Ein einzelnes inotify-Ereignis."""
+
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+class Inotify:
+    """Minimaler ctypes-Wrapper um die inotify-Systemaufrufe der libc."""
+
+    def __init__(self) -> None:
+        """Öffnet eine nicht blockierende inotify-Instanz.
+
+        Raises:
+            OSError: Wenn inotify auf diesem System nicht verfügbar ist
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            init = libc.inotify_init1
+        except AttributeError as error:  # pragma: no cover - nicht Linux
+            msg = "inotify wird auf diesem System nicht unterstützt"
+            raise OSError(msg) from error
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:  # pragma: no cover - z. B. max_user_instances erreicht
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._poll = select.poll()
+        self._poll.register(self.fd, select.POLLIN)
+
+    def __enter__(self) -> Self:
+        """Kontextmanager-Eintritt."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Schließt den inotify-Deskriptor."""
+        self.close()
+
+    def close(self) -> None:
+        """Schließt den inotify-Deskriptor (entfernt alle Watches)."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Überwacht ein Verzeichnis.
+
+        Args:
+            path: Zu überwachendes Verzeichnis
+            mask: inotify-Ereignismaske
+
+        Returns:
+            Watch-Deskriptor (für denselben Inode immer derselbe)
+
+        Raises:
+            OSError: Wenn der Watch nicht angelegt werden kann, z. B. bei
+                Erreichen von ``fs.inotify.max_user_watches``
+        """
+        wd = int(self._add_watch(self.fd, os.fsencode(path), mask))
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Entfernt einen Watch; bereits ungültige Deskriptoren werden ignoriert.
+
+        Args:
+            wd: Watch-Deskriptor
+        """
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float | None) -> list[InotifyEvent]:
+        """Wartet auf Ereignisse und liest alle bereits vorliegenden.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (``None`` = unbegrenzt)
+
+        Returns:
+            Liste der Ereignisse, leer bei Zeitüberschreitung
+        """
+        wait_ms = None if timeout is None else max(0, int(timeout * 1000))
+        if not self._poll.poll(wait_ms):
+            return []
+        events: list[InotifyEvent] = []
+        while True:
+            try:
+                buffer = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = buffer[offset : offset + length].rstrip(b"\0")
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(raw_name)))
+
+
+class LiveFileGroups:
+    """Laufend aktualisierte Gruppierung der Dateien nach Typ.
+
+    Intern werden die Dateinamen je Verzeichnis gehalten, damit gelöschte
+    oder verschobene Teilbäume ohne erneuten Scan entfernt werden können.
+    Die Zähler pro Erweiterung werden bei jeder Änderung mitgeführt.
+    """
+
+    def __init__(self) -> None:
+        """Initialisiert eine leere Gruppierung."""
+        self.files_by_dir: dict[str, set[str]] = {}
+        self.counts: dict[str, int] = {}
+
+    def add_file(self, directory: str, name: str) -> bool:
+        """Nimmt eine Datei auf.
+
+        Returns:
+            ``True``, wenn die Datei neu war
+        """
+        names = self.files_by_dir.setdefault(directory, set())
+        if name in names:
+            return False
+        names.add(name)
+        ext = file_suffix(name)
+        self.counts[ext] = self.counts.get(ext, 0) + 1
+        return True
+
+    def remove_file(self, directory: str, name: str) -> bool:
+        """Entfernt eine Datei.
+
+        Returns:
+            ``True``, wenn die Datei bekannt war
+        """
+        names = self.files_by_dir.get(directory)
+        if names is None or name not in names:
+            return False
+        names.remove(name)
+        ext = file_suffix(name)
+        self.counts[ext] -= 1
+        if not self.counts[ext]:
+            del self.counts[ext]
+        return True
+
+    def remove_tree(self, directory: str) -> list[str]:
+        """Entfernt ein Verzeichnis samt aller bekannten Unterverzeichnisse.
+
+        Returns:
+            Die entfernten Verzeichnispfade
+        """
+        prefix = directory.rstrip(os.sep) + os.sep
+        removed = [
+            path
+            for path in self.files_by_dir
+            if path == directory or path.startswith(prefix)
+        ]
+        for path in removed:
+            for name in list(self.files_by_dir[path]):
+                self.remove_file(path, name)
+            del self.files_by_dir[path]
+        return removed
+
+    def as_dict(self) -> dict[str, list[Path]]:
+        """Liefert die Gruppierung im Format von ``FileOrganizer.scan_files``."""
+        files_by_type: dict[str, list[Path]] = {}
+        for directory in sorted(self.files_by_dir):
+            for name in sorted(self.files_by_dir[directory]):
+                files_by_type.setdefault(file_suffix(name), []).append(
+                    Path(directory, name)
+                )
+        return files_by_type
+
+
+class WatchBatch(NamedTuple):
+    """Zusammenfassung einer angewendeten Ereignis-Charge."""
+
+    groups: LiveFileGroups
+    events: int
+    added: int
+    removed: int
+    resynced: bool
+
+
+class TreeWatcher:
+    """Hält eine ``LiveFileGroups`` über inotify-Ereignisse aktuell.
+
+    Ereignisse werden gesammelt, bis für ``debounce`` Sekunden Ruhe herrscht
+    oder die älteste offene Änderung ``max_delay`` Sekunden alt ist. Pro
+    Charge wird jeder betroffene Pfad genau einmal per ``lstat`` geprüft,
+    egal wie viele Ereignisse für ihn eingetroffen sind. Nur neu
+    entstandene Verzeichnisse werden gelesen; ein vollständiger Neuscan
+    erfolgt ausschließlich nach einem Überlauf der Kernel-Warteschlange.
+    """
+
+    def __init__(
+        self,
+        organizer: "FileOrganizer",
+        debounce: float = 0.1,
+        max_delay: float = 1.0,
+    ) -> None:
+        """Initialisiert den Watcher.
+
+        Args:
+            organizer: FileOrganizer, dessen Quellverzeichnis überwacht wird
+            debounce: Ruhezeit in Sekunden, nach der eine Charge angewendet
+                wird
+            max_delay: Maximale Verzögerung einer Charge in Sekunden
+        """
+        self.organizer = organizer
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.groups = LiveFileGroups()
+        self._inotify = Inotify()
+        self._paths_by_wd: dict[int, str] = {}
+        self._wd_by_path: dict[str, int] = {}
+
+    def close(self) -> None:
+        """Beendet die Überwachung."""
+        self._inotify.close()
+
+    def _add_tree(self, directory: str) -> int:
+        """Überwacht und liest einen (neuen) Teilbaum ein.
+
+        Der Watch wird vor dem Lesen angelegt, damit zwischenzeitlich
+        entstehende Einträge nicht verloren gehen. Verzeichnisse, die nicht
+        überwacht werden können (``EACCES``, ``ENOTDIR``, ``ELOOP`` …),
+        werden samt Teilbaum übersprungen, wie beim normalen Scan.
+
+        Returns:
+            Anzahl der neu aufgenommenen Dateien
+        """
+        added = 0
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                wd = self._inotify.add_watch(current)
+            except OSError:
+                continue
+            self._paths_by_wd[wd] = current
+            self._wd_by_path[current] = wd
+            files, subdirs = self.organizer._list_directory(current)
+            self.groups.files_by_dir.setdefault(current, set())
+            added += sum(self.groups.add_file(current, f.name) for f in files)
+            stack.extend(reversed(subdirs))
+        return added
+
+    def _remove_tree(self, directory: str) -> int:
+        """Vergisst einen verschwundenen Teilbaum.
+
+        Returns:
+            Anzahl der entfernten Dateien
+        """
+        before = sum(self.groups.counts.values())
+        for path in self.groups.remove_tree(directory):
+            wd = self._wd_by_path.pop(path)
+            # Ein verschobenes Verzeichnis kann unter seinem neuen Pfad
+            # bereits denselben Watch-Deskriptor erhalten haben.
+            if self._paths_by_wd.get(wd) == path:
+                del self._paths_by_wd[wd]
+                self._inotify.rm_watch(wd)
+        return before - sum(self.groups.counts.values())
+
+    def _resync(self) -> None:
+        """Baut die Gruppierung nach einem Ereignisverlust neu auf."""
+        for wd in list(self._paths_by_wd):
+            self._inotify.rm_watch(wd)
+        self._paths_by_wd.clear()
+        self._wd_by_path.clear()
+        self.groups = LiveFileGroups()
+        self._add_tree(os.fspath(self.organizer.source_dir))
+
+    def _apply(self, dirty: dict[str, tuple[str, str] | None]) -> tuple[int, int]:
+        """Gleicht die betroffenen Pfade mit dem Dateisystem ab.
+
+        Entfernungen werden vor Neuaufnahmen verarbeitet, damit ein
+        verschobenes Verzeichnis (gleicher Inode, gleicher Watch-Deskriptor)
+        korrekt unter seinem neuen Pfad registriert wird.
+
+        Args:
+            dirty: Betroffene Pfade mit Elternverzeichnis und Namen
+                (``None`` für Ereignisse, die ein überwachtes Verzeichnis
+                selbst betreffen)
+
+        Returns:
+            Tupel aus hinzugefügten und entfernten Dateien
+        """
+        added = removed = 0
+        appeared: list[str] = []
+        for path in sorted(dirty):
+            location = dirty[path]
+            try:
+                mode = Path(path).lstat().st_mode
+            except OSError:
+                mode = 0
+            is_dir = stat.S_ISDIR(mode)
+            is_file = stat.S_ISREG(mode) or (
+                stat.S_ISLNK(mode) and Path(path).is_file()
+            )
+
+            if not is_dir and path in self.groups.files_by_dir:
+                removed += self._remove_tree(path)
+            if location is not None and not self.organizer._accepts(*location, is_dir):
+                continue
+            if is_dir:
+                if path not in self._wd_by_path:
+                    appeared.append(path)
+            elif location is None:
+                continue
+            elif is_file:
+                added += self.groups.add_file(*location)
+            else:
+                removed += self.groups.remove_file(*location)
+
+        for path in appeared:
+            added += self._add_tree(path)
+        return added, removed
+
+    def _collect(
+        self, events: list[InotifyEvent]
+    ) -> tuple[dict[str, tuple[str, str] | None], int, bool]:
+        """Sammelt Ereignisse bis zur Ruhephase bzw. bis ``max_delay``.
+
+        Args:
+            events: Die ersten Ereignisse der Charge
+
+        Returns:
+            Tupel aus betroffenen Pfaden, Anzahl der Ereignisse und ob die
+            Kernel-Warteschlange übergelaufen ist
+        """
+        dirty: dict[str, tuple[str, str] | None] = {}
+        overflow = False
+        count = 0
+        deadline = time.monotonic() + self.max_delay
+        while events:
+            count += len(events)
+            for event in events:
+                if event.mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                parent = self._paths_by_wd.get(event.wd)
+                if parent is None or event.mask & IN_IGNORED:
+                    continue
+                if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_UNMOUNT):
+                    dirty.setdefault(parent, None)
+                else:
+                    dirty[_join(parent, event.name)] = (parent, event.name)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            events = self._inotify.read_events(min(self.debounce, remaining))
+        return dirty, count, overflow
+
+    def batches(self, idle_timeout: float | None = None) -> Iterator[WatchBatch]:
+        """Führt den initialen Scan aus und liefert danach jede Charge.
+
+        Args:
+            idle_timeout: Beendet die Überwachung, wenn so viele Sekunden
+                lang keine Ereignisse eintreffen (``None`` = nie)
+
+        Yields:
+            Zuerst das Ergebnis des initialen Scans, danach eine
+            ``WatchBatch`` je angewendeter Charge
+        """
+        added = self._add_tree(os.fspath(self.organizer.source_dir))
+        yield WatchBatch(self.groups, 0, added, 0, resynced=False)
+
+        while events := self._inotify.read_events(idle_timeout):
+            dirty, count, overflow = self._collect(events)
+            if overflow:
+                self._resync()
+                total = sum(self.groups.counts.values())
+                yield WatchBatch(self.groups, count, total, 0, resynced=True)
+            else:
+                added, removed = self._apply(dirty)
+                yield WatchBatch(self.groups, count, added, removed, resynced=False)
@@ -0,0 +1,103 @@
+"""Tests für die Speicherbelegung je Verzeichnis."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from src.disk_usage import UsageItem, disk_usage
+from src.file_organizer import FileOrganizer, main
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Erstellt einen Baum mit bekannten Größen."""
+    root = tmp_path / "baum"
+    for name, size in (
+        ("a.bin", 100),
+        ("big/x", 1000),
+        ("big/sub/y", 500),
+        ("big/sub/deeper/z", 50),
+        ("small/s", 10),
+    ):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes(size))
+    (root / "leer").mkdir()
+    return root
+
+
+def test_disk_usage_report(tree: Path) -> None:
+    """Test der Summen, der Tiefe und der Top-N-Listen."""
+    report = FileOrganizer(tree).disk_usage(top=2)
+
+    assert (report.total_bytes, report.files) == (1660, 5)
+    assert report.by_directory == {
+        str(tree): 1660,
+        str(tree / "big"): 1550,
+        str(tree / "small"): 10,
+    }
+    assert report.largest_directories == [
+        UsageItem(str(tree / "big"), 1550),
+        UsageItem(str(tree / "big" / "sub"), 550),
+    ]
+    assert report.largest_files == [
+        UsageItem(str(tree / "big" / "x"), 1000),
+        UsageItem(str(tree / "big" / "sub" / "y"), 500),
+    ]
+
+
+def test_disk_usage_matches_brute_force(tmp_path: Path) -> None:
+    """Test gegen eine direkte Summierung für einen zufälligen Baum."""
+    rng = random.Random(3)  # noqa: S311
+    directories = [tmp_path]
+    for number in range(60):
+        parent = rng.choice(directories)
+        if rng.random() < 0.3:
+            directory = parent / f"d{number}"
+            directory.mkdir()
+            directories.append(directory)
+        else:
+            (parent / f"f{number}").write_bytes(bytes(rng.randrange(200)))
+
+    report = FileOrganizer(tmp_path, workers=3).disk_usage(top=100, max_depth=100)
+
+    expected = {
+        str(directory): sum(
+            p.stat().st_size for p in directory.rglob("*") if p.is_file()
+        )
+        for directory in directories
+    }
+    assert report.by_directory == {k: v for k, v in expected.items() if v}
+    assert report.total_bytes == expected[str(tmp_path)]
+    assert len(report.largest_files) == report.files
+
+
+def test_disk_usage_edge_cases(tree: Path) -> None:
+    """Test ohne Top-N-Listen, ohne Größen und für leere Bäume."""
+    report = FileOrganizer(tree).disk_usage(top=0, max_depth=0)
+    assert report.by_directory == {str(tree): 1660}
+    assert report.largest_files == report.largest_directories == []
+
+    with pytest.raises(ValueError, match="with_stat"):
+        disk_usage(FileOrganizer(tree).iter_files(), tree)
+
+    empty = FileOrganizer(tree / "leer").disk_usage()
+    assert (empty.total_bytes, empty.files, empty.largest_files) == (0, 0, [])
+
+
+def test_main_du(tree: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test der Option --du."""
+    main([str(tree), "--du", "1"])
+
+    assert capsys.readouterr().out.splitlines() == [
+        "Gesamt: 1660 Bytes in 5 Dateien",
+        "Verzeichnisse:",
+        f"             1660 Bytes  {tree}",
+        f"             1550 Bytes  {tree / 'big'}",
+        f"               10 Bytes  {tree / 'small'}",
+        "Größte Verzeichnisse:",
+        f"             1550 Bytes  {tree / 'big'}",
+        "Größte Dateien:",
+        f"             1000 Bytes  {tree / 'big' / 'x'}",
+    ]
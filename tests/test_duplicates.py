@@ -0,0 +1,87 @@
+"""Tests für die Duplikatsuche."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.duplicates import _full_digest, find_duplicates
+from src.file_organizer import FileOrganizer
+
+
+@pytest.fixture
+def media(tmp_path: Path) -> Path:
+    """Erstellt Dateien mit gleichen Größen, aber teils abweichendem Inhalt."""
+    block = 4096
+    big = os.urandom(5 * block)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "original.bin").write_bytes(big)
+    (tmp_path / "kopie.bin").write_bytes(big)
+    # Gleiche Größe, gleicher Anfang und gleiches Ende, anders in der Mitte
+    middle = bytearray(big)
+    middle[2 * block] ^= 0xFF
+    (tmp_path / "mitte.bin").write_bytes(bytes(middle))
+    # Gleiche Größe, anderer Anfang
+    (tmp_path / "anders.bin").write_bytes(b"x" + big[1:])
+    (tmp_path / "klein1.txt").write_text("hallo")
+    (tmp_path / "klein2.txt").write_text("hallo")
+    (tmp_path / "klein3.txt").write_text("hallo!")
+    (tmp_path / "leer1").touch()
+    (tmp_path / "leer2").touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_find_duplicates(media: Path, workers: int) -> None:
+    """Test der drei Stufen mit und ohne Prozesspool."""
+    paths = sorted(media.rglob("*.*"))
+    report = find_duplicates(paths, workers=workers, block_size=4096)
+
+    assert report.groups == [
+        [media / "a" / "original.bin", media / "kopie.bin"],
+        [media / "klein1.txt", media / "klein2.txt"],
+    ]
+    assert report.files_scanned == 7
+    assert report.bytes_total == 4 * 5 * 4096 + 5 + 5 + 6
+    # Stufe 2: je zwei Blöcke der großen, die kleinen vollständig;
+    # Stufe 3: nur die drei großen Dateien mit gleichen Randblöcken
+    assert report.bytes_read == 4 * 2 * 4096 + 5 + 5 + 3 * 5 * 4096
+
+
+def test_hardlinks_and_unreadable(tmp_path: Path) -> None:
+    """Test, dass harte Links ohne Lesen gruppiert und Fehler ignoriert werden."""
+    (tmp_path / "datei").write_text("inhalt")
+    (tmp_path / "link").hardlink_to(tmp_path / "datei")
+    (tmp_path / "kaputt").symlink_to(tmp_path / "fehlt")
+
+    report = find_duplicates(
+        [tmp_path / "datei", tmp_path / "link", tmp_path / "kaputt"], workers=1
+    )
+
+    assert report.groups == [[tmp_path / "datei", tmp_path / "link"]]
+    assert report.bytes_read == 0
+
+
+def test_vanished_file_is_skipped(tmp_path: Path) -> None:
+    """Test, dass eine zwischen den Stufen gelöschte Datei übersprungen wird."""
+    (tmp_path / "a").write_bytes(b"1" * 10)
+    (tmp_path / "b").write_bytes(b"1" * 10)
+    (tmp_path / "c").write_bytes(b"1" * 10)
+
+    def paths() -> Iterator[Path]:
+        yield from sorted(tmp_path.iterdir())
+        (tmp_path / "c").unlink()
+
+    report = find_duplicates(paths(), workers=1)
+
+    assert report.groups == [[tmp_path / "a", tmp_path / "b"]]
+    assert _full_digest((str(tmp_path / "c"), 10, 4)) is None
+
+
+def test_file_organizer_find_duplicates(media: Path) -> None:
+    """Test der Duplikatsuche über den FileOrganizer."""
+    report = FileOrganizer(media).find_duplicates(workers=1)
+
+    assert [len(group) for group in report.groups] == [2, 2]
+    assert report.files_scanned == 9
@@ -0,0 +1,130 @@
+"""Tests für das externe Sortieren mit Speichergrenze."""
+
+import csv
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+from src import external_sort
+from src.external_sort import ExternalSorter
+from src.file_organizer import FileEntry, FileOrganizer, _join, main
+
+
+@pytest.fixture
+def entries() -> list[FileEntry]:
+    """Erzeugt zufällige Einträge mit doppelten Größen und mtimes."""
+    rng = random.Random(7)  # noqa: S311
+    return [
+        FileEntry(
+            f"/daten/d{rng.randrange(20)}",
+            f"f{number}.{rng.choice(['txt', 'py', 'md'])}",
+            rng.randrange(50),
+            float(rng.randrange(10)),
+        )
+        for number in range(500)
+    ]
+
+
+def _path(entry: FileEntry) -> str:
+    return _join(entry.directory, entry.name)
+
+
+def test_small_input_is_sorted_in_memory(
+    entries: list[FileEntry], tmp_path: Path
+) -> None:
+    """Ohne Überschreiten der Grenze wird keine Datei geschrieben."""
+    sorter = ExternalSorter(temp_dir=tmp_path)
+
+    assert list(sorter.sort(entries)) == sorted(entries, key=_path)
+    assert sorter.runs == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    ("key", "reverse"), [("path", False), ("size", False), ("mtime", True)]
+)
+def test_spilled_runs_are_merged(
+    entries: list[FileEntry], tmp_path: Path, key: str, reverse: bool
+) -> None:
+    """Test der Läufe und des k-Wege-Merge für alle Schlüssel."""
+    sorter = ExternalSorter(
+        key, memory_limit=12_800, temp_dir=tmp_path, reverse=reverse
+    )
+
+    result = list(sorter.sort(entries))
+
+    def expected_key(entry: FileEntry) -> tuple[float, str]:
+        value = {"path": 0, "size": entry.size, "mtime": entry.mtime}[key]
+        return value or 0, _path(entry)
+
+    assert result == sorted(entries, key=expected_key, reverse=reverse)
+    assert sorter.runs > 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_multi_pass_merge(
+    entries: list[FileEntry], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Mehr Läufe als ``_MAX_FAN_IN`` werden in mehreren Stufen gemischt."""
+    monkeypatch.setattr(external_sort, "_MAX_FAN_IN", 2)
+    sorter = ExternalSorter("size", memory_limit=2_000, temp_dir=tmp_path)
+
+    result = list(sorter.sort(entries))
+
+    assert [entry.size for entry in result] == sorted(e.size or 0 for e in entries)
+    assert sorter.runs > 2 * len(entries) // 10
+
+
+def test_closing_early_removes_runs(entries: list[FileEntry], tmp_path: Path) -> None:
+    """Temporäre Läufe verschwinden auch bei vorzeitigem Abbruch."""
+    sorted_entries = ExternalSorter(memory_limit=12_800, temp_dir=tmp_path).sort(
+        entries
+    )
+    next(sorted_entries)
+    assert list(tmp_path.iterdir()) != []
+
+    sorted_entries.close()  # type: ignore[attr-defined]
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_arguments(tmp_path: Path) -> None:
+    """Test der Fehlermeldungen."""
+    with pytest.raises(ValueError, match="Sortierschlüssel: name"):
+        ExternalSorter("name")
+    with pytest.raises(ValueError, match="memory_limit"):
+        ExternalSorter(memory_limit=100)
+    (tmp_path / "a").touch()
+    with pytest.raises(ValueError, match="with_stat"):
+        list(ExternalSorter("size").sort(FileOrganizer(tmp_path).iter_files()))
+
+
+def test_main_sorted_output(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test von --sort mit und ohne --stats."""
+    for name, size in (("b.txt", 3), ("a.txt", 1), ("sub/c.txt", 2)):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(bytes(size))
+    monkeypatch.chdir(tmp_path)
+
+    main(["--format", "csv", "--sort", "size", "--sort-memory", "1"])
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows == [
+        ["path", "type"],
+        ["./a.txt", ".txt"],
+        ["./sub/c.txt", ".txt"],
+        ["./b.txt", ".txt"],
+    ]
+
+    main(["--format", "ndjson", "--sort", "path", "--stats"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split('"')[3] for line in lines] == [
+        "./a.txt",
+        "./b.txt",
+        "./sub/c.txt",
+    ]
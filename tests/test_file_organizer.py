@@ -1,10 +1,22 @@
 """Tests für das FileOrganizer-Modul."""
 
+import asyncio
+import csv
+import io
+import json
+import time
 from pathlib import Path
 
 import pytest
 
-from src.file_organizer import FileOrganizer
+from src.file_organizer import (
+    FileEntry,
+    FileOrganizer,
+    _join,
+    _write_records,
+    file_suffix,
+)
+from src.scan_index import ScanIndex
 
 
 def test_file_organizer_init() -> None:
@@ -33,8 +45,286 @@ def test_main(capsys: pytest.CaptureFixture[str]) -> None:
     """Test der main Funktion."""
     from src.file_organizer import main
 
-    main()
+    main([])
 
     captured = capsys.readouterr()
     assert "Gefundene Dateitypen:" in captured.out
     assert "Dateien" in captured.out
+
+
+def _legacy_scan(source_dir: Path) -> dict[str, list[Path]]:
+    """Referenz: ursprüngliche rglob-Implementierung."""
+    files_by_type: dict[str, list[Path]] = {}
+    for file_path in source_dir.rglob("*"):
+        if file_path.is_file():
+            files_by_type.setdefault(file_path.suffix.lower(), []).append(file_path)
+    return files_by_type
+
+
+@pytest.mark.parametrize(
+    "name", ["a.py", "A.PY", "archiv.tar.gz", ".bashrc", "README", "datei.", ".."]
+)
+def test_file_suffix_matches_path_suffix(name: str) -> None:
+    """Test, dass file_suffix sich wie Path.suffix.lower() verhält."""
+    assert file_suffix(name) == Path(name).suffix.lower()
+
+
+def test_iter_files_order_and_records(tmp_path: Path) -> None:
+    """Test der deterministischen Pre-Order-Reihenfolge von iter_files."""
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "x").mkdir(parents=True)
+    (tmp_path / "z.txt").touch()
+    (tmp_path / "b" / "2.md").touch()
+    (tmp_path / "a" / "1.md").touch()
+    (tmp_path / "a" / "x" / "tief.py").touch()
+
+    entries = list(FileOrganizer(tmp_path).iter_files())
+
+    assert [entry.path.relative_to(tmp_path).as_posix() for entry in entries] == [
+        "z.txt",
+        "a/1.md",
+        "a/x/tief.py",
+        "b/2.md",
+    ]
+    assert entries[0] == FileEntry(str(tmp_path), "z.txt")
+    assert entries[0].suffix == ".txt"
+
+
+def test_iter_files_skips_symlinked_dirs(tmp_path: Path) -> None:
+    """Test, dass Verzeichnis-Links nicht verfolgt, Datei-Links aber gezählt werden."""
+    (tmp_path / "echt").mkdir()
+    (tmp_path / "echt" / "datei.txt").touch()
+    (tmp_path / "link").symlink_to(tmp_path / "echt")
+    (tmp_path / "datei-link.txt").symlink_to(tmp_path / "echt" / "datei.txt")
+
+    names = sorted(entry.name for entry in FileOrganizer(tmp_path).iter_files())
+
+    assert names == ["datei-link.txt", "datei.txt"]
+
+
+def test_iter_files_missing_source(tmp_path: Path) -> None:
+    """Test, dass ein fehlendes Quellverzeichnis keine Dateien liefert."""
+    assert list(FileOrganizer(tmp_path / "fehlt").iter_files()) == []
+
+
+def test_scan_files_matches_legacy_scan(tmp_path: Path) -> None:
+    """Test, dass scan_files dieselben Gruppen wie der rglob-Scan liefert."""
+    for index in range(30):
+        directory = tmp_path / f"d{index % 4}" / f"s{index % 3}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{index}{['.py', '.MD', '', '.tar.gz'][index % 4]}").touch()
+
+    files = FileOrganizer(tmp_path).scan_files()
+    expected = _legacy_scan(tmp_path)
+
+    assert {ext: sorted(paths) for ext, paths in files.items()} == {
+        ext: sorted(paths) for ext, paths in expected.items()
+    }
+
+
+def test_parallel_scan_matches_serial(tmp_path: Path) -> None:
+    """Test, dass der parallele Durchlauf exakt der seriellen Reihenfolge folgt."""
+    for index in range(60):
+        directory = tmp_path / f"d{index % 5}" / f"s{index % 4}" / f"t{index % 3}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{index}{['.py', '.md', ''][index % 3]}").touch()
+
+    serial = list(FileOrganizer(tmp_path).iter_files())
+    parallel = list(FileOrganizer(tmp_path, workers=4).iter_files())
+
+    assert parallel == serial
+    assert FileOrganizer(tmp_path, workers=4).scan_files() == (
+        FileOrganizer(tmp_path).scan_files()
+    )
+
+
+def test_parallel_scan_can_be_closed_early(tmp_path: Path) -> None:
+    """Test, dass ein vorzeitig geschlossener paralleler Durchlauf sauber endet."""
+    for index in range(20):
+        directory = tmp_path / f"d{index}"
+        directory.mkdir()
+        (directory / "datei.txt").touch()
+
+    entries = FileOrganizer(tmp_path, workers=3).iter_files()
+    first = next(entries)
+    entries.close()
+
+    assert first.name == "datei.txt"
+
+
+def _flat_tree(root: Path, directories: int) -> None:
+    for index in range(directories):
+        (root / f"d{index:02}").mkdir()
+        (root / f"d{index:02}" / f"f{index}.txt").touch()
+
+
+def _record_listings(monkeypatch: pytest.MonkeyPatch, delay: float) -> list[str]:
+    listed: list[str] = []
+    list_directory = FileOrganizer._list_directory
+
+    def recording(
+        self: FileOrganizer, directory: str, with_stat: bool = False
+    ) -> tuple[list[FileEntry], list[str]]:
+        listed.append(directory)
+        time.sleep(delay)
+        return list_directory(self, directory, with_stat)
+
+    monkeypatch.setattr(FileOrganizer, "_list_directory", recording)
+    return listed
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_ascan_yields_all_files_in_batches(tmp_path: Path, workers: int) -> None:
+    """Test, dass ascan dieselben Dateien wie iter_files in Chargen liefert."""
+    tree = tmp_path / "baum"
+    tree.mkdir()
+    _flat_tree(tree, 25)
+    (tree / "d00" / "extra.py").write_text("x")
+    index = ScanIndex(tmp_path / "index.sqlite")
+    organizer = FileOrganizer(tree, workers=workers, index=index)
+
+    async def collect() -> list[list[FileEntry]]:
+        return [batch async for batch in organizer.ascan(batch_size=4, with_stat=True)]
+
+    batches = asyncio.run(collect())
+    index.close()
+
+    assert [len(batch) for batch in batches[:-1]] == [4] * (len(batches) - 1)
+    entries = [entry for batch in batches for entry in batch]
+    assert sorted(entries) == sorted(FileOrganizer(tree).iter_files(True))
+    if workers == 1:
+        assert entries == list(FileOrganizer(tree).iter_files(True))
+
+
+def test_ascan_applies_backpressure(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass ohne Nachfrage keine weiteren Verzeichnisse gelesen werden."""
+    _flat_tree(tmp_path, 30)
+    listed = _record_listings(monkeypatch, delay=0)
+
+    async def consume_slowly() -> tuple[int, int]:
+        scan = FileOrganizer(tmp_path, workers=2).ascan(batch_size=1)
+        await anext(scan)
+        await asyncio.sleep(0.05)
+        paused = len(listed)
+        remaining = [batch async for batch in scan]
+        return paused, len(remaining)
+
+    paused, remaining = asyncio.run(consume_slowly())
+
+    assert paused <= 3
+    assert remaining == 29
+    assert len(listed) == 31
+
+
+def test_ascan_cancellation_stops_walk(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass ein abgebrochener Scan keine weiteren Verzeichnisse liest."""
+    _flat_tree(tmp_path, 40)
+    listed = _record_listings(monkeypatch, delay=0.02)
+
+    async def consume() -> None:
+        async for _ in FileOrganizer(tmp_path, workers=2).ascan(batch_size=100):
+            pass  # pragma: no cover - erste Charge erst nach dem Abbruch
+
+    async def cancel_after_start() -> None:
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_after_start())
+    stopped = len(listed)
+    time.sleep(0.1)
+
+    assert len(listed) == stopped < 41
+
+
+def test_ascan_invalid_batch_size() -> None:
+    """Test, dass eine Chargengröße kleiner als 1 abgelehnt wird."""
+
+    async def start() -> None:
+        await anext(FileOrganizer(".").ascan(batch_size=0))
+
+    with pytest.raises(ValueError, match="batch_size"):
+        asyncio.run(start())
+
+
+def test_invalid_workers() -> None:
+    """Test, dass eine Worker-Anzahl kleiner als 1 abgelehnt wird."""
+    with pytest.raises(ValueError, match="workers"):
+        FileOrganizer(".", workers=0)
+
+
+def test_main_with_jobs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der main Funktion mit parallelem Durchlauf."""
+    from src.file_organizer import main
+
+    (tmp_path / "a.py").touch()
+    (tmp_path / "b.py").touch()
+    monkeypatch.chdir(tmp_path)
+
+    main(["--jobs", "2"])
+
+    assert "  .py: 2 Dateien" in capsys.readouterr().out
+
+
+def test_join_like_direntry_path() -> None:
+    """Test, dass _join Pfade wie DirEntry.path zusammensetzt."""
+    assert _join("/", "etc") == "/etc"
+    assert _join("/etc", "hosts") == "/etc/hosts"
+
+
+def test_main_streaming_formats(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der Ausgabeformate ndjson und csv."""
+    from src.file_organizer import main
+
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "daten.JSON").write_text("{}")
+    (tmp_path / "a,b.txt").touch()
+    monkeypatch.chdir(tmp_path)
+
+    main(["--format", "ndjson"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records == [
+        {"path": _join(".", "a,b.txt"), "type": ".txt"},
+        {"path": _join(_join(".", "sub"), "daten.JSON"), "type": ".json"},
+    ]
+
+    main(["--format", "csv", "--stats"])
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ["path", "type", "size", "mtime"]
+    assert rows[1][:3] == [_join(".", "a,b.txt"), ".txt", "0"]
+    assert rows[2][2] == "2"
+
+
+def test_write_records_stops_on_broken_pipe(tmp_path: Path) -> None:
+    """Test, dass ein geschlossener Leser die Ausgabe ohne Fehler beendet."""
+
+    class ClosedPipe(io.StringIO):
+        def __init__(self, fd: int) -> None:
+            super().__init__()
+            self.fd = fd
+
+        def write(self, _text: str) -> int:
+            raise BrokenPipeError
+
+        def fileno(self) -> int:
+            return self.fd
+
+    (tmp_path / "datei.txt").touch()
+    with (tmp_path / "ausgabe").open("w") as target:
+        _write_records(
+            ClosedPipe(target.fileno()),
+            ((entry, entry.suffix) for entry in FileOrganizer(tmp_path).iter_files()),
+            "ndjson",
+            with_stat=False,
+        )
+    assert (tmp_path / "ausgabe").read_text() == ""
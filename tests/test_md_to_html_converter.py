@@ -0,0 +1,785 @@
+"""Tests für den Markdown-zu-HTML-Konverter."""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from tools import md_to_html_converter as converter
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Arbeitsverzeichnis mit zwei Dokumenten; Caches liegen unter tmp_path."""
+    root = tmp_path / "projekt"
+    (root / "docs").mkdir(parents=True)
+    (root / "a.md").write_text("# A\n\nText\n", encoding="utf-8")
+    (root / "docs" / "b.md").write_text("# B\n\n$x^2$\n", encoding="utf-8")
+    (root / "main-design.css").write_text("body {}\n", encoding="utf-8")
+    monkeypatch.chdir(root)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    return root
+
+
+@pytest.fixture
+def pandoc(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Ersetzt Pandoc: schreibt die Ausgabedatei und protokolliert die Aufrufe.
+
+    Quellen, deren Name 'kaputt' enthält, schlagen fehl.
+    """
+    calls: list[list[str]] = []
+
+    def run_pandoc(cmd: list[str], _input_data: bytes | None = None) -> str | None:
+        calls.append(cmd)
+        if any("kaputt" in str(part) for part in cmd):
+            return f"Syntaxfehler in {cmd[1]}"
+        Path(cmd[cmd.index("-o") + 1]).write_text(f"<body>{cmd[1]}</body>")
+        if "-M" in cmd:
+            # ast_dump.lua: AST in die übergebene Datei schreiben
+            target = cmd[cmd.index("-M") + 1].split("=", 1)[1]
+            Path(target).write_text('{"blocks": []}')
+        return None
+
+    monkeypatch.setattr(converter, "get_pandoc_version", lambda: "pandoc 3.1.3")
+    monkeypatch.setattr(converter, "run_pandoc", run_pandoc)
+    return calls
+
+
+def _args(**overrides: object) -> argparse.Namespace:
+    """Kommandozeilenargumente mit den Standardwerten von main."""
+    defaults: dict[str, object] = {
+        "files": [],
+        "no_start_page": False,
+        "verbose": False,
+        "force": False,
+        "jobs": 1,
+        "cache_dir": "",
+        "renderer": "pandoc",
+    }
+    return argparse.Namespace(**(defaults | overrides))
+
+
+def _rendered(calls: list[list[str]]) -> list[str]:
+    """Quellen der HTML-Konvertierungen in Aufrufreihenfolge; leert das Protokoll."""
+    sources = [cmd[1] for cmd in calls if "--standalone" in cmd]
+    calls.clear()
+    return sources
+
+
+def test_manifest_skips_unchanged_files(project: Path, pandoc: list[list[str]]) -> None:
+    """Test, dass nur geänderte Quellen und Eingaben neu konvertiert werden."""
+    assert converter.convert_all_markdown_files(_args()) == []
+    assert sorted(_rendered(pandoc)) == ["./a.md", "docs/b.md"]
+    manifest = json.loads((project / converter.MANIFEST_FILE).read_text())
+    assert sorted(manifest["files"]) == ["./a.md", "docs/b.md"]
+
+    assert converter.convert_all_markdown_files(_args()) == []
+    assert _rendered(pandoc) == []
+    assert "a.html" in (project / "start.html").read_text()
+
+    (project / "a.md").write_text("# A\n\nNeu\n", encoding="utf-8")
+    converter.convert_all_markdown_files(_args())
+    assert _rendered(pandoc) == ["./a.md"]
+
+    (project / "docs" / "b.html").unlink()
+    converter.convert_all_markdown_files(_args())
+    assert _rendered(pandoc) == ["docs/b.md"]
+
+    with (project / "main-design.css").open("a", encoding="utf-8") as f:
+        f.write("h1 {}\n")
+    converter.convert_all_markdown_files(_args())
+    assert sorted(_rendered(pandoc)) == ["./a.md", "docs/b.md"]
+
+    converter.convert_all_markdown_files(_args(force=True))
+    assert sorted(_rendered(pandoc)) == ["./a.md", "docs/b.md"]
+
+
+def test_manifest_invalidation_by_version_and_deletion(
+    project: Path, pandoc: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass eine neue Pandoc-Version alles und gelöschte Quellen entfernt."""
+    converter.convert_all_markdown_files(_args())
+    _rendered(pandoc)
+
+    monkeypatch.setattr(converter, "get_pandoc_version", lambda: "pandoc 3.2")
+    (project / "a.md").unlink()
+    converter.convert_all_markdown_files(_args())
+
+    assert _rendered(pandoc) == ["docs/b.md"]
+    manifest = json.loads((project / converter.MANIFEST_FILE).read_text())
+    assert list(manifest["files"]) == ["docs/b.md"]
+
+
+def test_failed_files_are_not_recorded(
+    project: Path, pandoc: list[list[str]], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test, dass fehlgeschlagene Dateien gemeldet und erneut versucht werden."""
+    (project / "kaputt.md").write_text("# K\n", encoding="utf-8")
+
+    failures = converter.convert_all_markdown_files(_args())
+
+    assert failures == [("./kaputt.md", "Syntaxfehler in ./kaputt.md")]
+    assert "Fehler bei ./kaputt.md" in capsys.readouterr().err
+    assert "kaputt" not in (project / "start.html").read_text()
+    _rendered(pandoc)
+    assert converter.convert_all_markdown_files(_args()) == failures
+    assert _rendered(pandoc) == ["./kaputt.md"]
+
+
+def test_concurrent_manifest_saves(tmp_path: Path) -> None:
+    """Regressionstest: gleichzeitige Builds schreiben das Manifest ohne Fehler."""
+    path = str(tmp_path / converter.MANIFEST_FILE)
+    barrier = threading.Barrier(2)
+    errors: list[BaseException] = []
+
+    def save(name: str) -> None:
+        barrier.wait()
+        try:
+            for index in range(200):
+                converter.save_manifest({name: {"source": str(index)}}, path)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert converter.load_manifest(path) in (
+        {"a": {"source": "199"}},
+        {"b": {"source": "199"}},
+    )
+    assert [p.name for p in tmp_path.iterdir()] == [converter.MANIFEST_FILE]
+
+
+def test_missing_pandoc_and_empty_project(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass auch die frühen Ausstiege eine Liste zurückgeben."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert converter.convert_all_markdown_files(_args(renderer="python")) == []
+
+    monkeypatch.setattr(converter, "get_pandoc_version", lambda: None)
+    failures = converter.convert_all_markdown_files(_args())
+    assert [name for name, _ in failures] == ["pandoc"]
+
+
+@pytest.mark.usefixtures("pandoc")
+def test_parallel_jobs_keep_input_order(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass --jobs Fehler und Ausgaben in Eingabereihenfolge sammelt."""
+    names = [f"d{index:02}" for index in range(12)]
+    for index, name in enumerate(names):
+        suffix = "-kaputt" if index % 4 == 1 else ""
+        (project / f"{name}{suffix}.md").write_text(f"# {name}\n", encoding="utf-8")
+    stub = converter.run_pandoc
+    active = peak = 0
+    lock = threading.Lock()
+
+    def slow_run_pandoc(cmd: list[str], input_data: bytes | None = None) -> str | None:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Spätere Dateien werden zuerst fertig
+        time.sleep(0.002 * (len(names) - names.index(Path(cmd[1]).stem[:3])))
+        with lock:
+            active -= 1
+        return stub(cmd, input_data)
+
+    monkeypatch.setattr(converter, "run_pandoc", slow_run_pandoc)
+    (project / "a.md").unlink()
+    (project / "docs" / "b.md").unlink()
+
+    failures = converter.convert_all_markdown_files(_args(jobs=4))
+
+    assert 1 < peak <= 4
+    assert [md for md, _ in failures] == [
+        f"./{name}-kaputt.md" for index, name in enumerate(names) if index % 4 == 1
+    ]
+    start_page = (project / "start.html").read_text()
+    linked = [name for name in names if f"{name}.html" in start_page]
+    assert linked == [name for index, name in enumerate(names) if index % 4 != 1]
+    assert start_page.index("d00.html") < start_page.index("d11.html")
+    manifest = json.loads((project / converter.MANIFEST_FILE).read_text())
+    assert sorted(manifest["files"]) == [f"./{name}.md" for name in linked]
+
+
+def _pandoc_stages(calls: list[list[str]]) -> list[tuple[str, str]]:
+    """(Stufe, Eingabe) je Pandoc-Aufruf, sortiert; leert das Protokoll.
+
+    Stufen: 'ast' (HTML aus gespeichertem AST), 'markdown+ast' (aus dem
+    Markdown, AST wird dabei abgelegt) und 'markdown' (ohne Cache).
+    """
+    stages = []
+    for cmd in calls:
+        if cmd[1] == "-f":
+            stages.append(("ast", Path(cmd[3]).stem))
+        elif "-M" in cmd:
+            stages.append(("markdown+ast", Path(cmd[1]).stem))
+        else:
+            stages.append(("markdown", Path(cmd[1]).stem))
+    calls.clear()
+    return sorted(stages)
+
+
+def test_ast_cache_hits_misses_and_invalidation(
+    project: Path, pandoc: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass jeder Build einen Aufruf je Datei braucht und den AST nutzt."""
+    cache_dir = str(project / ".cache")
+
+    def build() -> list[tuple[str, str]]:
+        assert converter.convert_all_markdown_files(_args(cache_dir=cache_dir)) == []
+        return _pandoc_stages(pandoc)
+
+    def touch_css() -> None:
+        with (project / "main-design.css").open("a", encoding="utf-8") as f:
+            f.write("p {}\n")
+
+    # Erster Build (frischer Checkout): AST entsteht im selben Aufruf
+    assert build() == [("markdown+ast", "a"), ("markdown+ast", "b")]
+    assert len(list((project / ".cache" / "ast").glob("*/*/*.json"))) == 2
+    assert not list((project / ".cache").rglob("*.tmp"))
+
+    # Nur das CSS geändert: Treffer, kein erneutes Parsen
+    touch_css()
+    assert build() == [("ast", "a"), ("ast", "b")]
+
+    # Geänderte Quelle: Fehlschlag, neuer AST
+    (project / "a.md").write_text("# A\n\nNeu\n", encoding="utf-8")
+    assert build() == [("markdown+ast", "a")]
+    touch_css()
+    assert build() == [("ast", "a"), ("ast", "b")]
+
+    # Neue Pandoc-Version: alte Einträge gelten nicht mehr
+    monkeypatch.setattr(converter, "get_pandoc_version", lambda: "pandoc 3.2")
+    assert build() == [("markdown+ast", "a"), ("markdown+ast", "b")]
+
+    # Ohne --cache-dir kein AST
+    touch_css()
+    converter.convert_all_markdown_files(_args())
+    assert _pandoc_stages(pandoc) == [("markdown", "a"), ("markdown", "b")]
+
+
+def test_failed_render_stores_no_ast(project: Path, pandoc: list[list[str]]) -> None:
+    """Test, dass ein fehlgeschlagener Aufruf keinen (leeren) AST hinterlässt."""
+    (project / "kaputt.md").write_text("# K\n", encoding="utf-8")
+    cache_dir = project / ".cache"
+
+    converter.convert_all_markdown_files(_args(cache_dir=str(cache_dir)))
+    converter.convert_all_markdown_files(_args(cache_dir=str(cache_dir)))
+
+    assert ("markdown+ast", "kaputt") in _pandoc_stages(pandoc)
+    assert sorted(p.name for p in cache_dir.glob("ast/*/*/*")) == ["a.json", "b.json"]
+
+
+@pytest.mark.skipif(shutil.which("pandoc") is None, reason="Pandoc fehlt")
+def test_rendering_from_cached_ast_matches_markdown(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test mit echtem Pandoc: der abgelegte AST ergibt dasselbe HTML."""
+    (project / "a.md").write_text(
+        "# A\n\n*Text* mit `code` und [Link](b.html).\n\n| x | y |\n|---|---|\n"
+        "| 1 | 2 |\n\n```mermaid\ngraph TD\n  A-->B\n```\n",
+        encoding="utf-8",
+    )
+    args = _args(cache_dir=str(project / ".cache"), files=["a.md"])
+    assert converter.convert_all_markdown_files(args) == []
+    from_markdown = (project / "a.html").read_text(encoding="utf-8")
+    assert list((project / ".cache" / "ast").glob("*/*/a.json"))
+
+    calls: list[list[str]] = []
+    run_pandoc = converter.run_pandoc
+    monkeypatch.setattr(
+        converter,
+        "run_pandoc",
+        lambda cmd, input_data=None: calls.append(cmd) or run_pandoc(cmd, input_data),
+    )
+    args.force = True
+    assert converter.convert_all_markdown_files(args) == []
+    assert _pandoc_stages(calls) == [("ast", "a")]
+    assert (project / "a.html").read_text(encoding="utf-8") == from_markdown
+
+
+def test_write_asset_reuses_intact_files(tmp_path: Path) -> None:
+    """Test, dass ein unveränderter Asset wiederverwendet wird."""
+    path = Path(converter.write_asset(str(tmp_path), "filter.lua", "return {}\n"))
+    inode = path.stat().st_ino
+
+    again = Path(converter.write_asset(str(tmp_path), "filter.lua", "return {}\n"))
+
+    assert again == path
+    assert again.stat().st_ino == inode
+    assert path.parent.name == hashlib.sha256(b"return {}\n").hexdigest()
+
+
+def test_write_asset_replaces_tampered_files(tmp_path: Path) -> None:
+    """Test, dass ein veränderter oder ersetzter Asset neu geschrieben wird."""
+    path = Path(converter.write_asset(str(tmp_path), "filter.lua", "return {}\n"))
+    path.write_text("os.execute('boom')\n", encoding="utf-8")
+
+    assert converter.write_asset(str(tmp_path), "filter.lua", "return {}\n") == str(
+        path
+    )
+    assert path.read_text(encoding="utf-8") == "return {}\n"
+
+    planted = tmp_path / "planted.lua"
+    planted.write_text("os.execute('boom')\n", encoding="utf-8")
+    path.unlink()
+    path.symlink_to(planted)
+    converter.write_asset(str(tmp_path), "filter.lua", "return {}\n")
+    assert not path.is_symlink()
+    assert path.read_text(encoding="utf-8") == "return {}\n"
+    assert planted.read_text(encoding="utf-8") == "os.execute('boom')\n"
+    assert [p.name for p in path.parent.iterdir()] == ["filter.lua"]
+
+
+def test_assets_live_in_user_cache(
+    tmp_path: Path, project: Path, pandoc: list[list[str]]
+) -> None:
+    """Test, dass Assets ohne --cache-dir im Cache des Benutzers liegen."""
+    converter.convert_all_markdown_files(_args())
+    filters = [part for cmd in pandoc for part in cmd if part.startswith("--lua")]
+
+    asset_dir = tmp_path / "xdg" / "md_to_html_converter" / "assets"
+    assert converter.default_asset_dir() == str(asset_dir)
+    assert filters
+    assert all(f.startswith(f"--lua-filter={asset_dir}{os.sep}") for f in filters)
+
+    pandoc.clear()
+    converter.convert_all_markdown_files(
+        _args(force=True, cache_dir=str(project / ".cache"))
+    )
+    filters = [part for cmd in pandoc for part in cmd if part.startswith("--lua")]
+    assert all(str(project / ".cache" / "assets") in f for f in filters)
+
+
+def _body(markdown: str) -> str:
+    """HTML des Python-Renderers ohne den main-container."""
+    html = converter.MarkdownRenderer().render(markdown)
+    return html.removeprefix('<div class="main-container">\n').removesuffix("\n</div>")
+
+
+@pytest.mark.parametrize(
+    ("markdown", "expected"),
+    [
+        ("# Größe & Maß", '<h1 id="größe-maß">Größe &amp; Maß</h1>'),
+        (
+            "# Titel\n\n## Titel ##\n\nText\n---",
+            (
+                '<h1 id="titel">Titel</h1>\n<h2 id="titel-1">Titel</h2>\n'
+                '<h2 id="text">Text</h2>'
+            ),
+        ),
+        ("# 1. Kapitel", '<h1 id="kapitel">1. Kapitel</h1>'),
+        (
+            "- a\n  - b\n- c",
+            "<ul>\n<li>a\n<ul>\n<li>b</li>\n</ul></li>\n<li>c</li>\n</ul>",
+        ),
+        ("- a\n\n- b", "<ul>\n<li><p>a</p></li>\n<li><p>b</p></li>\n</ul>"),
+        ("3. a\n4. b", '<ol start="3" type="1">\n<li>a</li>\n<li>b</li>\n</ol>'),
+        ("```\n<b>&\n```", "<pre><code>&lt;b&gt;&amp;</code></pre>"),
+        (
+            "~~~ {.python}\nx = 1\n~~~",
+            '<pre class="python"><code>x = 1</code></pre>',
+        ),
+        ("    eingerückt\n\n    code", "<pre><code>eingerückt\n\ncode</code></pre>"),
+        ("`a*b*`", "<p><code>a*b*</code></p>"),
+        (
+            "```mermaid\ngraph TD\n  A-->B\n```",
+            '<div class="mermaid">\ngraph TD\n  A-->B\n</div>\n',
+        ),
+        (
+            "$a<b$ kostet $5 und $$x$$",
+            (
+                '<p><span class="math math-inline">$a&lt;b$</span> kostet $5 und '
+                '<div class="math math-display">$$x$$</div></p>'
+            ),
+        ),
+        ("$$\n\\int x\n$$", '<div class="math math-display">$$\n\\int x\n$$</div>'),
+        ("\\$x$ und $ y$", "<p>$x$ und $ y$</p>"),
+    ],
+)
+def test_renderer_blocks(markdown: str, expected: str) -> None:
+    """Test von Überschriften, Listen, Code, Mermaid und Formeln."""
+    assert _body(markdown) == expected
+
+
+@pytest.mark.parametrize(
+    ("markdown", "expected"),
+    [
+        ("**a** und *b*", "<strong>a</strong> und <em>b</em>"),
+        ("***x***", "<strong><em>x</em></strong>"),
+        ("**a *b***", "<strong>a <em>b</em></strong>"),
+        ("*a **b***", "<em>a <strong>b</strong></em>"),
+        ("***a** b*", "<em><strong>a</strong> b</em>"),
+        ("a*b*c", "a<em>b</em>c"),
+        ("snake_case_name", "snake_case_name"),
+        ("_em_ und __st__", "<em>em</em> und <strong>st</strong>"),
+        ("~~weg~~ und ~x~", "<del>weg</del> und ~x~"),
+        ("**offen *em*", "**offen <em>em</em>"),
+        ("* a*", None),
+        ("x * y * z", "x * y * z"),
+        ("a **b\nc** d", "a <strong>b\nc</strong> d"),
+        ("`*x*` *y*", "<code>*x*</code> <em>y</em>"),
+        ("$a*b$ *c*", '<span class="math math-inline">$a*b$</span> <em>c</em>'),
+        ("[*l*](u) \\*n\\*", '<a href="u"><em>l</em></a> *n*'),
+    ],
+)
+def test_renderer_emphasis(markdown: str, expected: str | None) -> None:
+    """Test der Hervorhebungen einschließlich unpaariger Begrenzer."""
+    if expected is None:
+        assert "<em>" not in _body(markdown)
+    else:
+        assert _body(markdown) == f"<p>{expected}</p>"
+
+
+def test_unbalanced_delimiters_render_in_linear_time() -> None:
+    """Regressionstest: unpaarige * und _ dürfen nicht quadratisch werden."""
+    paragraph = "*a _b ~~c **d __e " * 3500
+
+    start = time.perf_counter()
+    body = _body(paragraph)
+    elapsed = time.perf_counter() - start
+
+    assert len(paragraph) > 60_000
+    assert "<em>" not in body
+    assert "<strong>" not in body
+    assert elapsed < 2
+
+
+@pytest.mark.skipif(shutil.which("pandoc") is None, reason="Pandoc fehlt")
+@pytest.mark.parametrize(
+    "markdown",
+    [
+        "# Titel\n\nAbsatz mit **fett**, *kursiv*, ***beides*** und ~~weg~~.",
+        "- eins\n- zwei\n  - tief\n\n1. a\n2. b",
+        "```\n<code> & mehr\n```\n\n    eingerückt",
+        "```mermaid\ngraph TD\n  A-->B\n```",
+        "Inline $x^2$ kostet $5, aber $a$ nicht.",
+        "| A | B |\n|:--|--:|\n| 1 | 2 |\n| 3 | 4 |",
+        '> Zitat mit *Betonung*\n\n[Link](https://example.org "T") <a@b.de>',
+        "***a** b* und a*b*c und snake_case_name",
+    ],
+)
+def test_renderer_matches_pandoc(markdown: str, tmp_path: Path) -> None:
+    """Test, dass der Python-Renderer wie Pandoc mit dem Lua-Filter rendert.
+
+    Verglichen wird mit zusammengefasstem Leerraum; die Zeilenklassen
+    älterer Pandoc-Versionen (header, odd, even) werden entfernt.
+    """
+    lua_filter = converter.create_main_enhanced_filter(str(tmp_path))
+    pandoc = shutil.which("pandoc") or "pandoc"
+    result = subprocess.run(  # noqa: S603
+        [pandoc, "-f", "markdown", "-t", "html", f"--lua-filter={lua_filter}"],
+        input=markdown,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    def normalized(html: str) -> str:
+        return " ".join(re.sub(r'<tr class="\w+">', "<tr>", html).split())
+
+    assert normalized(converter.MarkdownRenderer().render(markdown)) == normalized(
+        result.stdout
+    )
+
+
+def _scan(text: str) -> tuple[str, converter.ContentScanner]:
+    """Lässt den ContentScanner über einen Text laufen."""
+    scanner = converter.ContentScanner()
+    output = "".join(scanner.scan(text.splitlines(keepends=True)))
+    return output, scanner
+
+
+@pytest.mark.parametrize(
+    ("text", "mermaid", "math"),
+    [
+        ("```mermaid\nflowchart LR\n```\n", True, False),
+        ("~~~ {.mermaid}\nflowchart LR\n~~~\n", True, False),
+        ("Formel $a+b$ im Text\n", False, True),
+        ("$$\nx\n$$\n", False, True),
+        ("Die Formel \\(a\\) und \\[b\\]\n", False, True),
+        ("\\begin{align}\nx\n\\end{align}\n", False, True),
+        ("Preis $5 bis $10\n", False, False),
+        ("Maskiert \\$a$ und `$b$`\n", False, False),
+        ("```\n$a$\n```mermaid\ngraph TD A\n```\n", False, False),
+        ("    eingerückt\n~~~~\n$a$\n~~~\n~~~~\n", False, False),
+    ],
+)
+def test_scanner_detects_mermaid_and_math(text: str, mermaid: bool, math: bool) -> None:
+    """Test der Erkennung außerhalb von Code-Zäunen."""
+    output, scanner = _scan(text)
+
+    assert (scanner.has_mermaid, scanner.has_math) == (mermaid, math)
+    assert not scanner.fixed
+    assert output == text
+
+
+def test_scanner_wraps_raw_diagrams() -> None:
+    """Test, dass rohe Diagramme bis vor die nächste Zeile ohne Einzug reichen."""
+    text = (
+        "Text\n\ngraph TD A-->B\n    B-->C\n\n  C-->D\n\nDanach graph TD X\n"
+        "\ngraph TD Y-->Z"
+    )
+
+    output, scanner = _scan(text)
+
+    assert scanner.has_mermaid
+    assert scanner.fixed
+    assert output == (
+        "Text\n\n```mermaid\nflowchart TD A-->B\n    B-->C\n\n  C-->D\n```\n"
+        "\nDanach graph TD X\n\n```mermaid\nflowchart TD Y-->Z\n```\n"
+    )
+    assert not _scan(output)[1].fixed
+
+
+def test_check_and_fix_content_rewrites_files(tmp_path: Path) -> None:
+    """Test, dass nur Dateien mit rohen Diagrammen ersetzt werden."""
+    raw = tmp_path / "roh.md"
+    raw.write_bytes(b"# R\r\n\r\ngraph TD A-->B\r\n")
+    math = tmp_path / "mathe.md"
+    math.write_text("$a$\n", encoding="utf-8")
+    broken = tmp_path / "kaputt.md"
+    broken.write_bytes(b"\xff\xfe$a$")
+    files = [str(raw), str(math), str(broken), str(tmp_path / "fehlt.md")]
+
+    mermaid, maths, updated = converter.check_and_fix_content(files)
+
+    assert (mermaid, maths, updated) == ([str(raw)], [str(math)], [str(raw)])
+    assert raw.read_bytes() == (b"# R\r\n\r\n```mermaid\nflowchart TD A-->B\r\n```\n")
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_rewrite_keeps_foreign_temp_files_and_mode(tmp_path: Path) -> None:
+    """Test, dass ein vorhandenes roh.md.tmp unberührt und der Modus erhalten bleibt."""
+    raw = tmp_path / "roh.md"
+    raw.write_text("graph TD A-->B\n", encoding="utf-8")
+    raw.chmod(0o640)
+    leftover = tmp_path / "roh.md.tmp"
+    leftover.write_text("fremd\n", encoding="utf-8")
+
+    assert converter.check_and_fix_content([str(raw)])[2] == [str(raw)]
+
+    assert raw.read_text(encoding="utf-8").startswith("```mermaid\n")
+    assert raw.stat().st_mode & 0o777 == 0o640
+    assert leftover.read_text(encoding="utf-8") == "fremd\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["roh.md", "roh.md.tmp"]
+
+
+def test_failed_rewrite_removes_temp_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass bei einem Fehler die Quelle bleibt und kein Temp-Rest entsteht."""
+    raw = tmp_path / "roh.md"
+    raw.write_text("graph TD A-->B\n", encoding="utf-8")
+
+    def fail(*_: object) -> None:
+        msg = "schreibgeschützt"
+        raise PermissionError(msg)
+
+    monkeypatch.setattr(converter.os, "replace", fail)
+
+    assert converter.check_and_fix_content([str(raw)]) == ([], [], [])
+    assert raw.read_text(encoding="utf-8") == "graph TD A-->B\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["roh.md"]
+
+
+def test_scanner_is_linear_on_unbalanced_dollars() -> None:
+    """Regressionstest: viele unpaarige $ werden in linearer Zeit geprüft."""
+    text = "$a $5 " * 100_000 + "\n" + "Preis $a b $5 und\n" * 50_000
+
+    start = time.perf_counter()
+    output, scanner = _scan(text)
+    elapsed = time.perf_counter() - start
+
+    assert not scanner.has_math
+    assert output == text
+    assert elapsed < 2
+
+
+class _FakeInotify:
+    """Liefert vorgegebene Ereignisse und stellt dabei eine Uhr vor.
+
+    Ein leerer Stapel bedeutet, dass das Timeout ohne Ereignis abläuft.
+    """
+
+    def __init__(self, batches: Iterable[list[str]]) -> None:
+        self.batches = iter(batches)
+        self.now = 0.0
+        self.timeouts: list[float | None] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def read_paths(self, timeout: float | None) -> list[str]:
+        self.timeouts.append(timeout)
+        paths = next(self.batches)
+        if not paths:
+            assert timeout is not None
+            self.now += timeout
+        elif timeout is not None:
+            self.now += min(0.1, timeout)
+        return paths
+
+
+def _wait(monkeypatch: pytest.MonkeyPatch, inotify: _FakeInotify) -> list[str]:
+    monkeypatch.setattr(converter, "time", inotify)
+    return converter.wait_for_changes(inotify, "main-design.css")
+
+
+def test_wait_for_changes_batches_sources(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test, dass nur Quellen zählen und eine Serie gesammelt gemeldet wird."""
+    inotify = _FakeInotify(
+        [
+            ["./a.html", "./.md_to_html_manifest.json"],
+            ["./.a.md.swp", "./start.html"],
+            ["./a.md"],
+            ["./docs/b.md", "./a.md"],
+            ["./main-design.css", "./docs/b.html"],
+            [],
+        ]
+    )
+
+    changed = _wait(monkeypatch, inotify)
+
+    assert changed == ["./a.md", "./docs/b.md", "./main-design.css"]
+    assert inotify.timeouts == [None] * 3 + [converter.WATCH_DEBOUNCE] * 3
+
+
+def test_wait_for_changes_caps_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test, dass anhaltende Ausgaben den Build höchstens WATCH_MAX_DELAY aufhalten."""
+
+    def events() -> Iterator[list[str]]:
+        yield ["./a.md"]
+        while True:
+            yield ["./a.html"]
+
+    inotify = _FakeInotify(events())
+
+    assert _wait(monkeypatch, inotify) == ["./a.md"]
+    assert inotify.now == pytest.approx(converter.WATCH_MAX_DELAY)
+    assert all(t <= converter.WATCH_DEBOUNCE for t in inotify.timeouts[1:])
+
+
+@pytest.fixture
+def live_server(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[ThreadingHTTPServer]:
+    """Live-Reload-Server über tmp_path mit einer Seite page.html."""
+    (tmp_path / "page.html").write_text("<html><body><p>x</p></body></html>")
+    monkeypatch.chdir(tmp_path)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), converter.LiveReloadHandler)
+    server.live_reload = converter.LiveReload()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(
+    server: ThreadingHTTPServer, path: str, headers: dict[str, str] | None = None
+) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request("GET", path, headers=headers or {})
+    return connection.getresponse()
+
+
+def _next_event(response: http.client.HTTPResponse) -> list[str]:
+    """Zeilen des nächsten Server-Sent-Events."""
+    lines = []
+    while line := response.readline().decode().rstrip("\n"):
+        lines.append(line)
+    return lines
+
+
+def test_pages_carry_their_build(live_server: ThreadingHTTPServer) -> None:
+    """Test, dass HTML-Seiten das Reload-Skript mit ihrem Build erhalten."""
+    live_server.live_reload.notify()
+    live_server.live_reload.notify()
+
+    page = _get(live_server, "/page.html").read().decode()
+    redirect = _get(live_server, "/")
+
+    script = f'new EventSource("{converter.LIVE_RELOAD_PATH}?build=2")'
+    assert script in page
+    assert page.index(script) < page.index("</body>")
+    assert (redirect.status, redirect.getheader("Location")) == (302, "/start.html")
+
+
+def test_events_report_newer_builds(live_server: ThreadingHTTPServer) -> None:
+    """Test, dass eine aktuelle Seite erst beim nächsten Build neu lädt."""
+    events = _get(live_server, f"{converter.LIVE_RELOAD_PATH}?build=0")
+    assert events.getheader("Content-Type") == "text/event-stream"
+
+    live_server.live_reload.notify()
+
+    assert _next_event(events) == ["id: 1", "data: reload"]
+    live_server.live_reload.notify()
+    assert _next_event(events) == ["id: 2", "data: reload"]
+
+
+@pytest.mark.parametrize("query", ["?build=0", ""])
+def test_events_catch_up_on_missed_build(
+    live_server: ThreadingHTTPServer, query: str
+) -> None:
+    """Regressionstest: ein Build vor dem Verbinden löst sofort einen Reload aus."""
+    live_server.live_reload.notify()
+
+    events = _get(live_server, f"{converter.LIVE_RELOAD_PATH}{query}")
+
+    assert _next_event(events) == ["id: 1", "data: reload"]
+
+
+def test_events_prefer_last_event_id(live_server: ThreadingHTTPServer) -> None:
+    """Test, dass beim Wiederverbinden Last-Event-ID die Seitenangabe ersetzt."""
+    live_server.live_reload.notify()
+    events = _get(
+        live_server,
+        f"{converter.LIVE_RELOAD_PATH}?build=0",
+        {"Last-Event-ID": "1"},
+    )
+
+    live_server.live_reload.notify()
+
+    assert _next_event(events) == ["id: 2", "data: reload"]
+
+
+def test_watch_exits_when_port_is_busy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test, dass ein belegter Port gemeldet wird und den Exit-Code 1 ergibt."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        converter, "convert_all_markdown_files", lambda _: pytest.fail("gebaut")
+    )
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        port = busy.getsockname()[1]
+        monkeypatch.setattr(
+            sys, "argv", ["md_to_html_converter.py", "--watch", "--port", str(port)]
+        )
+        with pytest.raises(SystemExit) as excinfo:
+            converter.main()
+
+    assert excinfo.value.code == 1
+    assert f"Port {port} nicht verfügbar" in capsys.readouterr().err
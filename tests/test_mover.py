@@ -0,0 +1,312 @@
+"""Tests für das Planen und Ausführen von Verschiebungen."""
+
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from src import mover
+from src.file_organizer import FileEntry, FileOrganizer, main
+from src.mover import (
+    Move,
+    MoveJournal,
+    execute_plan,
+    plan_moves,
+    resume_moves,
+)
+
+# 2024-05-17 und 2023-12-31 (UTC)
+MAY_2024 = 1715904000.0
+DEC_2023 = 1704000000.0
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """Erstellt ein Quellverzeichnis mit gleichnamigen Dateien."""
+    root = tmp_path / "quelle"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "bericht.pdf").write_text("a")
+    (root / "b" / "bericht.pdf").write_text("b")
+    (root / "b" / "notiz.TXT").write_text("c")
+    (root / "README").write_text("d")
+    os.utime(root / "a" / "bericht.pdf", (MAY_2024, MAY_2024))
+    os.utime(root / "b" / "bericht.pdf", (DEC_2023, DEC_2023))
+    return root
+
+
+def _targets(plan: list[Move], root: Path) -> set[str]:
+    return {Path(move.target).relative_to(root).as_posix() for move in plan}
+
+
+def test_plan_layouts(source: Path, tmp_path: Path) -> None:
+    """Test der drei Layouts einschließlich Namenskonflikten."""
+    target = tmp_path / "ziel"
+    organizer = FileOrganizer(source)
+    assert _targets(organizer.plan_moves(target), target) == {
+        "pdf/bericht.pdf",
+        "pdf/bericht_1.pdf",
+        "txt/notiz.TXT",
+        "ohne_erweiterung/README",
+    }
+    assert "2024/05/bericht.pdf" in _targets(
+        organizer.plan_moves(target, "date"), target
+    )
+    assert _targets(organizer.plan_moves(target, "type-date"), target) >= {
+        "pdf/2024/05/bericht.pdf",
+        "pdf/2023/12/bericht.pdf",
+    }
+
+
+def test_plan_avoids_existing_and_skips_target(tmp_path: Path) -> None:
+    """Vorhandene Zieldateien werden nicht überschrieben, das Ziel nicht gelesen."""
+    (tmp_path / "ziel" / "txt").mkdir(parents=True)
+    (tmp_path / "ziel" / "txt" / "a.txt").touch()
+    (tmp_path / "ziel" / "ohne_erweiterung").mkdir()
+    (tmp_path / "ziel" / "ohne_erweiterung" / "README").touch()
+    (tmp_path / "ziel" / "ohne_erweiterung" / "README_1").touch()
+    entries = [
+        FileEntry(os.fspath(tmp_path), "a.txt"),
+        FileEntry(os.fspath(tmp_path / "ziel" / "txt"), "a.txt"),
+        FileEntry(os.fspath(tmp_path), "ohne_datum"),
+    ]
+    plan = plan_moves(entries, tmp_path / "ziel", "type-date")
+    assert _targets(plan, tmp_path / "ziel") == {
+        "txt/ohne_datum/a.txt",
+        "ohne_erweiterung/ohne_datum/ohne_datum",
+    }
+    entries[1:] = [FileEntry(os.fspath(tmp_path), "README")]
+    plan = plan_moves(entries, tmp_path / "ziel")
+    assert _targets(plan, tmp_path / "ziel") == {
+        "txt/a_1.txt",
+        "ohne_erweiterung/README_2",
+    }
+
+
+def test_plan_unknown_layout(tmp_path: Path) -> None:
+    """Test der Fehlermeldung bei unbekanntem Layout."""
+    with pytest.raises(ValueError, match="Layout"):
+        plan_moves([], tmp_path, "size")
+
+
+def test_dry_run_touches_nothing(source: Path, tmp_path: Path) -> None:
+    """Im Probelauf werden weder Dateien noch Journal angelegt."""
+    journal = tmp_path / "journal.jsonl"
+    report = FileOrganizer(source).organize(
+        tmp_path / "ziel", journal_path=journal, dry_run=True
+    )
+    assert report.dry_run
+    assert report.skipped == 4
+    assert not (tmp_path / "ziel").exists()
+    assert not journal.exists()
+
+
+def test_execute_with_journal(source: Path, tmp_path: Path) -> None:
+    """Alle Dateien werden verschoben und das Journal abgeschlossen."""
+    journal = tmp_path / "journal.jsonl"
+    report = FileOrganizer(source).organize(tmp_path / "ziel", journal_path=journal)
+    assert (report.moved, report.skipped, report.failed) == (4, 0, [])
+    assert (tmp_path / "ziel" / "pdf" / "bericht_1.pdf").read_text() in "ab"
+    assert not list(source.rglob("*.*"))
+
+    plan, done, complete = MoveJournal(journal).load()
+    assert len(plan) == 4
+    assert done == {0, 1, 2, 3}
+    assert complete
+    assert resume_moves(journal).skipped == 4
+    with pytest.raises(FileExistsError):
+        execute_plan(plan, journal)
+
+
+def test_resume_after_interruption(tmp_path: Path) -> None:
+    """Ein abgebrochener Lauf wird ohne Doppelarbeit fortgesetzt."""
+    names = ["erledigt", "verschoben", "kopiert", "offen"]
+    for name in names:
+        (tmp_path / f"{name}.txt").write_text(name)
+    plan = plan_moves(
+        [FileEntry(os.fspath(tmp_path), f"{name}.txt") for name in names],
+        tmp_path / "ziel",
+    )
+    journal = tmp_path / "journal.jsonl"
+    execute_plan(plan[:1], journal, batch_size=1)
+    # Simuliert eine laufende Charge: 1 verschoben, 2 kopiert, 3 unberührt
+    MoveJournal(journal).path.write_text(
+        "".join(f'[{i}, "{m.source}", "{m.target}"]\n' for i, m in enumerate(plan))
+        + f'{{"planned": {len(plan)}}}\n{{"done": [0]}}\n{{"done": [1, '
+    )
+    Path(plan[1].source).rename(plan[1].target)
+    Path(plan[2].target).write_text("kopiert")
+
+    report = resume_moves(journal, batch_size=2)
+    assert (report.moved, report.skipped, report.failed) == (1, 3, [])
+    assert sorted(p.name for p in (tmp_path / "ziel" / "txt").iterdir()) == [
+        f"{name}.txt" for name in sorted(names)
+    ]
+    assert not list(tmp_path.glob("*.txt"))
+
+
+def test_truncated_plan_is_rejected(tmp_path: Path) -> None:
+    """Ein beim Schreiben abgebrochener Plan wird nicht als vollständig gelesen."""
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    plan = plan_moves(
+        [FileEntry(os.fspath(tmp_path), name) for name in ("a.txt", "b.txt")],
+        tmp_path / "ziel",
+    )
+    journal = tmp_path / "journal.jsonl"
+    MoveJournal(journal).create(plan)
+    lines = journal.read_text().splitlines(keepends=True)
+    assert lines[-1] == '{"planned": 2}\n'
+
+    journal.write_text(lines[0])
+    with pytest.raises(ValueError, match="keinen vollständigen Plan"):
+        resume_moves(journal)
+    assert (tmp_path / "a.txt").exists()
+
+
+def test_existing_target_is_never_overwritten(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Ein nach der Planung entstandenes Ziel führt zu einem Konflikt."""
+    (tmp_path / "a.txt").write_text("neu")
+    target = tmp_path / "a_ziel.txt"
+    move = Move(os.fspath(tmp_path / "a.txt"), os.fspath(target))
+    device = (tmp_path / "a.txt").stat().st_dev
+    target.write_text("alt")
+
+    with pytest.raises(FileExistsError):
+        mover._transfer(move, device, resume=False)
+    with pytest.raises(FileExistsError):
+        mover._transfer(move, device + 1, resume=False)
+    assert target.read_text() == "alt"
+    assert (tmp_path / "a.txt").read_text() == "neu"
+    assert not (tmp_path / "a_ziel.txt.partial").exists()
+
+    def no_hardlinks(*_args: object, **_kwargs: object) -> None:
+        raise OSError(errno.EPERM, "keine harten Links")
+
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    with pytest.raises(FileExistsError):
+        mover._transfer(move, device, resume=False)
+    target.unlink()
+    assert mover._transfer(move, device, resume=False)
+    assert target.read_text() == "neu"
+
+
+@pytest.mark.parametrize("cross_device", [False, True])
+def test_symlinks_are_recreated(tmp_path: Path, cross_device: bool) -> None:
+    """Symbolische Links werden neu angelegt, relative Links umgerechnet."""
+    (tmp_path / "daten").mkdir()
+    (tmp_path / "daten" / "ziel.txt").write_text("inhalt")
+    (tmp_path / "daten" / "relativ.txt").symlink_to("ziel.txt")
+    (tmp_path / "daten" / "absolut.txt").symlink_to(tmp_path / "daten" / "ziel.txt")
+    (tmp_path / "neu" / "tief").mkdir(parents=True)
+    device = (tmp_path / "daten").stat().st_dev + cross_device
+
+    for name in ("relativ.txt", "absolut.txt"):
+        move = Move(
+            os.fspath(tmp_path / "daten" / name),
+            os.fspath(tmp_path / "neu" / "tief" / name),
+        )
+        assert mover._transfer(move, device, resume=False)
+        moved = tmp_path / "neu" / "tief" / name
+        assert moved.is_symlink()
+        assert moved.read_text() == "inhalt"
+        assert not os.path.lexists(move.source)
+        assert not mover._transfer(move, device, resume=True)
+
+    relinked = (tmp_path / "neu" / "tief" / "relativ.txt").readlink()
+    assert relinked == Path("..", "..", "daten", "ziel.txt")
+
+
+def test_conflicts_are_reported(tmp_path: Path) -> None:
+    """Fehler einzelner Dateien brechen den Lauf nicht ab."""
+    (tmp_path / "a.txt").write_text("neu")
+    (tmp_path / "b.txt").write_text("b")
+    (tmp_path / "ziel").mkdir()
+    (tmp_path / "ziel" / "a.txt").write_text("alt")
+    (tmp_path / "datei").touch()
+    plan = [
+        Move(os.fspath(tmp_path / "a.txt"), os.fspath(tmp_path / "ziel" / "a.txt")),
+        Move(os.fspath(tmp_path / "fehlt"), os.fspath(tmp_path / "ziel" / "fehlt")),
+        Move(os.fspath(tmp_path / "b.txt"), os.fspath(tmp_path / "datei" / "b.txt")),
+    ]
+    journal = tmp_path / "journal.jsonl"
+    report = execute_plan(plan, journal)
+    assert report.moved == 0
+    assert sorted(move for move, _ in report.failed) == sorted(plan)
+    assert (tmp_path / "ziel" / "a.txt").read_text() == "alt"
+    assert not MoveJournal(journal).load()[2]
+
+
+@pytest.mark.parametrize("available", ["copy_file_range", "sendfile", None])
+def test_cross_device_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, available: str | None
+) -> None:
+    """Über Gerätegrenzen wird kopiert und erst danach die Quelle gelöscht."""
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    (tmp_path / "quelle.bin").write_bytes(data)
+    os.utime(tmp_path / "quelle.bin", (MAY_2024, MAY_2024))
+
+    def unsupported(*_args: object) -> int:
+        raise OSError(errno.EXDEV, "nicht unterstützt")
+
+    if available != "sendfile":
+        monkeypatch.setattr(os, "sendfile", unsupported)
+    if available is None:
+        # Plattformen ohne copy_file_range (z. B. macOS)
+        monkeypatch.delattr(os, "copy_file_range")
+    elif available != "copy_file_range":
+        monkeypatch.setattr(os, "copy_file_range", unsupported)
+    monkeypatch.setattr(mover, "_COPY_CHUNK", 1024 * 1024)
+    move = Move(os.fspath(tmp_path / "quelle.bin"), os.fspath(tmp_path / "ziel.bin"))
+    device = (tmp_path / "quelle.bin").stat().st_dev
+    assert mover._transfer(move, device + 1, resume=False)
+    assert (tmp_path / "ziel.bin").read_bytes() == data
+    assert (tmp_path / "ziel.bin").stat().st_mtime == MAY_2024
+    assert not (tmp_path / "quelle.bin").exists()
+    assert not (tmp_path / "ziel.bin.partial").exists()
+
+
+def test_copy_loop_stops_at_eof() -> None:
+    """Eine vorzeitig erschöpfte Quelle beendet die Zero-Copy-Schleife."""
+    assert mover._copy_loop(lambda _count: 0, 5, 10) == 5
+
+
+def test_main_organize(
+    source: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test von --organize mit Probelauf, Journal und Fortsetzung."""
+    monkeypatch.chdir(source)
+    journal = tmp_path / "journal.jsonl"
+    arguments = ["--organize", "../ziel", "--journal", os.fspath(journal)]
+    main([*arguments, "--dry-run"])
+    output = capsys.readouterr().out
+    assert f"-> {tmp_path / 'ziel' / 'pdf' / 'bericht.pdf'}" in output
+    assert "Verschoben" not in output
+
+    main(arguments)
+    assert "Verschoben: 4, übersprungen: 0, fehlgeschlagen: 0" in (
+        capsys.readouterr().out
+    )
+    main(arguments)
+    assert "Verschoben: 0, übersprungen: 4" in capsys.readouterr().out
+
+
+def test_main_organize_reports_failures(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Fehlgeschlagene Verschiebungen werden einzeln ausgegeben."""
+    (tmp_path / "quelle").mkdir()
+    (tmp_path / "quelle" / "a.txt").touch()
+    (tmp_path / "ziel").mkdir()
+    (tmp_path / "ziel" / "txt").touch()
+    monkeypatch.chdir(tmp_path / "quelle")
+    main(["--organize", "../ziel"])
+    assert "fehlgeschlagen: 1\n  " in capsys.readouterr().out
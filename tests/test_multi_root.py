@@ -0,0 +1,190 @@
+"""Tests für den Scan mehrerer Wurzeln je Gerät."""
+
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src import multi_root
+from src.file_organizer import FileEntry, FileOrganizer, main
+from src.multi_root import MultiRootScanner, device_key
+from src.scan_index import ScanIndex
+from src.sniffer import ContentSniffer
+
+
+@pytest.fixture
+def roots(tmp_path: Path) -> list[Path]:
+    """Erstellt drei Wurzeln mit je zwei Dateien."""
+    result = []
+    for name in ("hdd", "ssd", "usb"):
+        root = tmp_path / name
+        (root / "sub").mkdir(parents=True)
+        (root / f"{name}.txt").write_text(name)
+        (root / "sub" / f"{name}.py").write_text(name)
+        os.utime(root, (1_600_000_000, 1_600_000_000))
+        os.utime(root / "sub", (1_600_000_000, 1_600_000_000))
+        result.append(root)
+    return result
+
+
+@pytest.fixture
+def devices(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ordnet ``hdd`` und ``usb`` einer Platte und ``ssd`` einer zweiten zu."""
+    monkeypatch.setattr(
+        multi_root,
+        "device_key",
+        lambda path: "nvme0n1" if Path(path).name == "ssd" else "sda",
+    )
+
+
+def test_device_key_resolves_partitions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Partitionen werden ihrer Platte zugeordnet, sonst gilt major:minor."""
+    device = tmp_path.stat().st_dev
+    number = f"{os.major(device)}:{os.minor(device)}"
+    sys_block = tmp_path / "sys" / "dev" / "block"
+    sys_block.mkdir(parents=True)
+    monkeypatch.setattr(multi_root, "_SYS_BLOCK", sys_block)
+    assert device_key(tmp_path) == number
+
+    partition = tmp_path / "sys" / "devices" / "sda" / "sda2"
+    partition.mkdir(parents=True)
+    (partition / "partition").write_text("2\n")
+    (sys_block / number).symlink_to(partition)
+    assert device_key(tmp_path) == "sda"
+
+    (partition / "partition").unlink()
+    assert device_key(tmp_path) == "sda2"
+
+    with pytest.raises(FileNotFoundError):
+        device_key(tmp_path / "fehlt")
+
+
+@pytest.mark.usefixtures("devices")
+def test_groups_and_budgets(roots: list[Path]) -> None:
+    """Test der Gerätegruppen, Budgets und entfernten Doppelungen."""
+    hdd, ssd, usb = roots
+    scanner = MultiRootScanner(
+        [usb, hdd / "sub", ssd, hdd, hdd],
+        workers_per_device=2,
+        device_workers={"sda": 1},
+    )
+
+    assert scanner.groups == {"sda": [hdd, usb], "nvme0n1": [ssd]}
+    assert (scanner.budget("sda"), scanner.budget("nvme0n1")) == (1, 2)
+
+
+@pytest.mark.parametrize(
+    ("workers", "device_workers", "message"),
+    [(0, {}, "Worker-Budget muss"), (1, {"sda": 0}, "Worker-Budget für sda")],
+)
+def test_invalid_budgets(
+    roots: list[Path], workers: int, device_workers: dict[str, int], message: str
+) -> None:
+    """Test, dass Budgets kleiner als 1 abgelehnt werden."""
+    with pytest.raises(ValueError, match=message):
+        MultiRootScanner(roots, workers, device_workers)
+
+
+@pytest.mark.usefixtures("devices")
+def test_results_are_merged(roots: list[Path], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Alle Wurzeln landen in einer gemeinsamen Gruppierung nach Typ."""
+    used: list[tuple[str, int]] = []
+    iter_files = FileOrganizer.iter_files
+
+    def recording(self: FileOrganizer, with_stat: bool = False) -> Iterator[FileEntry]:
+        used.append((self.source_dir.name, self.workers))
+        return iter_files(self, with_stat)
+
+    monkeypatch.setattr(FileOrganizer, "iter_files", recording)
+    scanner = MultiRootScanner(roots, device_workers={"sda": 1})
+
+    result = scanner.scan_files(with_stat=True)
+
+    assert result.counts() == {".txt": 3, ".py": 3}
+    assert sorted(result[".py"]) == sorted(
+        root / "sub" / f"{root.name}.py" for root in roots
+    )
+    assert result.statistics().total_bytes == 2 * (3 + 3 + 3)
+    assert sorted(used) == [("hdd", 1), ("ssd", 4), ("usb", 1)]
+    # Innerhalb eines Geräts werden die Wurzeln nacheinander gelesen
+    assert [name for name, _ in used if name != "ssd"] == ["hdd", "usb"]
+
+
+@pytest.mark.usefixtures("devices")
+def test_sniffer_and_index(roots: list[Path], tmp_path: Path) -> None:
+    """Test mit Inhaltserkennung und einem gemeinsam genutzten Index."""
+    (roots[0] / "bild").write_bytes(b"\x89PNG\r\n\x1a\n")
+    os.utime(roots[0], (1_600_000_000, 1_600_000_000))
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        MultiRootScanner(roots, index=index).scan_files()
+        result = MultiRootScanner(roots, index=index).scan_files(
+            sniffer=ContentSniffer()
+        )
+        # Überlappende Scans teilen sich die Generation; nichts wird neu gelesen
+        assert index.misses == 0
+
+    assert result.counts() == {".txt": 3, ".py": 3, ".png": 1}
+
+
+@pytest.mark.usefixtures("devices")
+def test_close_early_stops_device_threads(
+    roots: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Ein geschlossener Generator beendet alle Geräte-Threads."""
+    monkeypatch.setattr(multi_root, "_CHUNK", 1)
+    monkeypatch.setattr(multi_root, "_QUEUE_CHUNKS", 1)
+    monkeypatch.setattr(multi_root, "_POLL_SECONDS", 0.01)
+    entries = MultiRootScanner(roots).iter_files()
+
+    next(entries)
+    time.sleep(0.1)
+    entries.close()
+
+
+@pytest.mark.usefixtures("devices")
+def test_device_errors_are_raised(
+    roots: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Fehler eines Geräte-Threads erreichen den Aufrufer."""
+    iter_files = FileOrganizer.iter_files
+
+    def failing(self: FileOrganizer, with_stat: bool = False) -> Iterator[FileEntry]:
+        if self.source_dir.name == "ssd":
+            msg = "Index beschädigt"
+            raise RuntimeError(msg)
+        return iter_files(self, with_stat)
+
+    monkeypatch.setattr(FileOrganizer, "iter_files", failing)
+    with pytest.raises(RuntimeError, match="Index beschädigt"):
+        list(MultiRootScanner(roots).iter_files())
+
+
+def test_main_with_several_roots(
+    roots: list[Path], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der Kommandozeile mit mehreren Wurzeln."""
+    main([str(root) for root in roots])
+    assert "  .py: 3 Dateien" in capsys.readouterr().out
+
+    main(["--format", "csv", "-j", "2", *map(str, roots)])
+    assert len(capsys.readouterr().out.splitlines()) == 1 + 6
+
+    with pytest.raises(SystemExit):
+        main(["--watch", *map(str, roots)])
+    assert "nur ein VERZEICHNIS" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_main_with_missing_root(
+    roots: list[Path], tmp_path: Path, capsys: pytest.CaptureFixture[str], count: int
+) -> None:
+    """Test, dass fehlende Wurzeln sauber gemeldet statt gescannt werden."""
+    with pytest.raises(SystemExit) as exit_info:
+        main([*map(str, roots[: count - 1]), str(tmp_path / "fehlt")])
+
+    assert exit_info.value.code == 2
+    assert f"kein Verzeichnis: {tmp_path / 'fehlt'}" in capsys.readouterr().err
@@ -0,0 +1,107 @@
+"""Tests für die Include-/Exclude-Filter des Verzeichnisdurchlaufs."""
+
+from pathlib import Path
+
+import pytest
+
+from src.file_organizer import FileEntry, FileOrganizer, main
+from src.scan_filter import ScanFilter
+
+
+@pytest.fixture
+def monorepo(tmp_path: Path) -> Path:
+    """Erstellt einen Baum mit typischen Build- und VCS-Verzeichnissen."""
+    for directory in (".git/objects", "node_modules/pkg", "src/app", "docs/_build"):
+        (tmp_path / directory).mkdir(parents=True)
+    for name in (
+        ".git/objects/ab",
+        "node_modules/pkg/index.js",
+        "src/app/main.py",
+        "src/app/main.pyc",
+        "src/util.py",
+        "docs/_build/index.html",
+        "docs/index.rst",
+        "setup.py",
+    ):
+        (tmp_path / name).touch()
+    return tmp_path
+
+
+def _relative_paths(organizer: FileOrganizer) -> list[str]:
+    root = organizer.source_dir
+    return [entry.path.relative_to(root).as_posix() for entry in organizer.iter_files()]
+
+
+def test_keep_file_and_dir() -> None:
+    """Test der Namens- und Pfadmuster sowie der Tiefe."""
+    scan_filter = ScanFilter(["*.py", "docs/*"], ["*.pyc", "build/tmp"], max_depth=1)
+
+    assert scan_filter.keep_file("", "setup.py")
+    assert scan_filter.keep_file("docs", "index.rst")
+    assert not scan_filter.keep_file("src", "README")
+    assert not scan_filter.keep_file("src", "main.pyc")
+    assert scan_filter.keep_dir("", "build")
+    assert not scan_filter.keep_dir("build", "tmp")
+    assert not scan_filter.keep_dir("src", "app")
+    assert ScanFilter().keep_file("a", "b")
+
+
+def test_invalid_max_depth() -> None:
+    """Test der Fehlermeldung bei negativer Tiefe."""
+    with pytest.raises(ValueError, match="max_depth"):
+        ScanFilter(max_depth=-1)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_pruned_directories_are_not_listed(
+    monorepo: Path, monkeypatch: pytest.MonkeyPatch, workers: int
+) -> None:
+    """Ausgeschlossene Teilbäume werden nie gelesen."""
+    listed: list[str] = []
+    read_directory = FileOrganizer._read_directory
+
+    def recording(
+        directory: str, with_stat: bool = False
+    ) -> tuple[list[FileEntry], list[str]]:
+        listed.append(Path(directory).name)
+        return read_directory(directory, with_stat)
+
+    monkeypatch.setattr(FileOrganizer, "_read_directory", staticmethod(recording))
+    scan_filter = ScanFilter(exclude=[".git", "node_modules", "*.pyc", "docs/_build"])
+    organizer = FileOrganizer(monorepo, workers=workers, scan_filter=scan_filter)
+
+    assert _relative_paths(organizer) == [
+        "setup.py",
+        "docs/index.rst",
+        "src/util.py",
+        "src/app/main.py",
+    ]
+    assert sorted(listed) == sorted([monorepo.name, "docs", "src", "app"])
+
+
+def test_include_and_max_depth(monorepo: Path) -> None:
+    """Einschlüsse gelten in jeder Tiefe, max_depth begrenzt den Abstieg."""
+    organizer = FileOrganizer(monorepo, scan_filter=ScanFilter(include=["*.py"]))
+    assert _relative_paths(organizer) == ["setup.py", "src/util.py", "src/app/main.py"]
+
+    organizer.scan_filter = ScanFilter(include=["*.py"], max_depth=1)
+    assert _relative_paths(organizer) == ["setup.py", "src/util.py"]
+
+    organizer.scan_filter = ScanFilter(max_depth=0)
+    assert organizer.scan_files() == {".py": [monorepo / "setup.py"]}
+
+
+def test_main_with_filters(
+    monorepo: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test der Optionen --include, --exclude und --max-depth."""
+    monkeypatch.chdir(monorepo)
+    main(["--exclude", "node_modules", "--exclude", ".git", "--max-depth", "1"])
+    output = capsys.readouterr().out
+    assert "  .py: 2 Dateien" in output
+    assert ".js" not in output
+
+    main(["--include", "*.rst"])
+    assert capsys.readouterr().out.splitlines()[1:] == ["  .rst: 1 Dateien"]
@@ -0,0 +1,121 @@
+"""Tests für Hooks und Profiling des Verzeichnisdurchlaufs."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.file_organizer import FileEntry, FileOrganizer
+from src.scan_hooks import DirectoryStats, ScanHooks, ScanProfiler
+from src.scan_index import ScanIndex
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Erstellt einen kleinen Baum mit unterschiedlich vielen Dateien."""
+    root = tmp_path / "baum"
+    for index in range(4):
+        directory = root / f"d{index}"
+        directory.mkdir(parents=True)
+        for number in range(index + 1):
+            (directory / f"f{number}.txt").write_text("x" * number)
+    for directory in [root, *root.iterdir()]:
+        os.utime(directory, (1_600_000_000, 1_600_000_000))
+    return root
+
+
+class Recorder(ScanHooks):
+    """Zeichnet alle Rückrufe auf."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str]] = []
+
+    def on_dir_enter(self, directory: str) -> None:
+        self.events.append(("enter", Path(directory).name))
+
+    def on_dir_done(self, stats: DirectoryStats) -> None:
+        self.events.append(("done", Path(stats.directory).name))
+
+    def on_error(self, directory: str, error: OSError) -> None:
+        self.events.append(("error", f"{Path(directory).name}: {error.strerror}"))
+
+
+def test_hooks_are_called_per_directory(
+    tree: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test der Reihenfolge der Rückrufe und der Fehlermeldung."""
+    read_directory = FileOrganizer._read_directory
+
+    def failing(
+        directory: str, with_stat: bool = False
+    ) -> tuple[list[FileEntry], list[str]]:
+        if directory.endswith("d2"):
+            raise PermissionError(13, "Keine Berechtigung")
+        return read_directory(directory, with_stat)
+
+    monkeypatch.setattr(FileOrganizer, "_read_directory", staticmethod(failing))
+    recorder = Recorder()
+    files = list(FileOrganizer(tree, hooks=recorder).iter_files())
+
+    assert len(files) == 1 + 2 + 4
+    assert recorder.events == [
+        ("enter", "baum"),
+        ("done", "baum"),
+        ("enter", "d0"),
+        ("done", "d0"),
+        ("enter", "d1"),
+        ("done", "d1"),
+        ("enter", "d2"),
+        ("error", "d2: Keine Berechtigung"),
+        ("enter", "d3"),
+        ("done", "d3"),
+    ]
+    # Die Basisklasse ist ein gültiger No-op
+    assert list(FileOrganizer(tree, hooks=ScanHooks()).iter_files())
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_profiler_summary(tree: Path, workers: int) -> None:
+    """Test der Kennzahlen mit stat und der Top-N-Liste."""
+    profiler = ScanProfiler(top=2)
+    list(FileOrganizer(tree, workers=workers, hooks=profiler).iter_files(True))
+
+    summary = profiler.summary()
+
+    assert (summary.directories, summary.files, summary.errors) == (5, 10, 0)
+    # Ein scandir je Verzeichnis plus ein stat je Datei
+    assert summary.syscalls == 5 + 10
+    assert summary.bytes_stat == 0 + 1 + 3 + 6
+    assert len(summary.slowest) == 2
+    assert summary.slowest[0].elapsed >= summary.slowest[1].elapsed
+    assert summary.elapsed > 0
+
+
+def test_profiler_index_hits_and_errors(tree: Path, tmp_path: Path) -> None:
+    """Aus dem Index übernommene Verzeichnisse kosten nur ein stat."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        list(FileOrganizer(tree, index=index).iter_files())
+        profiler = ScanProfiler()
+        list(FileOrganizer(tree, index=index, hooks=profiler).iter_files())
+
+    assert profiler.summary().syscalls == 5
+
+    profiler = ScanProfiler(top=0)
+    assert list(FileOrganizer(tmp_path / "fehlt", hooks=profiler).iter_files()) == []
+    assert profiler.summary().errors == 1
+    assert profiler.summary().slowest == []
+
+
+def test_main_profile(
+    tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der Option --profile."""
+    from src.file_organizer import main
+
+    monkeypatch.chdir(tree)
+    main(["--profile", "3"])
+    captured = capsys.readouterr()
+
+    assert "  .txt: 10 Dateien" in captured.out
+    assert "Profil: 5 Verzeichnisse, 10 Dateien, 0 Fehler" in captured.err
+    assert len(captured.err.splitlines()) == 2 + 3
@@ -0,0 +1,176 @@
+"""Tests für den persistenten Scan-Index."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from src.file_organizer import FileOrganizer, main
+from src.scan_index import ScanIndex, default_index_path
+
+
+def _age(*directories: Path) -> None:
+    """Setzt die mtime der Verzeichnisse eine Stunde in die Vergangenheit."""
+    for directory in directories:
+        stat_result = directory.stat()
+        os.utime(
+            directory,
+            ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns - 3600 * 10**9),
+        )
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Erstellt einen kleinen, bereits 'gealterten' Verzeichnisbaum."""
+    root = tmp_path / "baum"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "c").mkdir()
+    (root / "eins.py").touch()
+    (root / "a" / "zwei.md").touch()
+    (root / "a" / "b" / "drei.md").touch()
+    (root / "c" / "vier").touch()
+    _age(root, root / "a", root / "a" / "b", root / "c")
+    return root
+
+
+def test_default_index_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Test des Standardpfads im Cache-Verzeichnis."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_index_path() == tmp_path / "file_organizer" / "index.sqlite"
+
+
+def test_second_scan_uses_index(tree: Path, tmp_path: Path) -> None:
+    """Test, dass ein zweiter Scan unveränderte Verzeichnisse nicht neu liest."""
+    with ScanIndex(tmp_path / "cache" / "index.sqlite") as index:
+        organizer = FileOrganizer(tree, index=index)
+        first = organizer.scan_files()
+        assert (index.hits, index.misses) == (0, 4)
+
+        second = organizer.scan_files()
+        assert (index.hits, index.misses) == (4, 0)
+
+    assert second == first == FileOrganizer(tree).scan_files()
+
+
+def test_changed_directory_is_relisted(tree: Path, tmp_path: Path) -> None:
+    """Test, dass nur geänderte Verzeichnisse erneut gelesen werden."""
+    index_path = tmp_path / "index.sqlite"
+    with ScanIndex(index_path) as index:
+        FileOrganizer(tree, index=index).scan_files()
+
+    (tree / "a" / "neu.py").touch()
+    _age(tree / "a")
+    with ScanIndex(index_path) as index:
+        files = FileOrganizer(tree, index=index, workers=2).scan_files()
+        assert (index.hits, index.misses) == (3, 1)
+
+    assert tree / "a" / "neu.py" in files[".py"]
+    assert files == FileOrganizer(tree).scan_files()
+
+
+def test_recent_directories_are_not_cached(tree: Path, tmp_path: Path) -> None:
+    """Test, dass gerade geänderte Verzeichnisse nie aus dem Index kommen."""
+    (tree / "c" / "frisch.txt").touch()
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        organizer = FileOrganizer(tree, index=index)
+        organizer.scan_files()
+        organizer.scan_files()
+        assert (index.hits, index.misses) == (3, 1)
+
+
+def test_removed_directories_are_pruned(tree: Path, tmp_path: Path) -> None:
+    """Test, dass gelöschte Verzeichnisse aus dem Index entfernt werden."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        organizer = FileOrganizer(tree, index=index)
+        organizer.scan_files()
+
+        (tree / "c" / "vier").unlink()
+        (tree / "c").rmdir()
+        _age(tree)
+        files = organizer.scan_files()
+
+        assert ".txt" not in files
+        assert "" not in files
+        remaining = index._connection.execute(
+            "SELECT COUNT(*) FROM directories"
+        ).fetchone()[0]
+        assert remaining == 3
+
+
+def test_with_stat_bypasses_index(tree: Path, tmp_path: Path) -> None:
+    """Test, dass Scans mit Größen immer frisch lesen und den Index füllen."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        organizer = FileOrganizer(tree, index=index)
+        files = organizer.scan_files(with_stat=True)
+        assert files.sizes is not None
+        assert (index.hits, index.misses) == (0, 0)
+
+        organizer.scan_files()
+        assert (index.hits, index.misses) == (4, 0)
+
+
+def test_missing_root_with_index(tmp_path: Path) -> None:
+    """Test, dass ein fehlendes Quellverzeichnis auch mit Index leer bleibt."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        assert FileOrganizer(tmp_path / "fehlt", index=index).scan_files() == {}
+
+
+def test_main_with_index(
+    tree: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test der main Funktion mit Index."""
+    monkeypatch.chdir(tree)
+
+    main(["--index", str(tmp_path / "index.sqlite")])
+
+    assert "  .md: 2 Dateien" in capsys.readouterr().out
+    assert (tmp_path / "index.sqlite").exists()
+
+
+def test_overlapping_scans_share_generation(tree: Path, tmp_path: Path) -> None:
+    """Ein überlappender Scan entwertet die Einträge eines anderen nicht."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        FileOrganizer(tree, index=index).scan_files()
+
+        first = FileOrganizer(tree / "a", index=index).iter_files()
+        next(first)
+        FileOrganizer(tree / "c", index=index).scan_files()
+        list(first)
+
+        FileOrganizer(tree, index=index).scan_files()
+        assert (index.hits, index.misses) == (4, 0)
+
+
+def test_closed_scan_is_aborted(tree: Path, tmp_path: Path) -> None:
+    """Ein vorzeitig geschlossener Scan gibt den Zähler frei, ohne zu bereinigen."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        FileOrganizer(tree, index=index).scan_files()
+
+        scan = FileOrganizer(tree, index=index).iter_files()
+        next(scan)
+        scan.close()
+        assert index._active_scans == 0
+        remaining = index._connection.execute(
+            "SELECT COUNT(*) FROM directories"
+        ).fetchone()[0]
+        assert remaining == 4
+
+        FileOrganizer(tree, index=index).scan_files()
+        assert (index.hits, index.misses) == (4, 0)
+
+
+def test_closed_ascan_is_aborted(tree: Path, tmp_path: Path) -> None:
+    """Auch ein abgebrochener asynchroner Scan gibt den Zähler frei."""
+
+    async def first_batch(index: ScanIndex) -> None:
+        scan = FileOrganizer(tree, index=index).ascan(batch_size=1)
+        await anext(scan)
+        await scan.aclose()
+
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        asyncio.run(first_batch(index))
+        assert index._active_scans == 0
@@ -0,0 +1,131 @@
+"""Tests für das kompakte Scan-Ergebnis."""
+
+import tracemalloc
+from pathlib import Path
+
+from src.file_organizer import FileEntry, FileOrganizer
+from src.scan_result import ScanResult
+
+
+def _entries() -> list[FileEntry]:
+    return [
+        FileEntry("/daten", "a.py"),
+        FileEntry("/daten", "b.md"),
+        FileEntry("/daten/sub", "c.py"),
+        FileEntry("/daten/sub", "ohne"),
+        FileEntry("/daten/ä", "grüße.py"),
+        FileEntry("/daten", "kaputt\udcff.py"),
+    ]
+
+
+def test_mapping_interface() -> None:
+    """Test, dass sich ScanResult wie dict[str, list[Path]] verhält."""
+    result = ScanResult.from_entries(_entries())
+    expected = {
+        ".py": [
+            Path("/daten/a.py"),
+            Path("/daten/sub/c.py"),
+            Path("/daten/ä/grüße.py"),
+            Path("/daten/kaputt\udcff.py"),
+        ],
+        ".md": [Path("/daten/b.md")],
+        "": [Path("/daten/sub/ohne")],
+    }
+
+    assert result == expected
+    assert expected == result
+    assert list(result) == [".py", ".md", ""]
+    assert len(result) == 3
+    assert result.counts() == {".py": 4, ".md": 1, "": 1}
+    assert result.file_count == 6
+    assert result.directories == ["/daten", "/daten/sub", "/daten/ä"]
+
+
+def test_path_list_sequence() -> None:
+    """Test der lazy Sequenz je Dateityp."""
+    paths = ScanResult.from_entries(_entries())[".py"]
+
+    assert len(paths) == 4
+    assert paths[1] == Path("/daten/sub/c.py")
+    assert paths[-1].name == "kaputt\udcff.py"
+    assert paths[1:3] == [Path("/daten/sub/c.py"), Path("/daten/ä/grüße.py")]
+    assert Path("/daten/a.py") in paths
+    assert paths != [Path("/daten/a.py")]
+    assert paths != "kein Pfad"
+    assert repr(paths).startswith("[")
+    assert repr(ScanResult()) == "ScanResult({})"
+
+
+def test_scan_files_returns_scan_result(tmp_path: Path) -> None:
+    """Test, dass scan_files das kompakte Ergebnis liefert."""
+    (tmp_path / "a.py").touch()
+
+    files = FileOrganizer(tmp_path).scan_files()
+
+    assert isinstance(files, ScanResult)
+    assert files == {".py": [tmp_path / "a.py"]}
+
+
+def test_memory_footprint() -> None:
+    """Test, dass ScanResult deutlich weniger Speicher als Path-Listen belegt."""
+    entries = [
+        FileEntry(f"/archiv/jahr{i // 1000}/monat{i // 100}", f"bild_{i:06d}.jpg")
+        for i in range(20_000)
+    ]
+
+    tracemalloc.start()
+    as_lists: dict[str, list[Path]] = {}
+    for entry in entries:
+        as_lists.setdefault(entry.suffix, []).append(entry.path)
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    del as_lists
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = ScanResult.from_entries(entries)
+    result_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    assert result.file_count == len(entries)
+    assert result_bytes * 10 < list_bytes
+
+
+def test_columns_widen() -> None:
+    """Test, dass Namenslängen und Typnummern über 255 auf 32 Bit wechseln."""
+    long_name = "ä" * 200 + ".txt"
+    result = ScanResult.from_entries(_entries())
+    result.append("/daten", long_name, ".txt")
+    for index in range(300):
+        result.append("/daten", f"f.t{index}", f".t{index}")
+
+    assert result._name_lengths.typecode == "I"
+    assert result._types.typecode == "I"
+    assert result[".txt"] == [Path("/daten", long_name)]
+    assert result[".t299"] == [Path("/daten/f.t299")]
+    assert result[".md"][0] == Path("/daten/b.md")
+
+
+def test_blocks_and_directory_runs() -> None:
+    """Test über Blockgrenzen, wiederkehrende Verzeichnisse und spätere Zusätze."""
+    entries = [
+        FileEntry(
+            f"/d{i % 3 if i > 600 else i // 300}", f"n{i}{'.py' if i % 2 else ''}"
+        )
+        for i in range(1000)
+    ]
+    result = ScanResult.from_entries(entries)
+    expected = {
+        ".py": [entry.path for entry in entries if entry.suffix == ".py"],
+        "": [entry.path for entry in entries if not entry.suffix],
+    }
+
+    assert result == expected
+    assert result.directories == ["/d0", "/d1", "/d2"]
+    assert [result.name(row) for row in (255, 256, 999)] == [
+        "n255.py",
+        "n256",
+        "n999.py",
+    ]
+
+    result.append("/d0", "spät.py", ".py")
+    assert result[".py"][-1] == Path("/d0/spät.py")
+    assert result.counts() == {"": 500, ".py": 501}
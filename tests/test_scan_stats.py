@@ -0,0 +1,92 @@
+"""Tests für die Größen- und Datumsstatistik."""
+
+import os
+import time
+from array import array
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from src.file_organizer import FileOrganizer, main
+from src.scan_result import ScanResult
+from src.scan_stats import count_by_month
+
+
+def _timestamp(year: int, month: int, day: int = 15) -> float:
+    return datetime(year, month, day, tzinfo=UTC).timestamp()
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Dateien mit bekannten Größen und Änderungszeiten."""
+    files = {
+        "a.py": (10, _timestamp(2024, 12)),
+        "sub/b.py": (1000, _timestamp(2025, 1)),
+        "sub/c.md": (0, _timestamp(2025, 1, 31)),
+        "sub/tief/d.md": (3, _timestamp(2025, 3)),
+    }
+    for name, (size, mtime) in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        os.utime(path, (mtime, mtime))
+    return tmp_path
+
+
+def test_statistics_from_single_pass(tree: Path) -> None:
+    """Test der Kennzahlen aus einem Scan mit with_stat."""
+    statistics = FileOrganizer(tree, workers=2).scan_files(with_stat=True).statistics()
+
+    assert statistics.total_files == 4
+    assert statistics.total_bytes == 1013
+    assert statistics.bytes_by_type == {".py": 1010, ".md": 3}
+    assert statistics.size_histograms == {".py": {4: 1, 10: 1}, ".md": {0: 1, 2: 1}}
+    assert statistics.files_by_month == {"2024-12": 1, "2025-01": 2, "2025-03": 1}
+    assert statistics.files_by_year == {2024: 1, 2025: 3}
+
+
+def test_month_boundaries_follow_timezone() -> None:
+    """Test, dass die Monatsgrenzen in der angegebenen Zeitzone liegen."""
+    newyear = _timestamp(2025, 1, 1)
+    mtimes = array("d", [newyear - 1, newyear, newyear + 3600])
+
+    assert count_by_month(mtimes) == {"2024-12": 1, "2025-01": 2}
+    berlin = timezone(timedelta(hours=1))
+    assert count_by_month(mtimes, berlin) == {"2025-01": 3}
+    assert count_by_month(array("d")) == {}
+
+
+def test_statistics_require_stat(tree: Path) -> None:
+    """Test, dass die Statistik einen Scan mit with_stat voraussetzt."""
+    with pytest.raises(ValueError, match="with_stat"):
+        FileOrganizer(tree).scan_files().statistics()
+
+
+def test_vectorised_aggregation_is_fast() -> None:
+    """Test, dass die Auswertung von 200 000 Einträgen unter einer Sekunde bleibt."""
+    result = ScanResult(with_stat=True)
+    now = time.time()
+    for row in range(200_000):
+        result.append("/d", "f", (".jpg", ".raw", "")[row % 3], row, now - row * 60)
+
+    start = time.perf_counter()
+    statistics = result.statistics()
+    elapsed = time.perf_counter() - start
+
+    assert statistics.total_files == 200_000
+    assert elapsed < 1.0
+
+
+def test_main_with_stats(
+    tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der main Funktion mit --stats."""
+    monkeypatch.chdir(tree)
+
+    main(["--stats"])
+
+    out = capsys.readouterr().out
+    assert "Gesamtgröße: 1013 Bytes" in out
+    assert "  .py: 1010 Bytes" in out
+    assert "  2025-01: 2 Dateien" in out
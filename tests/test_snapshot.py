@@ -0,0 +1,151 @@
+"""Tests für Snapshots und ihren Vergleich."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src import snapshot
+from src.file_organizer import FileEntry, FileOrganizer, main
+from src.snapshot import (
+    Change,
+    SnapshotEntry,
+    diff_snapshots,
+    read_snapshot,
+    sort_key,
+    write_snapshot,
+)
+
+OLD = 1_600_000_000
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Erstellt einen Baum, in dem Datei- und Verzeichnisnamen sich mischen."""
+    root = tmp_path / "baum"
+    for name in ("a/z.txt", "a/b/x.txt", "a/bb/y.txt", "a.txt", "c d/\nneu.md"):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+        os.utime(path, (OLD, OLD))
+    return root
+
+
+def test_iter_files_order_is_snapshot_order(tree: Path) -> None:
+    """Der Durchlauf liefert bereits die Snapshot-Reihenfolge."""
+    paths = [
+        entry.path.relative_to(tree).as_posix()
+        for entry in FileOrganizer(tree, workers=3).iter_files()
+    ]
+
+    assert paths == sorted(paths, key=sort_key)
+    assert paths == ["a.txt", "a/z.txt", "a/b/x.txt", "a/bb/y.txt", "c d/\nneu.md"]
+
+
+def test_write_and_read_roundtrip(tree: Path, tmp_path: Path) -> None:
+    """Test, dass alle Angaben und ungewöhnliche Namen erhalten bleiben."""
+    target = tmp_path / "heute.snap"
+
+    assert FileOrganizer(tree).snapshot(target) == 5
+
+    entries = list(read_snapshot(target))
+    assert entries[0] == SnapshotEntry("a.txt", 5, float(OLD))
+    assert [entry.path for entry in entries][-1] == "c d/\nneu.md"
+    assert not target.with_name("heute.snap.tmp").exists()
+
+
+def test_read_snapshot_across_blocks(
+    tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Datensätze über Blockgrenzen hinweg werden korrekt zusammengesetzt."""
+    target = tmp_path / "heute.snap"
+    FileOrganizer(tree).snapshot(target)
+    expected = list(read_snapshot(target))
+
+    for block in (1, 2, 3, 7):
+        monkeypatch.setattr(snapshot, "_BLOCK", block)
+        assert list(read_snapshot(target)) == expected
+
+
+def test_invalid_snapshots(tree: Path, tmp_path: Path) -> None:
+    """Test der Fehler für fremde, abgeschnittene und unsortierte Dateien."""
+    other = tmp_path / "anders.txt"
+    other.write_text("hallo\n")
+    with pytest.raises(ValueError, match="kein Snapshot"):
+        list(read_snapshot(other))
+
+    target = tmp_path / "heute.snap"
+    FileOrganizer(tree).snapshot(target)
+    target.write_bytes(target.read_bytes()[:-3])
+    with pytest.raises(ValueError, match="abgeschnitten"):
+        list(read_snapshot(target))
+
+    with pytest.raises(ValueError, match="with_stat"):
+        write_snapshot(FileOrganizer(tree).iter_files(), tree, target)
+    unsorted = [FileEntry(str(tree), "b", 1, 1.0), FileEntry(str(tree), "a", 1, 1.0)]
+    with pytest.raises(ValueError, match="Reihenfolge: a"):
+        write_snapshot(unsorted, tree, target)
+    # Ein fehlgeschlagener Snapshot ersetzt den vorhandenen nicht
+    assert target.read_bytes().startswith(b"file-organizer-snapshot")
+    assert not target.with_name("heute.snap.tmp").exists()
+
+
+def test_diff_snapshots(tree: Path, tmp_path: Path) -> None:
+    """Test von hinzugefügten, entfernten und geänderten Dateien."""
+    organizer = FileOrganizer(tree)
+    organizer.snapshot(tmp_path / "gestern.snap")
+
+    (tree / "a.txt").unlink()
+    (tree / "a" / "b" / "x.txt").write_text("länger als vorher")
+    os.utime(tree / "a" / "bb" / "y.txt", (OLD + 60, OLD + 60))
+    (tree / "a" / "b" / "0.txt").touch()
+    (tree / "z.txt").touch()
+    organizer.snapshot(tmp_path / "heute.snap")
+
+    changes = list(diff_snapshots(tmp_path / "gestern.snap", tmp_path / "heute.snap"))
+
+    assert [(change.kind, change.path) for change in changes] == [
+        ("removed", "a.txt"),
+        ("added", "z.txt"),
+        ("added", "a/b/0.txt"),
+        ("modified", "a/b/x.txt"),
+        ("modified", "a/bb/y.txt"),
+    ]
+    assert changes[0] == Change(
+        "removed", "a.txt", SnapshotEntry("a.txt", 5, float(OLD)), None
+    )
+    assert changes[4].old is not None
+    assert changes[4].new is not None
+    assert changes[4].new.mtime - changes[4].old.mtime == 60
+
+    reverse = diff_snapshots(tmp_path / "heute.snap", tmp_path / "gestern.snap")
+    assert [change.kind for change in reverse].count("removed") == 2
+
+
+def test_diff_against_empty_snapshot(tree: Path, tmp_path: Path) -> None:
+    """Test der Restläufe, wenn ein Snapshot vorzeitig endet."""
+    FileOrganizer(tree).snapshot(tmp_path / "voll.snap")
+    FileOrganizer(tmp_path / "fehlt").snapshot(tmp_path / "leer.snap")
+
+    added = list(diff_snapshots(tmp_path / "leer.snap", tmp_path / "voll.snap"))
+    removed = list(diff_snapshots(tmp_path / "voll.snap", tmp_path / "leer.snap"))
+
+    assert [change.kind for change in added] == ["added"] * 5
+    assert [change.kind for change in removed] == ["removed"] * 5
+
+
+def test_main_snapshot_and_diff(
+    tree: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test der Optionen --snapshot und --diff."""
+    main([str(tree), "--snapshot", str(tmp_path / "gestern.snap")])
+    (tree / "a.txt").unlink()
+    main([str(tree), "--snapshot", str(tmp_path / "heute.snap")])
+    assert "Snapshot mit 4 Dateien" in capsys.readouterr().out
+
+    main(["--diff", str(tmp_path / "gestern.snap"), str(tmp_path / "heute.snap")])
+
+    assert capsys.readouterr().out.splitlines() == [
+        "- a.txt",
+        "Hinzugefügt: 0, entfernt: 1, geändert: 0",
+    ]
@@ -0,0 +1,191 @@
+"""Tests für die inhaltsbasierte Typerkennung."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src import sniffer
+from src.file_organizer import FileEntry, FileOrganizer
+from src.sniffer import (
+    ContentSniffer,
+    SniffCache,
+    default_sniff_cache_path,
+    detect_type,
+    resolve_type,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(32)
+JPEG = b"\xff\xd8\xff\xe0" + bytes(32)
+ZIP = b"PK\x03\x04" + bytes(32)
+OLD = 1_600_000_000
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (PNG, ".png"),
+        (b"RIFF\0\0\0\0WEBPVP8 ", ".webp"),
+        (b"RIFF\0\0\0\0WAVEfmt ", ".wav"),
+        (bytes(257) + b"ustar\x0000", ".tar"),
+        (b"#!/usr/bin/env python3\nprint()\n", ".py"),
+        (b"#!/bin/bash\necho\n", ".sh"),
+        (b'  <?xml version="1.0"?>', ".xml"),
+        (b"<!DOCTYPE html><html>", ".html"),
+        ("Grüße\n".encode() + "ä".encode()[:1], ".txt"),
+        (b"", ""),
+        (b"\x00\x01\x02", ""),
+        (b"\xff\xfe\xfd", ""),
+    ],
+)
+def test_detect_type(head: bytes, expected: str) -> None:
+    """Test der Signaturen und der Texterkennung."""
+    assert detect_type(head) == expected
+
+
+@pytest.mark.parametrize(
+    ("detected", "suffix", "expected"),
+    [
+        (".png", ".txt", ".png"),
+        (".jpg", ".jpeg", ".jpeg"),
+        (".zip", ".docx", ".docx"),
+        (".zip", "", ".zip"),
+        (".txt", ".md", ".md"),
+        (".py", "", ".py"),
+        ("", ".bin", ".bin"),
+    ],
+)
+def test_resolve_type(detected: str, suffix: str, expected: str) -> None:
+    """Signaturen schlagen falsche Endungen, Textarten nur fehlende."""
+    assert resolve_type(detected, suffix) == expected
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    """Erstellt Dateien ohne bzw. mit falscher Endung."""
+    root = tmp_path / "archiv"
+    root.mkdir()
+    (root / "bild").write_bytes(PNG)
+    (root / "foto.txt").write_bytes(JPEG)
+    (root / "bericht.docx").write_bytes(ZIP)
+    (root / "skript").write_text("#!/usr/bin/python\n")
+    (root / "notiz.md").write_text("# Titel\n")
+    (root / "leer").touch()
+    for path in root.iterdir():
+        os.utime(path, (OLD, OLD))
+    return root
+
+
+def test_scan_files_with_sniffer(archive: Path) -> None:
+    """Test der Gruppierung nach Inhalt."""
+    result = FileOrganizer(archive).scan_files(sniffer=ContentSniffer())
+
+    assert result.counts() == {
+        ".png": 1,
+        ".jpg": 1,
+        ".docx": 1,
+        ".py": 1,
+        ".md": 1,
+        "": 1,
+    }
+    assert result[".jpg"] == [archive / "foto.txt"]
+
+
+def test_cache_avoids_rereading(
+    archive: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unveränderte Dateien werden auch nach einem Neustart nicht gelesen."""
+    cache_path = tmp_path / "cache" / "types.sqlite"
+    organizer = FileOrganizer(archive)
+    with SniffCache(cache_path) as cache:
+        first = organizer.scan_files(sniffer=ContentSniffer(cache, workers=2))
+        assert (cache.hits, cache.misses) == (0, 6)
+
+    reads: list[Path] = []
+    path_open = Path.open
+
+    def recording_open(self: Path, *args: object, **kwargs: object) -> object:
+        reads.append(self)
+        return path_open(self, *args, **kwargs)  # type: ignore[arg-type]
+
+    (archive / "bild").write_bytes(JPEG + b"!")
+    os.utime(archive / "bild", (OLD + 1, OLD + 1))
+    monkeypatch.setattr(Path, "open", recording_open)
+    with SniffCache(cache_path) as cache:
+        second = organizer.scan_files(sniffer=ContentSniffer(cache))
+        assert (cache.hits, cache.misses) == (5, 1)
+
+    assert reads == [archive / "bild"]
+    expected = first.counts()
+    del expected[".png"]
+    expected[".jpg"] = 2
+    assert second.counts() == expected
+
+
+def test_recent_and_missing_files(tmp_path: Path) -> None:
+    """Frisch geänderte Dateien werden nicht gespeichert, fehlende nicht gelesen."""
+    (tmp_path / "neu").write_bytes(PNG)
+    with SniffCache() as cache:
+        content_sniffer = ContentSniffer(cache)
+        assert content_sniffer.sniff(FileEntry(str(tmp_path), "neu")) == ".png"
+        assert content_sniffer.sniff(FileEntry(str(tmp_path), "neu")) == ".png"
+        assert cache.hits == 0
+        assert content_sniffer.sniff(FileEntry(str(tmp_path), "weg.PDF")) == ".pdf"
+
+
+def test_classify_keeps_order_across_chunks(
+    archive: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass die Reihenfolge über mehrere Blöcke erhalten bleibt."""
+    monkeypatch.setattr(sniffer, "_CHUNK", 2)
+    entries = list(FileOrganizer(archive).iter_files())
+
+    classified = list(ContentSniffer(workers=3).classify(entries))
+
+    assert [entry for entry, _ in classified] == entries
+    assert {entry.name: kind for entry, kind in classified}["bild"] == ".png"
+
+
+def test_main_sniff(
+    archive: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test der Option --sniff mit Cache im Benutzer-Cacheverzeichnis."""
+    from src.file_organizer import main
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.chdir(archive)
+    main(["--sniff"])
+
+    assert "  .png: 1 Dateien" in capsys.readouterr().out
+    assert default_sniff_cache_path() == (
+        tmp_path / "xdg" / "file_organizer" / "content_types.sqlite"
+    )
+    assert default_sniff_cache_path().exists()
+
+
+def test_main_sniff_with_streaming_format(
+    archive: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test, dass --sniff auch für --format ndjson|csv den erkannten Typ ausgibt."""
+    from src.file_organizer import main
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.chdir(archive)
+    main(["--sniff", "--format", "ndjson"])
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert {Path(record["path"]).name: record["type"] for record in records}[
+        "bild"
+    ] == ".png"
+
+    main(["--sniff", "--format", "csv", "--sort", "path"])
+    assert any(
+        line.endswith("bild,.png") for line in capsys.readouterr().out.splitlines()
+    )
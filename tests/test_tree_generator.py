@@ -0,0 +1,55 @@
+"""Tests für den Generator synthetischer Benchmark-Bäume."""
+
+import os
+from pathlib import Path
+
+import pytest
+from benchmarks.tree_generator import SHAPES, TreeStats, generate_tree
+
+
+def _listing(root: Path) -> list[tuple[str, int | None, bytes]]:
+    """Relative Pfade, Größen und Inhalte aller Einträge, sortiert."""
+    listing: list[tuple[str, int | None, bytes]] = []
+    for directory, subdirs, files in os.walk(root):
+        base = Path(directory)
+        for name in subdirs:
+            listing.append(((base / name).relative_to(root).as_posix(), None, b""))
+        for name in files:
+            path = base / name
+            relative = path.relative_to(root).as_posix()
+            listing.append((relative, path.stat().st_size, path.read_bytes()))
+    return sorted(listing)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_same_seed_gives_same_tree(tmp_path: Path, shape: str) -> None:
+    """Test, dass Form, Größe und Seed den Baum eindeutig festlegen."""
+    first = generate_tree(tmp_path / "a", shape, 400, seed=7)
+    second = generate_tree(tmp_path / "b", shape, 400, seed=7)
+
+    assert first == second
+    assert first.files + first.directories == 400
+    assert _listing(tmp_path / "a") == _listing(tmp_path / "b")
+
+
+def test_seed_changes_tree(tmp_path: Path) -> None:
+    """Test, dass ein anderer Seed einen anderen Baum erzeugt."""
+    generate_tree(tmp_path / "a", "mixed", 400, seed=1)
+    generate_tree(tmp_path / "b", "mixed", 400, seed=2)
+
+    assert _listing(tmp_path / "a") != _listing(tmp_path / "b")
+
+
+def test_stats_match_tree(tmp_path: Path) -> None:
+    """Test, dass die gemeldeten Kennzahlen dem erzeugten Baum entsprechen."""
+    stats = generate_tree(tmp_path, "tiny", 300, seed=0)
+    listing = _listing(tmp_path)
+    sizes = [size for _, size, _ in listing if size is not None]
+
+    assert stats == TreeStats(len(sizes), len(listing) - len(sizes), sum(sizes))
+
+
+def test_unknown_shape(tmp_path: Path) -> None:
+    """Test, dass unbekannte Formen abgelehnt werden."""
+    with pytest.raises(ValueError, match="Unbekannte Form"):
+        generate_tree(tmp_path, "rund", 10)
@@ -0,0 +1,260 @@
+"""Tests für die inotify-basierte Live-Überwachung."""
+
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.file_organizer import FileOrganizer, main
+from src.scan_filter import ScanFilter
+from src.watcher import (
+    IN_Q_OVERFLOW,
+    Inotify,
+    InotifyEvent,
+    LiveFileGroups,
+    TreeWatcher,
+    WatchBatch,
+)
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="inotify nur Linux")
+
+
+@pytest.fixture
+def watch(tmp_path: Path) -> Iterator[Iterator[WatchBatch]]:
+    """Startet eine Überwachung mit kurzen Zeitfenstern."""
+    (tmp_path / "alt.txt").touch()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "modul.py").touch()
+    batches = FileOrganizer(tmp_path).watch(
+        debounce=0.05, max_delay=0.5, idle_timeout=2
+    )
+    yield batches
+    batches.close()
+
+
+def test_initial_scan(watch: Iterator[WatchBatch], tmp_path: Path) -> None:
+    """Test, dass der erste Wert dem normalen Scan entspricht."""
+    batch = next(watch)
+
+    assert batch.added == 2
+    assert batch.groups.counts == {".txt": 1, ".py": 1}
+    assert batch.groups.as_dict() == FileOrganizer(tmp_path).scan_files()
+
+
+def test_burst_is_coalesced(watch: Iterator[WatchBatch], tmp_path: Path) -> None:
+    """Test, dass viele neue Dateien in einer Charge ankommen."""
+    next(watch)
+    for index in range(500):
+        (tmp_path / f"neu{index}.md").touch()
+
+    batch = next(watch)
+
+    assert batch.events >= 500
+    assert batch.added == 500
+    assert batch.groups.counts[".md"] == 500
+
+
+def test_changes_without_rescan(watch: Iterator[WatchBatch], tmp_path: Path) -> None:
+    """Test von Löschen, Umbenennen und neuen sowie verschobenen Verzeichnissen."""
+    groups = next(watch).groups
+
+    (tmp_path / "alt.txt").rename(tmp_path / "alt.rst")
+    (tmp_path / "neu" / "tief").mkdir(parents=True)
+    (tmp_path / "neu" / "tief" / "daten.json").touch()
+    (tmp_path / "sub").rename(tmp_path / "verschoben")
+    batch = next(watch)
+
+    assert batch.groups is groups
+    assert groups.as_dict() == FileOrganizer(tmp_path).scan_files()
+
+    (tmp_path / "verschoben" / "modul.py").unlink()
+    (tmp_path / "verschoben" / "zweites.py").touch()
+    (tmp_path / "neu" / "tief" / "daten.json").unlink()
+    (tmp_path / "neu" / "tief").rmdir()
+    batch = next(watch)
+
+    assert (batch.added, batch.removed) == (1, 2)
+    assert groups.as_dict() == FileOrganizer(tmp_path).scan_files()
+
+
+def test_root_removed(tmp_path: Path) -> None:
+    """Test, dass das Löschen des Quellverzeichnisses alles entfernt."""
+    root = tmp_path / "baum"
+    (root / "sub").mkdir(parents=True)
+    (root / "sub" / "a.py").touch()
+    batches = FileOrganizer(root).watch(debounce=0.05, idle_timeout=2)
+    next(batches)
+
+    (root / "sub" / "a.py").unlink()
+    (root / "sub").rmdir()
+    root.rmdir()
+    batch = next(batches)
+    batches.close()
+
+    assert batch.groups.counts == {}
+    assert batch.groups.files_by_dir == {}
+
+
+def test_max_delay_splits_batches(tmp_path: Path) -> None:
+    """Test, dass eine Charge spätestens nach max_delay angewendet wird."""
+    batches = FileOrganizer(tmp_path).watch(debounce=1, max_delay=0, idle_timeout=2)
+    next(batches)
+    (tmp_path / "a.py").touch()
+
+    assert next(batches).added == 1
+    batches.close()
+
+
+def test_move_seen_in_separate_batches(tmp_path: Path) -> None:
+    """Test eines Verschiebens, dessen Ereignisse auf zwei Chargen verteilt sind."""
+    (tmp_path / "alt").mkdir()
+    (tmp_path / "alt" / "a.py").touch()
+    watcher = TreeWatcher(FileOrganizer(tmp_path))
+    next(watcher.batches())
+    old, new = str(tmp_path / "alt"), str(tmp_path / "neu")
+    (tmp_path / "alt").rename(tmp_path / "neu")
+
+    watcher._apply({new: (str(tmp_path), "neu")})
+    watcher._apply({old: (str(tmp_path), "alt")})
+    (tmp_path / "neu" / "b.py").touch()
+    watcher._apply(watcher._collect(watcher._inotify.read_events(1))[0])
+    watcher.close()
+
+    assert watcher.groups.as_dict() == FileOrganizer(tmp_path).scan_files()
+
+
+def test_vanished_directory_is_skipped(tmp_path: Path) -> None:
+    """Test, dass ein vor dem Watch verschwundenes Verzeichnis ignoriert wird."""
+    watcher = TreeWatcher(FileOrganizer(tmp_path))
+
+    assert watcher._add_tree(str(tmp_path / "fehlt")) == 0
+    watcher.close()
+    watcher.close()
+
+
+def test_filter_applies_to_new_entries(tmp_path: Path) -> None:
+    """Test, dass neue Dateien und Verzeichnisse denselben Filter durchlaufen."""
+    organizer = FileOrganizer(
+        tmp_path, scan_filter=ScanFilter(include=["*.py"], exclude=["build"])
+    )
+    batches = organizer.watch(debounce=0.05, max_delay=0.5, idle_timeout=2)
+    next(batches)
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "generiert.py").touch()
+    (tmp_path / "modul.py").touch()
+    (tmp_path / "notiz.txt").touch()
+    batch = next(batches)
+    batches.close()
+
+    assert batch.groups.counts == {".py": 1}
+    assert batch.groups.as_dict() == organizer.scan_files()
+
+
+def test_idle_timeout_ends_watch(tmp_path: Path) -> None:
+    """Test, dass die Überwachung ohne Ereignisse endet."""
+    batches = list(FileOrganizer(tmp_path).watch(idle_timeout=0.01))
+
+    assert len(batches) == 1
+    assert batches[0].groups.counts == {}
+
+
+def test_overflow_triggers_resync(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass ein Überlauf der Warteschlange zu einem Neuaufbau führt."""
+    (tmp_path / "a.py").touch()
+    watcher = TreeWatcher(FileOrganizer(tmp_path))
+    batches = watcher.batches(idle_timeout=0)
+    next(batches)
+    (tmp_path / "b.py").touch()
+
+    pending = [[InotifyEvent(-1, IN_Q_OVERFLOW, 0, "")]]
+    monkeypatch.setattr(
+        watcher._inotify, "read_events", lambda _: pending.pop() if pending else []
+    )
+    batch = next(batches)
+    watcher.close()
+
+    assert batch.resynced
+    assert batch.groups.counts == {".py": 2}
+
+
+def test_live_groups_bookkeeping() -> None:
+    """Test der Zählerpflege von LiveFileGroups."""
+    groups = LiveFileGroups()
+    assert groups.add_file("/x", "a.py")
+    assert not groups.add_file("/x", "a.py")
+    assert groups.add_file("/x/y", "b.py")
+    assert not groups.remove_file("/x", "fehlt.py")
+    assert groups.remove_tree("/x") == ["/x", "/x/y"]
+    assert groups.counts == {}
+
+
+def test_add_watch_error(tmp_path: Path) -> None:
+    """Test, dass Fehler von inotify_add_watch als OSError gemeldet werden."""
+    with Inotify() as inotify, pytest.raises(NotADirectoryError):
+        (tmp_path / "datei").touch()
+        inotify.add_watch(str(tmp_path / "datei"))
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root ignoriert Dateirechte")
+def test_unreadable_directory_is_skipped(tmp_path: Path) -> None:
+    """Test, dass ein nicht lesbares Verzeichnis wie beim Scan übersprungen wird."""
+    (tmp_path / "a.py").touch()
+    (tmp_path / "gesperrt").mkdir()
+    (tmp_path / "gesperrt" / "b.py").touch()
+    (tmp_path / "gesperrt").chmod(0)
+    try:
+        organizer = FileOrganizer(tmp_path)
+        batches = organizer.watch(idle_timeout=0.01)
+        batch = next(batches)
+        batches.close()
+        expected = organizer.scan_files()
+    finally:
+        (tmp_path / "gesperrt").chmod(0o755)
+
+    assert batch.groups.counts == {".py": 1}
+    assert batch.groups.as_dict() == expected
+
+
+def test_add_watch_permission_error_skips_subtree(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test, dass ein abgelehnter Watch nur den betroffenen Teilbaum auslässt."""
+    (tmp_path / "a.py").touch()
+    (tmp_path / "gesperrt" / "tief").mkdir(parents=True)
+    (tmp_path / "gesperrt" / "tief" / "b.py").touch()
+    blocked = str(tmp_path / "gesperrt")
+    add_watch = Inotify.add_watch
+
+    def deny(self: Inotify, path: str) -> int:
+        if path == blocked:
+            raise PermissionError(13, "Permission denied", path)
+        return add_watch(self, path)
+
+    monkeypatch.setattr(Inotify, "add_watch", deny)
+    watcher = TreeWatcher(FileOrganizer(tmp_path))
+    batch = next(watcher.batches(idle_timeout=0))
+    watcher.close()
+
+    assert batch.groups.counts == {".py": 1}
+
+
+def test_main_watch(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test der main Funktion mit --watch."""
+    watch = FileOrganizer.watch
+    monkeypatch.setattr(
+        FileOrganizer, "watch", lambda self: watch(self, idle_timeout=0.01)
+    )
+    (tmp_path / "a.py").touch()
+    monkeypatch.chdir(tmp_path)
+
+    main(["--watch"])
+
+    assert "  .py: 1 Dateien" in capsys.readouterr().out
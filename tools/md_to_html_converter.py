@@ -8,31 +8,156 @@ und erstellt eine start.html mit Links zu allen HTML-Dateien.
 """
 
 import argparse
+import ctypes
+import ctypes.util
 import datetime
+import functools
 import glob
+import hashlib
+import html
+import json
 import os
 import re
+import select
 import shutil
+import struct
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
+# Build-Manifest: Quell- und Eingabe-Hashes je konvertierter Datei
+MANIFEST_FILE = ".md_to_html_manifest.json"
+MANIFEST_VERSION = 1
+# Inhaltsadressierter Cache (Pandoc-AST)
+CACHE_DIR = ".md_to_html_cache"
 
-def check_pandoc():
-    """Prüft, ob Pandoc installiert ist."""
+
+def get_pandoc_version():
+    """Gibt die Versionszeile von Pandoc zurück oder None, wenn es fehlt."""
     try:
-        subprocess.run(
+        result = subprocess.run(
             ["pandoc", "--version"],
             capture_output=True,
             check=True,
+            text=True,
         )
-        return True
-    except:
-        return False
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.split("\n", 1)[0]
+
+
+def check_pandoc():
+    """Prüft, ob Pandoc installiert ist."""
+    return get_pandoc_version() is not None
+
+
+def file_digest(path):
+    """SHA-256 des Dateiinhalts; leerer String, wenn die Datei fehlt."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return ""
+    return digest.hexdigest()
+
+
+def text_digest(*parts):
+    """SHA-256 über mehrere Textteile (eindeutig getrennt)."""
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """Lädt das Build-Manifest; ein fehlendes oder fremdes ergibt {}."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files", {})
 
 
-def create_main_enhanced_filter():
+def save_manifest(entries, path=MANIFEST_FILE):
+    """Schreibt das Build-Manifest atomar (temporäre Datei + Umbenennen).
+
+    Die temporäre Datei hat einen eindeutigen Namen, damit gleichzeitige
+    Builds sich nicht gegenseitig die Datei unter dem Umbenennen wegnehmen.
+    """
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "files": entries},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def is_up_to_date(record, source_digest, inputs_digest, html_file):
+    """Prüft, ob eine HTML-Datei zu Quelle und Eingaben des Manifests passt."""
+    return (
+        record is not None
+        and record.get("source") == source_digest
+        and record.get("inputs") == inputs_digest
+        and os.path.exists(html_file)
+    )
+
+
+def default_asset_dir():
+    """Asset-Verzeichnis im Cache des Benutzers.
+
+    ``$XDG_CACHE_HOME/md_to_html_converter/assets`` bzw.
+    ``~/.cache/md_to_html_converter/assets``; anders als ein gemeinsames
+    Temp-Verzeichnis kann hier kein anderer Benutzer Dateien unterschieben.
     """
-    Erstellt/überschreibt main_enhanced_filter.lua so, dass:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "md_to_html_converter", "assets")
+
+
+def write_asset(asset_dir, name, content):
+    """Legt eine generierte Datei inhaltsadressiert ab und gibt ihren Pfad zurück.
+
+    Der Pfad enthält den Hash des Inhalts. Vorhandene Dateien werden nur
+    wiederverwendet, wenn ihr Inhalt noch zum Hash passt; sonst und für
+    neue Dateien wird über eine temporäre Datei atomar geschrieben.
+    Gleichzeitige Läufe überschreiben sich so nie gegenseitig.
+    """
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    directory = os.path.join(asset_dir, digest)
+    path = os.path.join(directory, name)
+    try:
+        if file_digest(path) == digest:
+            return path
+    except OSError:
+        pass  # Unlesbar: wie veränderter Inhalt neu schreiben
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def create_main_enhanced_filter(asset_dir):
+    """
+    Erstellt main_enhanced_filter.lua im Asset-Verzeichnis so, dass:
     - Tabellen die CSS-Klasse 'cr-table' erhalten
     - Ein Hauptcontainer den Inhalt umschließt
     - Mermaid-Diagramme umgewandelt werden
@@ -191,8 +316,7 @@ return {
   Pandoc = Pandoc
 }
 """
-    with open("main_enhanced_filter.lua", "w", encoding="utf-8") as f:
-        f.write(lua_content)
+    return write_asset(asset_dir, "main_enhanced_filter.lua", lua_content)
 
 
 def enhance_css_file():
@@ -343,82 +467,143 @@ def enhance_css_file():
         pass
 
 
+# Zeilenpuffer beim Lesen; große Dateien werden so blockweise verarbeitet
+SCAN_BUFFER_SIZE = 1 << 20
+
+_FENCE_LINE = re.compile(r"^[ \t]*(`{3,}|~{3,})[ \t]*\{?[ \t]*\.?([^\s`{}]*)")
+_RAW_DIAGRAM = re.compile(r"^[ \t]*(?:graph|flowchart)[ \t]+TD[ \t]+[A-Z]")
+_MATH_DELIMITER = re.compile(r"\$\$|\\\(|\\\[|\\begin\{")
+_MATH_INLINE = re.compile(r"\$(?![\s$])[^$]*(?<!\s)\$(?!\d)")
+_INLINE_CODE = re.compile(r"`[^`]*`")
+
+
+class ContentScanner:
+    """Zeilenweiser Zustandsautomat für check_and_fix_content.
+
+    Erkennt in einem Durchlauf Mermaid-Blöcke (nur Code-Zäune mit der
+    Info 'mermaid'), Formeln ($...$, $$, \\(, \\[, \\begin{...}) außerhalb
+    von Code und rohe Diagramme ('graph TD ...' ohne Zaun). Rohe
+    Diagramme werden bis zur ersten Leerzeile vor einer nicht
+    eingerückten Zeile in einen ```mermaid-Zaun gesetzt. Jede Zeile wird
+    genau einmal mit verankerten Mustern geprüft; die Laufzeit ist linear.
+    """
+
+    def __init__(self):
+        self.has_mermaid = False
+        self.has_math = False
+        self.fixed = False
+        self._fence = None  # öffnender Zaun eines Code-Blocks
+        self._raw_indent = None  # Einrückung eines offenen rohen Diagramms
+        self._pending_blank = None  # Leerzeile, über die die Folgezeile entscheidet
+
+    def scan(self, lines):
+        """Liefert die (ggf. korrigierten) Zeilen samt Zeilenende."""
+        line = ""
+        for line in lines:
+            yield from self._feed(line)
+        if self._raw_indent is not None:
+            if not line.endswith("\n"):
+                yield "\n"
+            yield self._raw_indent + "```\n"
+            if self._pending_blank is not None:
+                yield self._pending_blank
+
+    def _feed(self, line):
+        if self._raw_indent is not None:
+            consumed = yield from self._feed_raw_diagram(line)
+            if consumed:
+                return
+
+        fence = _FENCE_LINE.match(line)
+        if self._fence is not None:
+            marker = line.strip()
+            if fence and marker.startswith(self._fence) and not marker.strip(marker[0]):
+                self._fence = None
+        elif fence:
+            self._fence = fence.group(1)
+            if fence.group(2) == "mermaid":
+                self.has_mermaid = True
+        elif _RAW_DIAGRAM.match(line):
+            self.has_mermaid = self.fixed = True
+            self._raw_indent = line[: len(line) - len(line.lstrip(" \t"))]
+            yield self._raw_indent + "```mermaid\n"
+            line = line.replace("graph", "flowchart", 1)
+        elif not self.has_math:
+            text = _INLINE_CODE.sub("", line.replace("\\$", ""))
+            if _MATH_DELIMITER.search(text) or _MATH_INLINE.search(text):
+                self.has_math = True
+        yield line
+
+    def _feed_raw_diagram(self, line):
+        """Zeile nach einem rohen Diagramm; gibt zurück, ob sie dazugehört."""
+        if self._pending_blank is not None:
+            # Leerzeile vor nicht eingerückter Zeile beendet das Diagramm
+            if not line.startswith(" "):
+                yield self._raw_indent + "```\n"
+                self._raw_indent = None
+            yield self._pending_blank
+            self._pending_blank = None
+        if self._raw_indent is None:
+            return False
+        if line.strip():
+            yield line.replace("graph TD", "flowchart TD")
+        else:
+            self._pending_blank = line
+        return True
+
+
+def rewrite_fixed_content(md_file):
+    """Schreibt md_file mit umschlossenen Roh-Diagrammen neu.
+
+    Geschrieben wird in eine eindeutig benannte temporäre Datei im selben
+    Verzeichnis (mit den Rechten des Originals), die anschließend atomar
+    umbenannt wird; bei einem Fehler wird sie entfernt.
+    """
+    fd, temp_file = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(md_file) or ".")
+    try:
+        with (
+            os.fdopen(fd, "w", encoding="utf-8", newline="") as dst,
+            open(
+                md_file, encoding="utf-8", newline="", buffering=SCAN_BUFFER_SIZE
+            ) as src,
+        ):
+            dst.writelines(ContentScanner().scan(src))
+        shutil.copymode(md_file, temp_file)
+        os.replace(temp_file, md_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
 def check_and_fix_content(md_files):
-    """Scannt Markdown-Dateien nach Mermaid und Mathe."""
+    """Scannt Markdown-Dateien nach Mermaid und Mathe.
+
+    Dateien mit rohen Diagrammen werden in einem zweiten Durchlauf über
+    eine temporäre Datei korrigiert und atomar ersetzt.
+    """
     files_with_mermaid = []
     files_with_math = []
     files_updated = []
 
-    mermaid_pattern = re.compile(
-        r"```(?:mermaid|)\s?.*?```|~~~(?:mermaid|)\s?.*?~~~", re.DOTALL
-    )
-    raw_mermaid_pattern = re.compile(
-        r"(\n\s*)(graph|flowchart)\s+TD\s+[A-Z]", re.MULTILINE
-    )
-    math_pattern = re.compile(
-        r"(?:\$.*?\$)|(?:\\\(.*?\\\))|(?:\\\[.*?\\\])|(?:\$\$.*?\$\$)", re.DOTALL
-    )
-
     for md_file in md_files:
         try:
-            with open(md_file, encoding="utf-8") as f:
-                content = f.read()
-
-            has_mermaid = False
-            has_math = False
-            content_modified = False
-
-            if (
-                mermaid_pattern.search(content)
-                or "flowchart" in content
-                or "graph TD" in content
-            ):
-                has_mermaid = True
-
-            if math_pattern.search(content) or "\\frac" in content or "_{" in content:
-                has_math = True
-
-            # Beispielhaftes Ersetzen unformatierter Mermaid-Diagramme
-            if raw_mermaid_pattern.search(content) and not mermaid_pattern.search(
-                content
-            ):
-                content_new = raw_mermaid_pattern.sub(
-                    r"\1```mermaid\n\1flowchart TD ", content
-                )
-                lines = content_new.split("\n")
-                in_mermaid = False
-                for i, line in enumerate(lines):
-                    if "```mermaid" in line and not in_mermaid:
-                        in_mermaid = True
-                    elif (
-                        in_mermaid
-                        and not line.strip()
-                        and i < len(lines) - 1
-                        and not lines[i + 1].startswith(" ")
-                    ):
-                        lines[i] = "```\n"
-                        in_mermaid = False
-                        content_modified = True
-                if in_mermaid:
-                    lines.append("```")
-                    content_modified = True
-
-                content_new = "\n".join(lines)
-                if "graph TD" in content_new:
-                    content_new = content_new.replace("graph TD", "flowchart TD")
-                    content_modified = True
-
-                if content_modified:
-                    with open(md_file, "w", encoding="utf-8") as f:
-                        f.write(content_new)
-                    files_updated.append(md_file)
-
-            if has_mermaid:
+            scanner = ContentScanner()
+            with open(
+                md_file, encoding="utf-8", newline="", buffering=SCAN_BUFFER_SIZE
+            ) as f:
+                for _ in scanner.scan(f):
+                    pass
+
+            if scanner.fixed:
+                rewrite_fixed_content(md_file)
+                files_updated.append(md_file)
+
+            if scanner.has_mermaid:
                 files_with_mermaid.append(md_file)
-            if has_math:
+            if scanner.has_math:
                 files_with_math.append(md_file)
 
-        except Exception:
+        except (OSError, UnicodeDecodeError):
             pass
 
     return files_with_mermaid, files_with_math, files_updated
@@ -500,8 +685,45 @@ def generate_start_page(html_files_by_dir=None):
         f.write(html_content)
 
 
-def create_mathjax_header():
-    """Erstellt und gibt den Dateinamen einer temporären MathJax-Headerdatei zurück."""
+def create_mermaid_header(asset_dir):
+    """Erstellt die Mermaid-Headerdatei und gibt ihren Pfad zurück."""
+    mermaid_header = r"""
+<script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
+<script>
+  document.addEventListener('DOMContentLoaded', function() {
+    mermaid.initialize({
+      startOnLoad: true,
+      theme: 'default',
+      flowchart: { 
+        useMaxWidth: true,
+        htmlLabels: true,
+        curve: 'basis',
+        nodeSpacing: 50,
+        rankSpacing: 70,
+        defaultRenderer: 'dagre-d3'
+      },
+      themeVariables: {
+        primaryColor: '#326693',
+        primaryTextColor: '#fff',
+        primaryBorderColor: '#1f4060',
+        lineColor: '#326693',
+        secondaryColor: '#f0f0f0',
+        tertiaryColor: '#e6f3ff',
+        nodeBorder: '#326693',
+        mainBkg: '#e6f3ff',
+        clusterBkg: '#f0f7ff',
+        clusterBorder: '#326693',
+        fontSize: '16px'
+      }
+    });
+  });
+</script>
+"""
+    return write_asset(asset_dir, "mermaid-header.html", mermaid_header)
+
+
+def create_mathjax_header(asset_dir):
+    """Erstellt die MathJax-Headerdatei und gibt ihren Pfad zurück."""
     mathjax_header = r"""
 <script>
 MathJax = {
@@ -518,9 +740,33 @@ MathJax = {
 </script>
 <script src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-chtml.js"></script>
 """
-    with open("mathjax-header.html", "w", encoding="utf-8") as f:
-        f.write(mathjax_header)
-    return "mathjax-header.html"
+    return write_asset(asset_dir, "mathjax-header.html", mathjax_header)
+
+
+def create_ast_dump_filter(asset_dir):
+    """Erstellt den Lua-Filter, der den gelesenen AST für AstCache ablegt.
+
+    Der Filter läuft vor main_enhanced_filter.lua und schreibt das
+    Dokument als JSON in die Datei aus der Metadatenvariable AST_META_KEY,
+    sodass derselbe Pandoc-Aufruf HTML und AST liefert.
+    """
+    lua_content = f"""-- ast_dump.lua - legt den AST vor allen Umwandlungen ab
+function Pandoc(doc)
+  local target = doc.meta["{AST_META_KEY}"]
+  if target == nil then
+    return nil
+  end
+  doc.meta["{AST_META_KEY}"] = nil
+  -- pandoc.write gibt es erst ab Pandoc 2.17; ältere Versionen cachen nicht
+  if pandoc.write ~= nil then
+    local f = io.open(pandoc.utils.stringify(target), "w")
+    f:write(pandoc.write(doc, "json"))
+    f:close()
+  end
+  return doc
+end
+"""
+    return write_asset(asset_dir, "ast_dump.lua", lua_content)
 
 
 def ensure_css_for_docs_dir():
@@ -535,125 +781,1181 @@ def ensure_css_for_docs_dir():
         shutil.copy2(css_file, docs_css_path)
 
 
-def convert_all_markdown_files(args):
-    """Konvertiert alle *.md-Dateien mithilfe von Pandoc und dem Lua-Filter."""
-    if not check_pandoc():
-        return
+# --- In-Process-Renderer ----------------------------------------------------
+#
+# Reines Python für die Teilmenge von Pandoc-Markdown, die hier verwendet
+# wird. Die Ausgabe entspricht der von Pandoc mit main_enhanced_filter.lua:
+# Tabellen mit Klasse cr-table, Mermaid-Blöcke als <div class="mermaid">,
+# Formeln als math-inline/math-display und der Inhalt im main-container.
+
+# Geht in den Eingabe-Hash des Manifests ein; bei Änderungen der Ausgabe erhöhen
+PYTHON_RENDERER_VERSION = "python-renderer 2"
+
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*([^`]*)$")
+_HRULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_LIST_ITEM = re.compile(r"^( {0,3})([-*+]|\d{1,9}[.)])(?:([ \t]+)(.*)|)$")
+_BLOCKQUOTE = re.compile(r"^ {0,3}> ?")
+_TABLE_SEPARATOR = re.compile(
+    r"^[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$"
+)
+_HTML_BLOCK = re.compile(
+    r"^ {0,3}(?:</?(?:address|article|aside|blockquote|canvas|center|details|div"
+    r"|dl|fieldset|figcaption|figure|footer|form|h[1-6]|header|hr|iframe|li|main"
+    r"|nav|noscript|ol|p|pre|script|section|style|summary|table|tbody|td|tfoot"
+    r"|th|thead|tr|ul|video)(?:[\s/>]|$)|<!--)",
+    re.IGNORECASE,
+)
+_LINK_DEFINITION = re.compile(
+    r"^ {0,3}\[([^\]]+)\]:[ \t]*<?([^\s>]+)>?(?:[ \t]+[\"'(](.*)[\"')])?[ \t]*$"
+)
+_FRONT_MATTER_TITLE = re.compile(r"^title:[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+
+_INLINE_SPECIAL = re.compile(r"[\\`$<!\[]")
+_ESCAPABLE = set("\\`*_{}[]()>#+-.!|~$\"'<:@^&=;,/%?")
+_CODE_SPAN = re.compile(r"(`+)(.+?)(?<!`)\1(?!`)", re.DOTALL)
+_DISPLAY_MATH = re.compile(r"\$\$((?:[^$\\]|\\.|\$(?!\$))+?)\$\$", re.DOTALL)
+_INLINE_MATH = re.compile(r"\$(?![\s$])((?:[^$\\]|\\.)+?)(?<!\s)\$(?!\d)", re.DOTALL)
+_AUTOLINK = re.compile(r"<((?:https?|ftp|mailto):[^\s<>]+|[^\s<>@:]+@[^\s<>@]+)>")
+_RAW_TAG = re.compile(
+    r"</?[A-Za-z][A-Za-z0-9-]*(?:\s+[^<>]*?)?/?>|<!--.*?-->", re.DOTALL
+)
+_LINK = re.compile(
+    r"(!?)\[((?:[^\[\]\\]|\\.|\[[^\[\]]*\])*)\]"
+    r"(?:\(\s*<?([^\s<>()]*(?:\([^\s()]*\)[^\s<>()]*)*)>?"
+    r"(?:\s+(?:\"([^\"]*)\"|'([^']*)'))?\s*\)|\[([^\]]*)\])?",
+    re.DOTALL,
+)
+_HARD_BREAK = re.compile(r" {2,}\n")
+_DELIMITER_RUN = re.compile(r"\*+|_+|~+")
+_STASHED = re.compile("\x00(\\d+)\x00")
+_TAG = re.compile(r"<[^>]*>")
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" lang="" xml:lang="">
+<head>
+  <meta charset="utf-8" />
+  <meta name="generator" content="md_to_html_converter" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=yes" />
+  <title>{title}</title>
+  <link rel="stylesheet" href="{css}" />
+{headers}</head>
+<body>
+{body}
+</body>
+</html>
+"""
 
-    create_main_enhanced_filter()  # hier wird die korrigierte Lua-Datei erzeugt
-    enhance_css_file()  # CSS ergänzen
 
-    css_file = "main-design.css"
-    if not os.path.exists(css_file):
-        pass
+def _indent(line):
+    """Anzahl führender Leerzeichen einer Zeile."""
+    return len(line) - len(line.lstrip(" "))
+
+
+def _skip_blank(lines, i):
+    """Index der ersten nicht leeren Zeile ab i (oder len(lines))."""
+    while i < len(lines) and not lines[i].strip():
+        i += 1
+    return i
+
+
+def _is_table_start(lines, i):
+    """Kopfzeile einer Pipe-Tabelle, gefolgt von der Trennzeile."""
+    return (
+        "|" in lines[i]
+        and i + 1 < len(lines)
+        and "|" in lines[i + 1]
+        and _TABLE_SEPARATOR.match(lines[i + 1]) is not None
+    )
+
+
+def _split_row(line):
+    """Zerlegt eine Tabellenzeile an | außerhalb von Code und Escapes."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    cells, current, in_code, i = [], [], False, 0
+    while i < len(line):
+        char = line[i]
+        if char == "\\" and i + 1 < len(line) and line[i + 1] == "|":
+            current.append("|")
+            i += 2
+            continue
+        if char == "`":
+            in_code = not in_code
+        if char == "|" and not in_code:
+            cells.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    cells.append("".join(current).strip())
+    return cells
+
+
+def _list_kind(match):
+    """Listenart eines Markers: Aufzählungszeichen bzw. '.' oder ')'."""
+    marker = match.group(2)
+    return marker[-1] if marker[0].isdigit() else marker
+
+
+class _Delimiter:
+    """Folge von *, _ oder ~~ samt den bereits zugeordneten Tags."""
+
+    __slots__ = ("char", "closing", "count", "opening")
+
+    def __init__(self, char, count):
+        self.char = char
+        self.count = count
+        self.opening = []  # öffnende Tags, äußerster zuerst
+        self.closing = []  # schließende Tags, innerster zuerst
+
+    def __str__(self):
+        return "".join(self.closing) + self.char * self.count + "".join(self.opening)
+
+
+def _close_emphasis(closer, openers, bottom):
+    """Ordnet einem schließenden Begrenzer die passenden öffnenden zu.
+
+    Gesucht wird vom Stapelende abwärts bis ``bottom[char]``. Begrenzer
+    zwischen Öffner und Schließer werden verworfen, eine erfolglose Suche
+    hebt ``bottom[char]`` an; so wird jeder Begrenzer je Zeichen höchstens
+    einmal betrachtet.
+    """
+    char = closer.char
+    while closer.count:
+        index = len(openers) - 1
+        while index >= bottom[char] and openers[index].char != char:
+            index -= 1
+        if index < bottom[char]:
+            bottom[char] = len(openers)
+            return
+        opener = openers[index]
+        # Bei *** innen em, außen strong, wie Pandoc
+        used = 2 if min(opener.count, closer.count) == 2 else 1
+        tag = "del" if char == "~" else ("strong" if used == 2 else "em")
+        opener.opening.insert(0, f"<{tag}>")
+        closer.closing.append(f"</{tag}>")
+        opener.count -= used
+        closer.count -= used
+        del openers[index + 1 if opener.count else index :]
+        for key, value in bottom.items():
+            bottom[key] = min(value, len(openers))
+
+
+def _emphasis(text):
+    """Setzt *, **, _, __ und ~~ in einem Durchlauf um.
+
+    Wie in CommonMark entscheiden die Nachbarzeichen einer Folge, ob sie
+    öffnen oder schließen kann (_ nicht innerhalb von Wörtern); die Paare
+    bildet ein Begrenzerstapel. Die Laufzeit ist linear, auch bei vielen
+    unpaarigen Begrenzern.
+    """
+    pieces = []
+    openers = []
+    bottom = {"*": 0, "_": 0, "~": 0}
+    position = 0
+    for match in _DELIMITER_RUN.finditer(text):
+        start, end = match.span()
+        run = match.group()
+        pieces.append(text[position:start])
+        position = end
+        if run[0] == "~" and len(run) != 2:
+            pieces.append(run)
+            continue
+        before = text[start - 1] if start else " "
+        after = text[end] if end < len(text) else " "
+        can_open = not after.isspace()
+        can_close = not before.isspace()
+        if run[0] == "_":
+            can_open = can_open and not before.isalnum()
+            can_close = can_close and not after.isalnum()
+        delimiter = _Delimiter(run[0], len(run))
+        pieces.append(delimiter)
+        if can_close:
+            _close_emphasis(delimiter, openers, bottom)
+        if can_open and delimiter.count:
+            openers.append(delimiter)
+    pieces.append(text[position:])
+    return "".join(map(str, pieces))
+
+
+def _alignment(cell):
+    """Ausrichtung einer Spalte aus ihrer Trennzelle, z. B. ':--:'."""
+    if cell.startswith(":") and cell.endswith(":"):
+        return "center"
+    if cell.endswith(":"):
+        return "right"
+    if cell.startswith(":"):
+        return "left"
+    return None
+
+
+class MarkdownRenderer:
+    """Wandelt Markdown in HTML um, ohne Pandoc zu starten.
+
+    Unterstützt werden ATX- und Setext-Überschriften (mit Pandoc-IDs),
+    Absätze, Zitate, verschachtelte Listen, eingerückter und umzäunter
+    Code, Pipe-Tabellen, HTML-Blöcke, Hervorhebungen, Code-Spans, Links
+    (auch als Referenz), Bilder, Autolinks sowie $- und $$-Formeln.
+    Syntax-Hervorhebung und typografische Ersetzungen (smart) entfallen.
+    Eine Instanz kann beliebig viele Dokumente nacheinander umwandeln.
+    """
+
+    def render(self, text):
+        """Gibt den HTML-Body eines Markdown-Dokuments zurück."""
+        self._ids = {}
+        self._links = {}
+        lines = self._collect_link_definitions(text.expandtabs(4).split("\n"))
+        blocks = ['<div class="main-container">', *self._blocks(lines), "</div>"]
+        return "\n".join(blocks)
+
+    def render_page(self, text, title, css_file, headers=()):
+        """Gibt eine vollständige HTML-Seite wie pandoc --standalone zurück."""
+        text = text.replace("\r\n", "\n")
+        front_title, text = self._split_front_matter(text)
+        body = self.render(text)
+        if front_title:
+            title = html.unescape(_TAG.sub("", self._inline(front_title)))
+            body = (
+                '<header id="title-block-header">\n'
+                f'<h1 class="title">{self._inline(front_title)}</h1>\n'
+                f"</header>\n{body}"
+            )
+        return _PAGE_TEMPLATE.format(
+            title=html.escape(title, quote=False),
+            css=html.escape(css_file),
+            headers="".join(headers),
+            body=body,
+        )
+
+    def _split_front_matter(self, text):
+        """Trennt einen YAML-Kopf ab; ausgewertet wird nur 'title'."""
+        if not text.startswith("---\n"):
+            return None, text
+        for end in ("\n---\n", "\n...\n"):
+            position = text.find(end, 3)
+            if position != -1:
+                title = _FRONT_MATTER_TITLE.search(text[4:position])
+                value = title.group(1).strip("\"'") if title else None
+                return value, text[position + len(end) :]
+        return None, text
+
+    def _collect_link_definitions(self, lines):
+        """Entfernt Referenz-Definitionen außerhalb von Code-Blöcken."""
+        remaining, fence = [], None
+        for line in lines:
+            match = _FENCE.match(line)
+            if match and (fence is None or match.group(1).startswith(fence)):
+                fence = None if fence else match.group(1)[0] * 3
+            elif fence is None:
+                definition = _LINK_DEFINITION.match(line)
+                if definition:
+                    label = definition.group(1).lower()
+                    self._links[label] = (definition.group(2), definition.group(3))
+                    continue
+            remaining.append(line)
+        return remaining
+
+    # Blöcke
+
+    def _blocks(self, lines, tight=False, item=False):
+        """Zerlegt Zeilen in Blöcke und gibt deren HTML zurück.
+
+        ``tight`` lässt Absätze ohne <p> (enge Listen); in Listeneinträgen
+        (``item``) darf eine Unterliste direkt auf einen Absatz folgen.
+        """
+        out = []
+        i = 0
+        while i < len(lines):
+            if not lines[i].strip():
+                i += 1
+                continue
+            block = self._block_parser(lines, i)
+            if block is None:
+                i = self._paragraph(lines, i, out, tight, item)
+            else:
+                i = block(lines, i, out)
+        return out
+
+    def _block_parser(self, lines, i):
+        """Parser für den Block ab Zeile i; None bedeutet Absatz.
+
+        Die Parser erhalten (lines, i, out), hängen ihr HTML an out an und
+        geben die erste Zeile nach dem Block zurück.
+        """
+        line = lines[i]
+        for pattern, parser in (
+            (_FENCE, self._fenced_code),
+            (_ATX_HEADING, self._atx_heading),
+            (_HRULE, self._hrule),
+            (_BLOCKQUOTE, self._blockquote),
+            (_LIST_ITEM, self._list),
+        ):
+            if pattern.match(line):
+                return parser
+        if line.startswith("    "):
+            return self._indented_code
+        if _is_table_start(lines, i):
+            return self._table
+        if _HTML_BLOCK.match(line):
+            return self._html_block
+        return None
+
+    def _atx_heading(self, lines, i, out):
+        match = _ATX_HEADING.match(lines[i])
+        out.append(self._heading(len(match.group(1)), match.group(2) or ""))
+        return i + 1
+
+    def _hrule(self, lines, i, out):  # noqa: ARG002
+        out.append("<hr />")
+        return i + 1
+
+    def _html_block(self, lines, i, out):
+        """Rohes HTML bis zur Leerzeile."""
+        start = i
+        while i < len(lines) and lines[i].strip():
+            i += 1
+        out.append("\n".join(lines[start:i]))
+        return i
+
+    def _heading(self, level, text):
+        """Überschrift mit automatischer ID wie bei Pandoc."""
+        content = self._inline(text.strip())
+        plain = html.unescape(_TAG.sub("", content)).lower()
+        identifier = re.sub(r"[^\w\s.-]", "", plain)
+        identifier = re.sub(r"\s+", "-", identifier.strip())
+        identifier = re.sub(r"^[\W\d_]+", "", identifier) or "section"
+        count = self._ids.get(identifier, 0)
+        self._ids[identifier] = count + 1
+        if count:
+            identifier = f"{identifier}-{count}"
+        return f'<h{level} id="{html.escape(identifier)}">{content}</h{level}>'
+
+    def _fenced_code(self, lines, i, out):
+        """Umzäunter Code; Mermaid wird wie im Lua-Filter als div ausgegeben."""
+        match = _FENCE.match(lines[i])
+        fence = match.group(1)
+        info = match.group(2).strip().strip("{}").split()
+        language = info[0].lstrip(".") if info else ""
+        code = []
+        i += 1
+        while i < len(lines):
+            closing = lines[i].strip()
+            if closing.startswith(fence) and not closing.strip(fence[0]):
+                i += 1
+                break
+            code.append(lines[i])
+            i += 1
+        text = "\n".join(code)
+        if language == "mermaid":
+            out.append(f'<div class="mermaid">\n{text}\n</div>\n')
+        elif language:
+            out.append(
+                f'<pre class="{html.escape(language)}"><code>'
+                f"{html.escape(text, quote=False)}</code></pre>"
+            )
+        else:
+            out.append(f"<pre><code>{html.escape(text, quote=False)}</code></pre>")
+        return i
+
+    def _indented_code(self, lines, i, out):
+        """Mit vier Leerzeichen eingerückter Code."""
+        code = []
+        while i < len(lines) and (lines[i].startswith("    ") or not lines[i].strip()):
+            code.append(lines[i][4:])
+            i += 1
+        while code and not code[-1].strip():
+            code.pop()
+        text = html.escape("\n".join(code), quote=False)
+        out.append(f"<pre><code>{text}</code></pre>")
+        return i
+
+    def _blockquote(self, lines, i, out):
+        """Zitat; Folgezeilen ohne > gehören bis zur Leerzeile dazu."""
+        quoted = []
+        while i < len(lines) and lines[i].strip():
+            match = _BLOCKQUOTE.match(lines[i])
+            quoted.append(lines[i][match.end() :] if match else lines[i])
+            i += 1
+            while i < len(lines) and not lines[i].strip():
+                if i + 1 < len(lines) and _BLOCKQUOTE.match(lines[i + 1]):
+                    quoted.append("")
+                    i += 1
+                else:
+                    break
+        out.append(
+            "<blockquote>\n" + "\n".join(self._blocks(quoted)) + "\n</blockquote>"
+        )
+        return i
+
+    def _list(self, lines, i, out):
+        """Liste samt Unterlisten; lose Listen erhalten Absätze."""
+        first = _LIST_ITEM.match(lines[i])
+        kind = _list_kind(first)
+        items = []
+        loose = False
+        while i < len(lines):
+            match = _LIST_ITEM.match(lines[i])
+            if not match or _list_kind(match) != kind:
+                break
+            item, i = self._list_item(lines, i, match)
+            items.append(item)
+            j = _skip_blank(lines, i)
+            if j == i:
+                continue
+            following = j < len(lines) and _LIST_ITEM.match(lines[j])
+            if not following or _list_kind(following) != kind:
+                break
+            loose = True
+            i = j
+        loose = loose or any("" in item[:-1] for item in items)
+        out.append(self._render_list(first, items, loose))
+        return i
+
+    def _list_item(self, lines, i, match):
+        """Zeilen eines Eintrags ohne dessen Einrückung; gibt (Zeilen, Ende) zurück."""
+        width = len(match.group(3) or " ")
+        content_indent = len(match.group(1)) + len(match.group(2)) + width
+        item = [match.group(4) or ""]
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                j = _skip_blank(lines, i)
+                if j < len(lines) and _indent(lines[j]) >= content_indent:
+                    item.extend([""] * (j - i))
+                    i = j
+                    continue
+                break
+            if _indent(line) >= content_indent:
+                item.append(line[content_indent:])
+            elif _LIST_ITEM.match(line) or not item[-1].strip():
+                break
+            else:
+                item.append(line.strip())
+            i += 1
+        return item, i
+
+    def _render_list(self, first, items, loose):
+        """HTML einer Liste; first ist der Treffer des ersten Eintrags."""
+        ordered = first.group(2)[0].isdigit()
+        tag = "ol" if ordered else "ul"
+        start = int(first.group(2)[:-1]) if ordered else 1
+        attributes = f' start="{start}"' if start != 1 else ""
+        attributes += ' type="1"' if ordered else ""
+        rendered = []
+        for item in items:
+            blocks = self._blocks(item, tight=not loose, item=True)
+            rendered.append("<li>" + "\n".join(blocks) + "</li>")
+        return f"<{tag}{attributes}>\n" + "\n".join(rendered) + f"\n</{tag}>"
+
+    def _table(self, lines, i, out):
+        """Pipe-Tabelle mit Klasse cr-table wie im Lua-Filter."""
+        header = _split_row(lines[i])
+        alignments = [_alignment(cell) for cell in _split_row(lines[i + 1])]
+        i += 2
+        rows = []
+        while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+            rows.append(_split_row(lines[i]))
+            i += 1
+
+        def cells(row, tag):
+            result = []
+            for column, alignment in enumerate(alignments):
+                text = row[column] if column < len(row) else ""
+                style = f' style="text-align: {alignment};"' if alignment else ""
+                result.append(f"<{tag}{style}>{self._inline(text)}</{tag}>")
+            return "\n".join(result)
+
+        html_rows = ['<table class="cr-table">']
+        if any(header):
+            html_rows += ["<thead>", '<tr class="header">', cells(header, "th")]
+            html_rows += ["</tr>", "</thead>"]
+        html_rows.append("<tbody>")
+        for number, row in enumerate(rows, 1):
+            parity = "odd" if number % 2 else "even"
+            html_rows += [f'<tr class="{parity}">', cells(row, "td"), "</tr>"]
+        html_rows += ["</tbody>", "</table>"]
+        out.append("\n".join(html_rows))
+        return i
+
+    def _paragraph(self, lines, i, out, tight, item):
+        """Absatz bis zur Leerzeile oder Setext-Überschrift."""
+        start = i
+        i += 1
+        if i < len(lines) and _SETEXT_UNDERLINE.match(lines[i]):
+            level = 1 if lines[i].strip()[0] == "=" else 2
+            out.append(self._heading(level, lines[start]))
+            return i + 1
+        while (
+            i < len(lines)
+            and lines[i].strip()
+            and not _FENCE.match(lines[i])
+            and not (item and _LIST_ITEM.match(lines[i]))
+        ):
+            i += 1
+        # Nur das Ende kürzen: zwei Leerzeichen am Zeilenende brechen um
+        text = "\n".join(line.lstrip() for line in lines[start:i]).rstrip()
+        math = _DISPLAY_MATH.fullmatch(text)
+        image = _LINK.fullmatch(text)
+        if math:
+            out.append(self._display_math(math.group(1)))
+        elif image and image.group(1) and image.group(2) and image.group(3) is not None:
+            alt = self._inline(image.group(2))
+            out.append(
+                f"<figure>\n{self._inline(text)}\n"
+                f'<figcaption aria-hidden="true">{alt}</figcaption>\n</figure>'
+            )
+        elif tight:
+            out.append(self._inline(text))
+        else:
+            out.append(f"<p>{self._inline(text)}</p>")
+        return i
+
+    # Inline-Elemente
+
+    def _display_math(self, formula):
+        return f'<div class="math math-display">$${html.escape(formula, quote=False)}$$</div>'
+
+    def _text(self, text):
+        """Reiner Text: maskiert, zwei Leerzeichen am Zeilenende brechen um."""
+        return _HARD_BREAK.sub("<br />\n", html.escape(text, quote=False))
+
+    def _inline(self, text):
+        """Wandelt Inline-Markdown in HTML um.
+
+        Code, Formeln, Links und rohes HTML werden zuerst ersetzt und als
+        Platzhalter abgelegt, damit die Hervorhebungen nicht hineingreifen.
+        """
+        stash = []
+        parts = []
+        position = 0
+        while True:
+            match = _INLINE_SPECIAL.search(text, position)
+            end = match.start() if match else len(text)
+            parts.append(self._text(text[position:end]))
+            if not match:
+                break
+            position, fragment = self._special(text, end)
+            if fragment is None:
+                parts.append(self._text(text[end:position]))
+            else:
+                stash.append(fragment)
+                parts.append(f"\x00{len(stash) - 1}\x00")
+        result = _emphasis("".join(parts))
+        return _STASHED.sub(lambda m: stash[int(m.group(1))], result)
+
+    def _special(self, text, i):
+        """Behandelt ein Sonderzeichen; gibt neue Position und HTML zurück.
+
+        Ist das Zeichen nur Text, ist das HTML None.
+        """
+        special = {
+            "\\": self._escape,
+            "`": self._code_span,
+            "$": self._math,
+            "<": self._angle,
+        }.get(text[i], self._link)
+        return special(text, i)
+
+    def _escape(self, text, i):
+        """Backslash: Escape oder harter Zeilenumbruch."""
+        following = text[i + 1 : i + 2]
+        if following == "\n":
+            return i + 2, "<br />\n"
+        if following and following in _ESCAPABLE:
+            return i + 2, html.escape(following, quote=False)
+        return i + 1, None
+
+    def _code_span(self, text, i):
+        """Code-Span; eine unpaarige Backtick-Folge bleibt als Ganzes Text."""
+        match = _CODE_SPAN.match(text, i)
+        if match:
+            code = " ".join(match.group(2).split("\n")).strip()
+            return match.end(), f"<code>{html.escape(code, quote=False)}</code>"
+        run = len(text) - len(text[i:].lstrip("`"))
+        return run, None
+
+    def _math(self, text, i):
+        """$$-Formel oder $-Formel."""
+        match = _DISPLAY_MATH.match(text, i)
+        if match:
+            return match.end(), self._display_math(match.group(1))
+        match = _INLINE_MATH.match(text, i)
+        if match:
+            formula = html.escape(match.group(1), quote=False)
+            return match.end(), f'<span class="math math-inline">${formula}$</span>'
+        return i + 1, None
+
+    def _angle(self, text, i):
+        """Autolink oder rohes HTML-Tag."""
+        match = _AUTOLINK.match(text, i)
+        if match:
+            return match.end(), self._autolink(match.group(1))
+        match = _RAW_TAG.match(text, i)
+        if match:
+            return match.end(), match.group()
+        return i + 1, None
+
+    def _autolink(self, target):
+        if "@" in target and ":" not in target:
+            return (
+                f'<a href="mailto:{html.escape(target)}" class="email">'
+                f"{html.escape(target, quote=False)}</a>"
+            )
+        return (
+            f'<a href="{html.escape(target)}" class="uri">'
+            f"{html.escape(target, quote=False)}</a>"
+        )
+
+    def _link(self, text, i):
+        """Link oder Bild, inline oder als Referenz."""
+        match = _LINK.match(text, i)
+        if not match:
+            return i + 1, None
+        image, label, url, title = match.group(1), match.group(2), match.group(3), None
+        if url is not None:
+            title = match.group(4) if match.group(4) is not None else match.group(5)
+        else:
+            reference = (match.group(6) or label).lower()
+            if reference not in self._links:
+                # [x] ohne Definition bleibt Text; nur die Klammer überspringen
+                return i + (2 if image else 1), None
+            url, title = self._links[reference]
+        title_attribute = f' title="{html.escape(title)}"' if title else ""
+        if image:
+            alt = html.escape(html.unescape(_TAG.sub("", self._inline(label))))
+            return match.end(), (
+                f'<img src="{html.escape(url)}"{title_attribute} alt="{alt}" />'
+            )
+        return match.end(), (
+            f'<a href="{html.escape(url)}"{title_attribute}>{self._inline(label)}</a>'
+        )
+
+
+def run_pandoc(cmd, input_data=None):
+    """Führt einen Pandoc-Aufruf aus.
+
+    Gibt None zurück oder bei einem Fehler dessen Beschreibung; so bricht
+    eine fehlerhafte Datei die übrigen Konvertierungen nicht ab.
+    """
+    try:
+        result = subprocess.run(cmd, input=input_data, capture_output=True, check=False)
+    except OSError as e:
+        return str(e)
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", "replace").strip()
+        return error or f"Pandoc beendet mit Code {result.returncode}"
+    return None
+
+
+# Metadatenvariable, über die ast_dump.lua das Ziel des AST erfährt
+AST_META_KEY = "md_to_html_ast"
+
+
+class AstCache:
+    """Pandoc-AST (JSON) je Quellinhalt und Pandoc-Version.
+
+    Der AST entsteht im selben Pandoc-Aufruf wie das HTML (ast_dump.lua);
+    bei Änderungen an CSS, Filter oder Headern wird aus ihm gerendert,
+    ohne das Markdown erneut zu parsen. Die Einträge hängen nur vom
+    Inhalt ab und können zwischen CI-Läufen geteilt werden.
+    """
+
+    def __init__(self, cache_dir, pandoc_version, dump_filter):
+        self.directory = os.path.join(cache_dir, "ast")
+        self.pandoc_version = pandoc_version
+        self.dump_filter = dump_filter
+
+    def ast_file(self, md_file):
+        """Pfad des AST zum aktuellen Inhalt von md_file (ggf. noch fehlend).
+
+        Raises:
+            OSError: Wenn md_file nicht lesbar ist
+        """
+        key = text_digest(self.pandoc_version, file_digest(md_file))
+        # Pandoc leitet den Seitentitel ohne 'title' vom Dateinamen ab
+        return os.path.join(self.directory, key[:2], key, Path(md_file).stem + ".json")
+
+
+def render_with_pandoc(
+    md_file, html_file, css_file, header_files, filter_file, ast_cache=None
+):
+    """Konvertiert eine Datei mit Pandoc und dem Lua-Filter.
 
-    # Verzeichnisse mit Markdown-Dateien
-    md_dirs = [".", "docs"]
+    Mit ``ast_cache`` wird aus einem gespeicherten AST gerendert statt aus
+    dem Markdown; fehlt er, legt derselbe Aufruf ihn an. Rückgabe wie bei
+    run_pandoc.
+    """
+    source = [md_file]
+    ast_file = temp_path = None
+    if ast_cache is not None:
+        try:
+            ast_file = ast_cache.ast_file(md_file)
+        except OSError as e:
+            return str(e)
+        if os.path.exists(ast_file):
+            source = ["-f", "json", ast_file]
+        else:
+            os.makedirs(os.path.dirname(ast_file), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                suffix=".tmp", dir=os.path.dirname(ast_file)
+            )
+            os.close(fd)
+            source = [
+                md_file,
+                f"--lua-filter={ast_cache.dump_filter}",
+                "-M",
+                f"{AST_META_KEY}={temp_path}",
+            ]
+    cmd = [
+        "pandoc",
+        *source,
+        "-o",
+        str(html_file),
+        "--standalone",
+        "--css",
+        css_file,
+        f"--lua-filter={filter_file}",
+        "--mathjax",
+    ]
+    cmd.extend(f"--include-in-header={header}" for header in header_files)
+    error = run_pandoc(cmd)
+    if temp_path is not None:
+        # Leer, wenn Pandoc fehlschlug oder pandoc.write nicht kennt
+        if error is None and os.path.getsize(temp_path):
+            os.replace(temp_path, ast_file)
+        else:
+            os.remove(temp_path)
+    return error
+
+
+def render_with_python(md_file, html_file, css_file, header_files):
+    """Konvertiert eine Datei im laufenden Prozess mit MarkdownRenderer.
+
+    Rückgabe wie bei run_pandoc.
+    """
+    try:
+        with open(md_file, encoding="utf-8") as f:
+            text = f.read()
+        headers = []
+        for header in header_files:
+            with open(header, encoding="utf-8") as f:
+                headers.append(f.read())
+        page = MarkdownRenderer().render_page(
+            text, Path(md_file).stem, css_file, headers
+        )
+        with open(html_file, "w", encoding="utf-8") as f:
+            f.write(page)
+    except (OSError, UnicodeDecodeError) as e:
+        return str(e)
+    return None
+
+
+# Austauschbare Backends für --renderer
+RENDERERS = {"pandoc": render_with_pandoc, "python": render_with_python}
+
+
+def find_markdown_files(files):
+    """Die angegebenen *.md-Dateien oder alle aus . und docs/."""
+    if files:
+        return [f for f in files if f.endswith(".md")]
+    markdown_files = []
+    for md_dir in (".", "docs"):
+        if os.path.isdir(md_dir):
+            markdown_files.extend(glob.glob(os.path.join(md_dir, "*.md")))
+    return markdown_files
+
+
+def _configure_renderer(args, renderer_version, asset_dir):
+    """Gibt (Renderfunktion, Lua-Filter oder None) für --renderer zurück."""
+    render = RENDERERS[args.renderer]
+    if args.renderer != "pandoc":
+        return render, None
+    filter_file = create_main_enhanced_filter(asset_dir)
+    ast_cache = None
+    if args.cache_dir:
+        ast_cache = AstCache(
+            args.cache_dir, renderer_version, create_ast_dump_filter(asset_dir)
+        )
+    render = functools.partial(render, filter_file=filter_file, ast_cache=ast_cache)
+    return render, filter_file
+
+
+def _plan_jobs(markdown_files, manifest, base_digests, headers):
+    """Trennt aktuelle von neu zu konvertierenden Dateien.
+
+    ``base_digests`` sind die Hashes aller Eingaben außer den Headern,
+    ``headers`` Tripel (Header-Datei, Hash, Dateien mit diesem Header).
+    Gibt (Jobs, aktuelle Ausgaben als (Kategorie, HTML-Datei)) zurück.
+    """
+    jobs = []
+    up_to_date = []
+    for md_file in sorted(markdown_files):
+        html_file = Path(md_file).with_suffix(".html")
+        html_category = "root" if os.path.dirname(md_file) == "." else "docs"
+        source_digest = file_digest(md_file)
+        # Alles außer der Quelle, was die Ausgabe beeinflusst
+        inputs_digest = text_digest(
+            *base_digests,
+            *(digest if md_file in files else "" for _, digest, files in headers),
+        )
+        if is_up_to_date(
+            manifest.get(md_file), source_digest, inputs_digest, html_file
+        ):
+            up_to_date.append((html_category, html_file))
+            continue
+        header_files = [header for header, _, files in headers if md_file in files]
+        jobs.append(
+            (
+                md_file,
+                html_file,
+                html_category,
+                source_digest,
+                inputs_digest,
+                header_files,
+            )
+        )
+    return jobs, up_to_date
 
-    # Sammle alle Markdown-Dateien
-    if args.files:
-        markdown_files = [f for f in args.files if f.endswith(".md")]
+
+def _run_jobs(jobs, render, css_file, workers):
+    """Konvertiert parallel; die Fehler (oder None) in Eingabereihenfolge."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(lambda job: render(job[0], job[1], css_file, job[-1]), jobs)
+        )
+
+
+def _record_results(jobs, errors, manifest, html_files_by_dir):
+    """Trägt erfolgreiche Jobs in Manifest und html_files_by_dir ein.
+
+    Gibt die Fehler als Liste von (Datei, Fehler) zurück.
+    """
+    failures = []
+    for job, error in zip(jobs, errors, strict=True):
+        md_file, html_file, html_category, source_digest, inputs_digest, _ = job
+        if error is not None:
+            failures.append((md_file, error))
+            manifest.pop(md_file, None)
+            continue
+        html_files_by_dir[html_category].append(str(html_file))
+        manifest[md_file] = {
+            "source": source_digest,
+            "inputs": inputs_digest,
+            "html": str(html_file),
+        }
+    return failures
+
+
+def _report(verbose, converted, skipped, failures):
+    if verbose:
+        sys.stdout.write(
+            f"{converted} konvertiert, {skipped} unverändert übersprungen\n"
+        )
+    for md_file, error in failures:
+        sys.stderr.write(f"Fehler bei {md_file}:\n{error}\n")
+
+
+def convert_all_markdown_files(args):
+    """Konvertiert alle *.md-Dateien mit dem gewählten Renderer.
+
+    Gibt die fehlgeschlagenen Konvertierungen als Liste von (Datei, Fehler)
+    zurück; eine leere Liste bedeutet Erfolg.
+    """
+    if args.renderer == "pandoc":
+        renderer_version = get_pandoc_version()
+        if renderer_version is None:
+            error = "Pandoc nicht gefunden (oder --renderer python verwenden)"
+            sys.stderr.write(f"{error}\n")
+            return [("pandoc", error)]
     else:
-        markdown_files = []
-        for md_dir in md_dirs:
-            if os.path.isdir(md_dir):
-                for md_file in glob.glob(os.path.join(md_dir, "*.md")):
-                    markdown_files.append(md_file)
+        renderer_version = PYTHON_RENDERER_VERSION
+
+    # Filter und Header inhaltsadressiert statt im Arbeitsverzeichnis
+    asset_dir = (
+        os.path.join(args.cache_dir, "assets")
+        if args.cache_dir
+        else default_asset_dir()
+    )
+    render, filter_file = _configure_renderer(args, renderer_version, asset_dir)
+
+    enhance_css_file()  # CSS ergänzen
+    css_file = "main-design.css"
 
+    markdown_files = find_markdown_files(args.files)
     if not markdown_files:
-        return
+        return []
 
-    files_with_mermaid, files_with_math, files_updated = check_and_fix_content(
-        markdown_files
-    )
-    if files_with_mermaid:
-        pass
-    if files_with_math:
-        pass
-    if files_updated:
-        pass
+    files_with_mermaid, files_with_math, _ = check_and_fix_content(markdown_files)
 
     # Sorge dafür, dass CSS auch im docs-Verzeichnis vorhanden ist
     ensure_css_for_docs_dir()
 
-    mermaid_header_file = "mermaid-header.html"
-    mathjax_header_file = create_mathjax_header()
-
-    # Kurzes Mermaid-Headerfile
-    with open(mermaid_header_file, "w", encoding="utf-8") as f:
-        f.write(
-            r"""
-<script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
-<script>
-  document.addEventListener('DOMContentLoaded', function() {
-    mermaid.initialize({
-      startOnLoad: true,
-      theme: 'default',
-      flowchart: { 
-        useMaxWidth: true,
-        htmlLabels: true,
-        curve: 'basis',
-        nodeSpacing: 50,
-        rankSpacing: 70,
-        defaultRenderer: 'dagre-d3'
-      },
-      themeVariables: {
-        primaryColor: '#326693',
-        primaryTextColor: '#fff',
-        primaryBorderColor: '#1f4060',
-        lineColor: '#326693',
-        secondaryColor: '#f0f0f0',
-        tertiaryColor: '#e6f3ff',
-        nodeBorder: '#326693',
-        mainBkg: '#e6f3ff',
-        clusterBkg: '#f0f7ff',
-        clusterBorder: '#326693',
-        fontSize: '16px'
-      }
-    });
-  });
-</script>
-"""
+    headers = [
+        (header, file_digest(header), files)
+        for header, files in (
+            (create_mermaid_header(asset_dir), files_with_mermaid),
+            (create_mathjax_header(asset_dir), files_with_math),
         )
+    ]
+    base_digests = (
+        renderer_version,
+        file_digest(filter_file) if filter_file else "",
+        file_digest(css_file),
+    )
+    manifest = {} if args.force else load_manifest()
+    jobs, up_to_date = _plan_jobs(markdown_files, manifest, base_digests, headers)
 
     # Erfolgreich konvertierte HTML-Dateien nach Verzeichnis ordnen
     html_files_by_dir = {"root": [], "docs": []}
+    for html_category, html_file in up_to_date:
+        html_files_by_dir[html_category].append(str(html_file))
+    errors = _run_jobs(jobs, render, css_file, args.jobs)
+    failures = _record_results(jobs, errors, manifest, html_files_by_dir)
 
-    for md_file in markdown_files:
-        html_file = Path(md_file).with_suffix(".html")
+    # Einträge gelöschter Quellen entfernen
+    save_manifest({md: rec for md, rec in manifest.items() if os.path.exists(md)})
+    _report(args.verbose, len(jobs) - len(failures), len(up_to_date), failures)
 
-        # Bestimme das Zielverzeichnis
-        target_dir = os.path.dirname(md_file)
-        html_category = "root" if target_dir == "." else "docs"
-
-        cmd = [
-            "pandoc",
-            md_file,
-            "-o",
-            str(html_file),
-            "--standalone",
-            "--css",
-            css_file,
-            "--lua-filter=main_enhanced_filter.lua",
-            "--mathjax",
-        ]
-        if md_file in files_with_mermaid:
-            cmd.append(f"--include-in-header={mermaid_header_file}")
-        if md_file in files_with_math:
-            cmd.append(f"--include-in-header={mathjax_header_file}")
+    if not args.no_start_page:
+        generate_start_page(html_files_by_dir)
+    return failures
+
+
+# --- Watch-Modus -------------------------------------------------------------
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# Ruhezeit, nach der eine Serie von Speichervorgängen als abgeschlossen gilt
+WATCH_DEBOUNCE = 0.15
+# Spätestens nach dieser Zeit wird trotz anhaltender Änderungen gebaut
+WATCH_MAX_DELAY = 1.0
+LIVE_RELOAD_PATH = "/__livereload"
+# Vorlage; {build} ist der Build-Zähler, zu dem die ausgelieferte Seite gehört
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}?build={{build}}").onmessage = '
+    "function () {{ location.reload(); }};</script>\n"
+)
+
+
+class Inotify:
+    """Minimaler Zugriff auf Linux-inotify über ctypes (wie src/watcher.py)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.directories = {}
+
+    def add_watch(self, directory):
+        """Überwacht die Einträge eines Verzeichnisses (nicht rekursiv)."""
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        self.directories[wd] = directory
+
+    def read_paths(self, timeout):
+        """Wartet bis zu timeout Sekunden und gibt die geänderten Pfade zurück."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        paths = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset < len(buffer):
+                wd, _, _, length = _INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += _INOTIFY_EVENT.size
+                name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if name and wd in self.directories:
+                    paths.append(os.path.join(self.directories[wd], name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+def is_watched_source(path, css_file):
+    """Markdown-Dateien und die CSS-Datei; versteckte Editor-Dateien nicht."""
+    name = os.path.basename(path)
+    if name.startswith("."):
+        return False
+    return name.endswith(".md") or path == os.path.join(".", css_file)
+
+
+def wait_for_changes(inotify, css_file):
+    """Wartet auf Änderungen und sammelt sie, bis WATCH_DEBOUNCE lang Ruhe ist.
+
+    Eigene Ausgaben (HTML, Manifest) verlängern die Wartezeit höchstens
+    bis WATCH_MAX_DELAY, lösen aber keinen Build aus.
+    """
+    changed = set()
+    while not changed:
+        paths = inotify.read_paths(None)
+        changed.update(path for path in paths if is_watched_source(path, css_file))
+    deadline = time.monotonic() + WATCH_MAX_DELAY
+    while (remaining := deadline - time.monotonic()) > 0:
+        paths = inotify.read_paths(min(WATCH_DEBOUNCE, remaining))
+        if not paths:
+            break
+        changed.update(path for path in paths if is_watched_source(path, css_file))
+    return sorted(changed)
+
+
+class LiveReload:
+    """Build-Zähler, auf dessen Änderung die Live-Reload-Verbindungen warten."""
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Gibt die aktuelle Version zurück, sobald sie sich ändert."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Liefert das Verzeichnis aus; HTML-Seiten erhalten das Reload-Skript.
+
+    Unter LIVE_RELOAD_PATH hält ein Server-Sent-Events-Strom die
+    Verbindung offen und meldet jeden Build, der neuer ist als die Seite.
+    Die Seite nennt ihren Build im Skript; beim Wiederverbinden sendet der
+    Browser den zuletzt gemeldeten als Last-Event-ID. Ein Build zwischen
+    Ausliefern der Seite und Aufbau der Verbindung geht so nicht verloren.
+    """
 
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == LIVE_RELOAD_PATH:
+            self.send_events()
+        elif path == "/":
+            self.send_response(302)
+            self.send_header("Location", "/start.html")
+            self.end_headers()
+        elif path.endswith(".html"):
+            self.send_html()
+        else:
+            super().do_GET()
+
+    def send_html(self):
+        # Vor dem Lesen: ein gleichzeitiger Build führt höchstens zu einem Reload mehr
+        build = self.server.live_reload.version
         try:
-            subprocess.run(cmd, check=True)
-            html_files_by_dir[html_category].append(str(html_file))
-        except subprocess.CalledProcessError:
-            pass
+            with open(self.translate_path(self.path), "rb") as f:
+                content = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+        script = LIVE_RELOAD_SCRIPT.format(build=build).encode("utf-8")
+        end = content.rfind(b"</body>")
+        if end == -1:
+            content += script
+        else:
+            content = content[:end] + script + content[end:]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        live_reload = self.server.live_reload
+        seen = self.headers.get("Last-Event-ID") or "".join(
+            parse_qs(urlsplit(self.path).query).get("build", [])
+        )
+        # Unbekannter oder veralteter Build: sofort neu laden
+        version = int(seen) if seen.isdigit() else None
+        try:
+            while True:
+                current = live_reload.wait(version, 15)
+                if current != version:
+                    self.wfile.write(f"id: {current}\ndata: reload\n\n".encode())
+                    version = current
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except OSError:
+            return  # Tab geschlossen
+
+    def log_message(self, format, *args):
+        pass
 
-    for temp_file in [mermaid_header_file, mathjax_header_file]:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
 
-    if not args.no_start_page:
-        generate_start_page(html_files_by_dir)
+def watch(args):
+    """Baut bei Änderungen neu und liefert die Ausgabe mit Live-Reload aus.
+
+    Nach dem ersten Build überspringt das Manifest unveränderte Dateien;
+    neu konvertiert werden nur die betroffenen Dokumente und start.html.
+    """
+    css_file = "main-design.css"
+    try:
+        inotify = Inotify()
+    except (AttributeError, OSError) as e:
+        sys.stderr.write(f"Watch-Modus nicht verfügbar (inotify): {e}\n")
+        return 1
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), LiveReloadHandler)
+    except OSError as e:
+        inotify.close()
+        sys.stderr.write(f"Port {args.port} nicht verfügbar: {e}\n")
+        return 1
+    server.live_reload = LiveReload()
+    convert_all_markdown_files(args)
+    args.force = False
+    for directory in (".", "docs"):
+        if os.path.isdir(directory):
+            inotify.add_watch(directory)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sys.stdout.write(
+        f"Beobachte . und docs/: http://127.0.0.1:{server.server_address[1]}/"
+        " (Strg+C beendet)\n"
+    )
+    try:
+        while True:
+            changed = wait_for_changes(inotify, css_file)
+            if args.verbose:
+                sys.stdout.write(f"Geändert: {', '.join(changed)}\n")
+            convert_all_markdown_files(args)
+            server.live_reload.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        inotify.close()
+    return 0
 
 
 def main():
@@ -671,9 +1973,52 @@ def main():
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Ausführliche Ausgabe"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Alle Dateien neu konvertieren und {MANIFEST_FILE} ignorieren",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Anzahl gleichzeitiger Konvertierungen (Standard: 1)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help=f"Cache für Pandoc-AST, auch zwischen CI-Läufen teilbar "
+        f"(Standard: {CACHE_DIR}; leer: ohne Cache)",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=sorted(RENDERERS),
+        default="pandoc",
+        help="Pandoc oder der eingebaute Python-Renderer ohne Pandoc-Prozess "
+        "(Standard: pandoc)",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Bei Änderungen neu bauen und die Ausgabe mit Live-Reload ausliefern",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port des lokalen Servers im Watch-Modus (Standard: 8000)",
+    )
 
     args = parser.parse_args()
-    convert_all_markdown_files(args)
+    if args.jobs < 1:
+        parser.error("--jobs muss mindestens 1 sein")
+    if args.watch:
+        sys.exit(watch(args))
+    if convert_all_markdown_files(args):
+        sys.exit(1)
 
 
 if __name__ == "__main__":